@@ -1,5 +1,3 @@
-
-
 """
 LBO Investment Model - Verified & Corrected
 The Mountain Path - World of Finance
@@ -11,637 +9,901 @@ Equity Value at Exit = Exit EV + Accumulated Balance FCF - Remaining Debt
 ZERO external chart libraries - uses only Streamlit native components
 """
 
+import io
+import os
+import uuid
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 
+# Only what every rerun needs is imported here; tab-only pieces of the
+# engine (exports, goal seek, Monte Carlo jobs, portfolios) are imported in
+# their tab, so a new session's first page does not load them
+from lbo import (
+    ATTRACTIVE_IRR, MARGINAL_IRR, PARAM_KEYS, PERIODS_PER_YEAR, STAGES, START_YEAR, BatchLBOModel,
+    Covenant, IncrementalModel, ModelCache, RerunProfiler, check_covenants,
+    format_millions, format_multiple, format_number, format_pct, irr_from_moic, params_key,
+)
+# Static CSS and header/sidebar/footer HTML, formatted once per process
+from theme import (
+    COLORS, FOOTER_HTML, HEADER_HTML, PAGE_CONFIG, SIDEBAR_HTML, STYLES, sidebar_heading,
+)
+
 # ============================================================================
-# BRANDING & STYLING
+# CONSTANTS
 # ============================================================================
-COLORS = {
-    'dark_blue': '#003366',
-    'medium_blue': '#004d80',
-    'light_blue': '#ADD8E6',
-    'accent_gold': '#FFD700',
-    'bg_dark': '#0a1628',
-    'card_bg': '#112240',
-    'text_primary': '#e6f1ff',
-    'text_secondary': '#8892b0',
-    'success': '#28a745',
-    'danger': '#dc3545',
+GOAL_SEEK_PARAMS = {
+    'Max Purchase Price': 'purchase_price',
+    'Min Exit Multiple': 'exit_multiple',
+    'Debt / Purchase Price': 'debt_pct',
 }
 
-BRANDING = {
-    'name': 'The Mountain Path - World of Finance',
-    'instructor': 'Prof. V. Ravichandran',
-    'credentials': '28+ Years Corporate Finance & Banking | 10+ Years Academic Excellence',
-    'icon': '🏔️',
+# Sidebar names of the inputs, for the tornado chart
+PARAM_LABELS = {
+    'purchase_price': 'Purchase Price', 'fee_pct': 'Fees %', 'debt_pct': 'Debt %',
+    'ltm_revenue': 'LTM Revenue', 'ebitda_margin': 'EBITDA Margin',
+    'revenue_growth': 'Revenue Growth', 'tax_rate': 'Tax Rate', 'capex': 'CapEx',
+    'depreciation': 'Depreciation', 'nwc_pct': 'NWC Change %', 'interest_rate': 'Interest Rate',
+    'mandatory_repay_pct': 'Mandatory Repay %', 'exit_multiple': 'Exit Multiple',
+    'hold_years': 'Holding Period',
 }
 
-PAGE_CONFIG = {
-    'page_title': 'LBO Model | Mountain Path',
-    'page_icon': '🏔️',
-    'layout': 'wide',
-    'initial_sidebar_state': 'expanded',
-}
+# Tab 5's EBITDA margin x exit multiple grid
+SENSITIVITY_MARGINS = np.arange(0.20, 0.36, 0.03)
+SENSITIVITY_EXITS = np.arange(6.0, 11.0, 1.0)
+
+TAB_LABELS = [
+    "📋 Transaction Summary",
+    "📊 Financial Projections",
+    "💰 FCF & Debt Schedule",
+    "🎯 Exit & Returns",
+    "📈 Sensitivity",
+    "🎲 Monte Carlo",
+    "🗂️ Portfolio",
+]
 
 
 def apply_styles():
-    st.markdown(f"""
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Playfair+Display:wght@600;700&family=Source+Sans+Pro:wght@300;400;600;700&display=swap');
-
-        .stApp {{
-            background: linear-gradient(135deg, {COLORS['bg_dark']} 0%, {COLORS['dark_blue']} 50%, #0d2137 100%);
-        }}
-
-        section[data-testid="stSidebar"] {{
-            background: linear-gradient(180deg, {COLORS['bg_dark']} 0%, {COLORS['dark_blue']} 100%);
-            border-right: 1px solid rgba(255,215,0,0.2);
-        }}
-
-        /* Force all sidebar text to be light colored */
-        section[data-testid="stSidebar"] label,
-        section[data-testid="stSidebar"] .stSlider label,
-        section[data-testid="stSidebar"] .stNumberInput label,
-        section[data-testid="stSidebar"] .stSelectbox label,
-        section[data-testid="stSidebar"] p,
-        section[data-testid="stSidebar"] span,
-        section[data-testid="stSidebar"] .stMarkdown p,
-        section[data-testid="stSidebar"] [data-testid="stWidgetLabel"] p,
-        section[data-testid="stSidebar"] [data-testid="stWidgetLabel"] label,
-        section[data-testid="stSidebar"] .stSlider [data-testid="stTickBarMin"],
-        section[data-testid="stSidebar"] .stSlider [data-testid="stTickBarMax"] {{
-            color: {COLORS['text_primary']} !important;
-        }}
-
-        /* Slider current value text */
-        section[data-testid="stSidebar"] [data-testid="stThumbValue"],
-        section[data-testid="stSidebar"] .stSlider div[data-testid="stTickBarMin"],
-        section[data-testid="stSidebar"] .stSlider div[data-testid="stTickBarMax"] {{
-            color: {COLORS['accent_gold']} !important;
-        }}
-
-        /* Number input and select box text inside fields */
-        section[data-testid="stSidebar"] input {{
-            color: #1a1a2e !important;
-            background-color: #ffffff !important;
-        }}
-        section[data-testid="stSidebar"] select,
-        section[data-testid="stSidebar"] .stSelectbox div[data-baseweb="select"] span {{
-            color: {COLORS['text_primary']} !important;
-        }}
-
-        .header-container {{
-            background: linear-gradient(135deg, {COLORS['dark_blue']}, {COLORS['medium_blue']});
-            border: 2px solid {COLORS['accent_gold']};
-            border-radius: 12px;
-            padding: 1.5rem 2rem;
-            margin-bottom: 1.5rem;
-            text-align: center;
-        }}
-        .header-container h1 {{
-            font-family: 'Playfair Display', serif;
-            color: {COLORS['accent_gold']};
-            margin: 0; font-size: 2rem;
-        }}
-        .header-container p {{
-            color: {COLORS['text_primary']};
-            font-family: 'Source Sans Pro', sans-serif;
-            margin: 0.3rem 0 0; font-size: 0.9rem;
-        }}
-
-        .metric-card {{
-            background: {COLORS['card_bg']};
-            border: 1px solid rgba(255,215,0,0.3);
-            border-radius: 10px;
-            padding: 1.2rem; text-align: center;
-            margin-bottom: 0.8rem;
-        }}
-        .metric-card .label {{
-            color: {COLORS['text_secondary']};
-            font-size: 0.8rem; text-transform: uppercase;
-            letter-spacing: 1px;
-            font-family: 'Source Sans Pro', sans-serif;
-        }}
-        .metric-card .value {{
-            color: {COLORS['accent_gold']};
-            font-size: 1.6rem; font-weight: 700;
-            font-family: 'Playfair Display', serif;
-            margin-top: 0.3rem;
-        }}
-
-        .fix-banner {{
-            background: linear-gradient(90deg, #1a472a, #2d6a3e);
-            border: 2px solid {COLORS['success']};
-            border-radius: 10px;
-            padding: 1rem 1.5rem; margin-bottom: 1.5rem;
-            color: white;
-            font-family: 'Source Sans Pro', sans-serif;
-        }}
-        .error-banner {{
-            background: linear-gradient(90deg, #4a1a1a, #6a2d2d);
-            border: 2px solid {COLORS['danger']};
-            border-radius: 10px;
-            padding: 1rem 1.5rem; margin-bottom: 1rem;
-            color: white;
-            font-family: 'Source Sans Pro', sans-serif;
-        }}
-
-        .section-title {{
-            font-family: 'Playfair Display', serif;
-            color: {COLORS['accent_gold']};
-            font-size: 1.3rem;
-            border-bottom: 2px solid rgba(255,215,0,0.3);
-            padding-bottom: 0.5rem;
-            margin: 1.5rem 0 1rem;
-        }}
-
-        .formula-box {{
-            background: rgba(0,51,102,0.5);
-            border: 1px solid {COLORS['accent_gold']};
-            border-radius: 8px;
-            padding: 1rem 1.5rem;
-            font-family: 'Source Sans Pro', monospace;
-            color: {COLORS['text_primary']};
-            margin: 0.8rem 0;
-        }}
-
-        .stTabs [data-baseweb="tab-list"] {{ gap: 8px; }}
-        .stTabs [data-baseweb="tab"] {{
-            background: {COLORS['card_bg']};
-            border: 1px solid rgba(255,215,0,0.3);
-            border-radius: 8px;
-            color: {COLORS['text_primary']};
-            font-family: 'Source Sans Pro', sans-serif;
-            padding: 0.5rem 1rem;
-        }}
-        .stTabs [aria-selected="true"] {{
-            background: {COLORS['dark_blue']};
-            border: 2px solid {COLORS['accent_gold']};
-            color: {COLORS['accent_gold']};
-        }}
-
-        div[data-testid="stDataFrame"] {{
-            border: 1px solid rgba(255,215,0,0.2);
-            border-radius: 8px;
-        }}
-
-        footer {{visibility: hidden;}}
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(STYLES, unsafe_allow_html=True)
 
 
 def fmt_m(value, decimals=1):
-    """Format as millions"""
-    if abs(value) >= 1e6:
-        return f"${value / 1e6:,.{decimals}f}M"
-    else:
-        return f"${value:,.0f}"
-
-
-# ============================================================================
-# LBO MODEL ENGINE
-# ============================================================================
-class LBOModel:
-    def __init__(self, params):
-        self.p = params
-        self.df = None
-
-        self.purchase_price = params['purchase_price']
-        self.fees = params['purchase_price'] * params['fee_pct']
-        self.total_cost = self.purchase_price + self.fees
-        self.debt = params['purchase_price'] * params['debt_pct']
-        self.equity = self.total_cost - self.debt
-
-        self.entry_revenue = params['ltm_revenue']
-        self.entry_ebitda = params['ltm_ebitda']
-        self.ebitda_margin = params['ebitda_margin']
-        self.revenue_growth = params['revenue_growth']
-        self.tax_rate = params['tax_rate']
-        self.capex = params['capex']
-        self.depreciation = params['depreciation']
-        self.nwc_pct = params['nwc_pct']
-
-        self.interest_rate = params['interest_rate']
-        self.mandatory_repay_pct = params['mandatory_repay_pct']
-
-        self.exit_multiple = params['exit_multiple']
-        self.hold_years = params['hold_years']
-
-    def project(self):
-        results = []
-        current_debt = self.debt
-        prev_revenue = self.entry_revenue
-        accumulated_balance_fcf = 0.0
-
-        for year in range(1, self.hold_years + 1):
-            revenue = prev_revenue * (1 + self.revenue_growth)
-            ebitda = revenue * self.ebitda_margin
-            depreciation = self.depreciation
-            ebit = ebitda - depreciation
-            interest = current_debt * self.interest_rate
-            ebt = ebit - interest
-            tax = max(0, ebt * self.tax_rate)
-            net_income = ebt - tax
-
-            nwc_change = revenue * self.nwc_pct
-            fcf = net_income + depreciation - self.capex - nwc_change
-
-            mandatory_repay = current_debt * self.mandatory_repay_pct
-            balance_fcf = fcf - mandatory_repay
-            accumulated_balance_fcf += balance_fcf
-            ending_debt = current_debt - mandatory_repay
-
-            results.append({
-                'Year': year,
-                'Calendar_Year': 2024 + year - 1,
-                'Revenue': revenue,
-                'EBITDA': ebitda,
-                'Depreciation': depreciation,
-                'EBIT': ebit,
-                'Interest': interest,
-                'EBT': ebt,
-                'Tax': tax,
-                'Net_Income': net_income,
-                'NWC_Change': nwc_change,
-                'Levered_FCF': fcf,
-                'Mandatory_Debt_Payment': mandatory_repay,
-                'Balance_FCF': balance_fcf,
-                'Accumulated_Balance_FCF': accumulated_balance_fcf,
-                'Beginning_Debt': current_debt,
-                'Ending_Debt': ending_debt,
-            })
-
-            current_debt = ending_debt
-            prev_revenue = revenue
-
-        self.df = pd.DataFrame(results)
-        return self.df
-
-    def get_returns(self):
-        """
-        CRITICAL FIX:
-        Equity Value at Exit = Exit EV + Sum of Balance FCF - Remaining Debt
-        """
-        if self.df is None:
-            self.project()
-
-        final = self.df.iloc[-1]
-        exit_ebitda = final['EBITDA']
-        exit_ev = exit_ebitda * self.exit_multiple
-        accumulated_fcf = final['Accumulated_Balance_FCF']
-        remaining_debt = final['Ending_Debt']
-
-        equity_proceeds = exit_ev + accumulated_fcf - remaining_debt
-
-        moic = equity_proceeds / self.equity if self.equity > 0 else 0
-        irr = (moic ** (1 / self.hold_years)) - 1 if moic > 0 else 0
-
-        entry_ev_multiple = self.purchase_price / self.entry_ebitda
-        debt_paydown = self.debt - remaining_debt
-        ebitda_growth_value = (exit_ebitda - self.entry_ebitda) * entry_ev_multiple
-        multiple_expansion_value = (self.exit_multiple - entry_ev_multiple) * exit_ebitda
-        fcf_contribution = accumulated_fcf
-
-        return {
-            'exit_ebitda': exit_ebitda,
-            'exit_ev': exit_ev,
-            'accumulated_fcf': accumulated_fcf,
-            'remaining_debt': remaining_debt,
-            'equity_proceeds': equity_proceeds,
-            'moic': moic,
-            'irr': irr,
-            'debt_paydown': debt_paydown,
-            'ebitda_growth_value': ebitda_growth_value,
-            'multiple_expansion_value': multiple_expansion_value,
-            'fcf_contribution': fcf_contribution,
+    """Format as millions (format_millions() formats a whole array in one call)"""
+    return str(format_millions(value, decimals))
+
+
+def number_columns(columns, fmt="%,.0f", labels=False):
+    """
+    column_config showing raw numbers with thousands separators, so tables
+    are sent as float columns and formatted by the browser, not by Python.
+    labels=True when the Year column holds period labels ('2024 Q3') instead.
+    """
+    config = {c: st.column_config.NumberColumn(c, format=fmt) for c in columns}
+    config['Year'] = (st.column_config.TextColumn('Period') if labels
+                      else st.column_config.NumberColumn('Year', format="%d"))
+    return config
+
+
+def labelled_frame(projection, frequency):
+    """
+    Projection DataFrame for display. Below annual, Calendar_Year becomes a
+    period label ('2024 Q3', '2024-07'); the annual frame is returned as is.
+    """
+    df = projection.frame()
+    if frequency == 'annual':
+        return df
+    within = ((df['Period'] - 1) % PERIODS_PER_YEAR[frequency] + 1).astype(str)
+    suffix = ' Q' + within if frequency == 'quarterly' else '-' + within.str.zfill(2)
+    return df.assign(Calendar_Year=df['Calendar_Year'].astype(str) + suffix)
+
+
+def diagnostics_enabled():
+    """Opt-in profiling: LBO_PROFILE=1, ?profile=1 in the URL, or the sidebar toggle"""
+    return (os.environ.get('LBO_PROFILE') == '1'
+            or st.query_params.get('profile') == '1'
+            or st.session_state.get('diagnostics', False))
+
+
+def render_diagnostics(profiler):
+    """Collapsible panel with this rerun's timings, counters and cache stats"""
+    with st.expander(f"🩺 Diagnostics: rerun took {profiler.total_seconds() * 1000:.0f} ms", expanded=False):
+        st.dataframe(pd.DataFrame({
+            'Section': ['  ' * s['depth'] + s['section'].rsplit('/', 1)[-1] for s in profiler.sections],
+            'Path': [s['section'] for s in profiler.sections],
+            'Start (ms)': [s['start'] * 1000 for s in profiler.sections],
+            'Wall (ms)': [s['seconds'] * 1000 for s in profiler.sections],
+        }).sort_values('Start (ms)'), use_container_width=True, hide_index=True)
+        c1, c2 = st.columns(2)
+        with c1:
+            st.markdown("**Counters**")
+            st.json(profiler.counters)
+        with c2:
+            st.markdown("**Cache & incremental model**")
+            st.json(profiler.stats)
+        c1, c2 = st.columns(2)
+        with c1:
+            st.download_button("Download JSON trace", profiler.to_json(),
+                               file_name=f"lbo_trace_{profiler.rerun_id}.json", mime="application/json")
+        with c2:
+            st.download_button("Download CSV trace", profiler.to_csv(),
+                               file_name=f"lbo_trace_{profiler.rerun_id}.csv", mime="text/csv")
+
+
+def tab_is_open(tab):
+    """False only for a tab known to be hidden; without tab state every tab counts as open"""
+    return getattr(tab, 'open', None) is not False
+
+
+def sensitivity_tables(cache, params, model, returns, frequency='annual'):
+    """
+    Tab 5's exit-multiple table and EBITDA margin × exit multiple IRR grid.
+    Both are cached per params in the shared model cache, so revisiting the
+    tab (or rerunning for another tab) does not rebuild them.
+    """
+    def compute():
+        exit_m = np.arange(5.0, 12.5, 0.5)
+        exit_ev_s = returns['exit_ebitda'] * exit_m
+        eq_proc = exit_ev_s + returns['accumulated_fcf'] - returns['remaining_debt']
+        m = eq_proc / model.equity if model.equity > 0 else np.zeros_like(eq_proc)
+        i = irr_from_moic(m, model.hold_years)
+        sensitivity = {
+            'Exit Multiple': format_multiple(exit_m),
+            'Exit EV': format_millions(exit_ev_s),
+            'Equity Value': format_millions(eq_proc),
+            'MOIC': format_multiple(m, 2),
+            'IRR': format_pct(i),
+            'Status': np.select([i >= ATTRACTIVE_IRR, i >= MARGINAL_IRR], ['✅', '⚠️'], '❌'),
         }
 
+        irr_grid = cache.grid(params, 'ebitda_margin', SENSITIVITY_MARGINS,
+                              'exit_multiple', SENSITIVITY_EXITS, frequency)['irr']
+        sens_2d = pd.DataFrame(format_pct(irr_grid),
+                               index=format_pct(SENSITIVITY_MARGINS, 0),
+                               columns=format_multiple(SENSITIVITY_EXITS))
+        sens_2d.index.name = "EBITDA Margin ↓ / Exit Multiple →"
+        return pd.DataFrame(sensitivity), sens_2d
+
+    return cache.get_or_compute(params_key('sensitivity_tables', params, frequency), compute)
+
+
+def export_button(label, key, write, file_stem):
+    """
+    Format picker and download button for raw numbers. write(buffer, fmt)
+    only runs when the button is clicked, and clicking does not rerun the app.
+    """
+    from lbo import MIME_TYPES, available_formats
+
+    c1, c2 = st.columns([1, 4])
+    with c1:
+        fmt = st.selectbox("Format", available_formats(), key=f'{key}_format', label_visibility='collapsed')
+
+    def data():
+        buffer = io.BytesIO()
+        write(buffer, fmt)
+        return buffer.getvalue()
+
+    with c2:
+        st.download_button(label, data, file_name=f"{file_stem}.{fmt}", mime=MIME_TYPES[fmt],
+                           key=key, on_click='ignore')
+
+
+def covenant_table(cache, params, covenants, frequency, start_year):
+    """
+    Per-period covenant ratios and headroom for the base case, plus each
+    covenant's first breach period (0 if none). Cached per params and thresholds.
+    """
+    def compute():
+        model = BatchLBOModel(params, frequency=frequency, start_year=start_year)
+        results = check_covenants(model, covenants)
+        df = labelled_frame(model.projection(0), frequency)
+        table = pd.DataFrame({'Year': df['Calendar_Year']})
+        for covenant in covenants:
+            r = results[covenant.name]
+            table[covenant.name] = format_multiple(r['value'][0, :len(df)], 2)
+            table[f"{covenant.name} Headroom"] = format_pct(r['headroom'][0, :len(df)])
+        first_breach = {c.name: int(results[c.name]['first_breach'][0]) for c in covenants}
+        return table, first_breach
+
+    thresholds = [(c.name, c.metric, c.threshold) for c in covenants]
+    return cache.get_or_compute(
+        params_key('covenants', params, thresholds, frequency, start_year), compute)
+
+
+@st.cache_resource
+def get_model_cache():
+    """
+    One cache per server process, shared by all sessions (LBO_CACHE_SIZE entries,
+    at most LBO_CACHE_MB of arrays, default 512).
+    LBO_DISK_CACHE=<dir> adds a persistent tier for grids and simulations,
+    shared by every app process using that directory (LBO_DISK_CACHE_MB, default 1024).
+    """
+    directory = os.environ.get('LBO_DISK_CACHE')
+    disk = None
+    if directory:
+        from lbo import DiskCache
+
+        disk = DiskCache(directory, max_bytes=int(os.environ.get('LBO_DISK_CACHE_MB', 1024)) << 20)
+    return ModelCache(maxsize=int(os.environ.get('LBO_CACHE_SIZE', 256)), disk=disk,
+                      max_bytes=int(os.environ.get('LBO_CACHE_MB', 512)) << 20)
+
+
+@st.cache_resource
+def get_job_queue():
+    """
+    Background worker pool shared by all sessions: LBO_JOB_WORKERS jobs run at
+    once (default 2) and each session may have LBO_JOBS_PER_SESSION queued or
+    running (default 1).
+    """
+    from lbo import JobQueue
+
+    return JobQueue(max_workers=int(os.environ.get('LBO_JOB_WORKERS', 2)),
+                    max_per_owner=int(os.environ.get('LBO_JOBS_PER_SESSION', 1)))
+
+
+def simulation_cards(summary):
+    """Median IRR and hurdle probability cards for a simulation summary"""
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        st.markdown(f'<div class="metric-card"><div class="label">Median IRR</div>'
+                    f'<div class="value">{summary["irr_percentiles"][2] * 100:.1f}%</div></div>',
+                    unsafe_allow_html=True)
+    with c2:
+        st.markdown(f'<div class="metric-card"><div class="label">P(IRR ≥ {MARGINAL_IRR:.0%})</div>'
+                    f'<div class="value">{summary["hurdle_probability"][MARGINAL_IRR] * 100:.1f}%</div>'
+                    f'</div>', unsafe_allow_html=True)
+    with c3:
+        st.markdown(f'<div class="metric-card"><div class="label">P(IRR ≥ {ATTRACTIVE_IRR:.0%})</div>'
+                    f'<div class="value">{summary["hurdle_probability"][ATTRACTIVE_IRR] * 100:.1f}%</div>'
+                    f'</div>', unsafe_allow_html=True)
+
+
+def collect_simulation(job):
+    """Move a finished Monte Carlo job's outcome into session state"""
+    request = st.session_state.pop('mc_pending_request', None)
+    if job.status == 'done':
+        sim = job.result['sim']
+        st.session_state['mc_request'] = request
+        st.session_state['mc_summary'] = job.result['summary']
+        counts, edges = np.histogram(np.clip(sim['irr'], -0.5, 1.0), bins=40)
+        st.session_state['mc_histogram'] = pd.DataFrame(
+            {'Paths': counts}, index=format_pct((edges[:-1] + edges[1:]) / 2))
+    elif job.status == 'failed':
+        st.session_state['mc_error'] = job.error
+    else:
+        st.session_state['mc_error'] = "Simulation cancelled"
+
+
+@st.fragment(run_every=0.5)
+def simulation_progress(queue):
+    """
+    Polls the session's running Monte Carlo job without rerunning the page,
+    streaming partial percentiles in as chunks finish; reruns the app once
+    the job has finished.
+    """
+    job = queue.get(st.session_state.get('mc_job'))
+    if job is None:
+        st.session_state.pop('mc_job', None)
+        return
+    if job.done:
+        del st.session_state['mc_job']
+        collect_simulation(job)
+        st.rerun()
+    status, progress, partial = job.snapshot()
+    label = "Queued behind other runs" if status == 'queued' else f"Simulating: {progress:.0%}"
+    st.progress(progress, text=f"{label} ({job.elapsed:.1f}s)")
+    if st.button("Cancel Simulation", key='mc_cancel'):
+        queue.cancel(job.id)
+    if partial is not None:
+        st.caption(f"Partial results over {partial['paths']:,} paths")
+        simulation_cards(partial)
+
 
 # ============================================================================
 # MAIN APPLICATION
 # ============================================================================
 def main():
     st.set_page_config(**PAGE_CONFIG)
-    apply_styles()
+    profiler = RerunProfiler(enabled=diagnostics_enabled())
+    with profiler.section('apply_styles'):
+        apply_styles()
 
-    st.markdown(f"""
-    <div class="header-container">
-        <h1>{BRANDING['icon']} LBO Investment Model</h1>
-        <p>{BRANDING['name']}</p>
-        <p style="font-size:0.8rem; color:{COLORS['text_secondary']};">
-            {BRANDING['instructor']} | {BRANDING['credentials']}</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(HEADER_HTML, unsafe_allow_html=True)
 
     # ========== SIDEBAR ==========
-    st.sidebar.markdown(f"""
-    <div style="text-align:center; padding:1.2rem; background:rgba(255,215,0,0.08);
-         border-radius:10px; margin-bottom:1.5rem; border:2px solid {COLORS['accent_gold']};">
-        <h3 style="color:{COLORS['accent_gold']}; margin:0;">{BRANDING['icon']} LBO MODEL</h3>
-        <p style="color:{COLORS['text_secondary']}; font-size:0.75rem; margin:5px 0 0;">
-            ✅ Basic Paper Model</p>
-    </div>
-    """, unsafe_allow_html=True)
-
-    st.sidebar.markdown(f"<p style='color:{COLORS['accent_gold']}; font-weight:700;'>📋 Transaction</p>",
-                         unsafe_allow_html=True)
-    purchase_price = st.sidebar.number_input("Purchase Price", value=100_000_000, step=1_000_000, format="%d")
-    fee_pct = st.sidebar.slider("Fees & Expenses (%)", 1.0, 10.0, 2.0, 0.5) / 100
-    debt_pct = st.sidebar.slider("Debt / Purchase Price (%)", 40.0, 80.0, 60.0, 5.0) / 100
-    exit_multiple = st.sidebar.number_input("Exit EBITDA Multiple", value=10.0, step=0.5, format="%.1f")
-    hold_years = st.sidebar.selectbox("Holding Period (Years)", [3, 4, 5, 6, 7], index=2)
-
-    st.sidebar.markdown(f"<p style='color:{COLORS['accent_gold']}; font-weight:700;'>📊 Operating</p>",
-                         unsafe_allow_html=True)
-    ltm_revenue = st.sidebar.number_input("LTM Revenue", value=100_000_000, step=1_000_000, format="%d")
-    ebitda_margin = st.sidebar.slider("EBITDA Margin (%)", 10.0, 50.0, 25.0, 1.0) / 100
-    revenue_growth = st.sidebar.slider("Revenue Growth (%)", 1.0, 20.0, 5.0, 0.5) / 100
-    tax_rate = st.sidebar.slider("Tax Rate (%)", 15.0, 35.0, 25.0, 1.0) / 100
-    capex = st.sidebar.number_input("Annual CapEx", value=5_000_000, step=500_000, format="%d")
-    depreciation = st.sidebar.number_input("Annual Depreciation", value=3_000_000, step=500_000, format="%d")
-    nwc_pct = st.sidebar.slider("NWC Change (% of Revenue)", -5.0, 5.0, -1.0, 0.5) / 100
-
-    st.sidebar.markdown(f"<p style='color:{COLORS['accent_gold']}; font-weight:700;'>🏦 Debt</p>",
-                         unsafe_allow_html=True)
-    interest_rate = st.sidebar.slider("Interest Rate (%)", 3.0, 12.0, 7.0, 0.5) / 100
-    mandatory_repay_pct = st.sidebar.slider("Mandatory Repayment (%)", 5.0, 20.0, 10.0, 1.0) / 100
-
-    ltm_ebitda = ltm_revenue * ebitda_margin
-    params = {
-        'purchase_price': purchase_price, 'fee_pct': fee_pct, 'debt_pct': debt_pct,
-        'ltm_revenue': ltm_revenue, 'ltm_ebitda': ltm_ebitda,
-        'ebitda_margin': ebitda_margin, 'revenue_growth': revenue_growth,
-        'tax_rate': tax_rate, 'capex': capex, 'depreciation': depreciation,
-        'nwc_pct': nwc_pct, 'interest_rate': interest_rate,
-        'mandatory_repay_pct': mandatory_repay_pct,
-        'exit_multiple': exit_multiple, 'hold_years': hold_years,
-    }
-
-    model = LBOModel(params)
-    df = model.project()
-    returns = model.get_returns()
+    with profiler.section('sidebar'):
+        st.sidebar.markdown(SIDEBAR_HTML, unsafe_allow_html=True)
+
+        st.sidebar.markdown(sidebar_heading("📋 Transaction"), unsafe_allow_html=True)
+        purchase_price = st.sidebar.number_input("Purchase Price", value=100_000_000, step=1_000_000, format="%d")
+        fee_pct = st.sidebar.slider("Fees & Expenses (%)", 1.0, 10.0, 2.0, 0.5) / 100
+        debt_pct = st.sidebar.slider("Debt / Purchase Price (%)", 40.0, 80.0, 60.0, 5.0) / 100
+        exit_multiple = st.sidebar.number_input("Exit EBITDA Multiple", value=10.0, step=0.5, format="%.1f")
+        hold_years = st.sidebar.selectbox("Holding Period (Years)", list(range(3, 11)), index=2)
+        frequency = st.sidebar.selectbox("Projection Frequency", list(PERIODS_PER_YEAR),
+                                         format_func=str.title,
+                                         help="Growth, interest and repayment inputs stay annual")
+        start_year = st.sidebar.number_input("First Projection Year", value=START_YEAR, step=1, format="%d")
+
+        st.sidebar.markdown(sidebar_heading("📊 Operating"), unsafe_allow_html=True)
+        ltm_revenue = st.sidebar.number_input("LTM Revenue", value=100_000_000, step=1_000_000, format="%d")
+        ebitda_margin = st.sidebar.slider("EBITDA Margin (%)", 10.0, 50.0, 25.0, 1.0) / 100
+        revenue_growth = st.sidebar.slider("Revenue Growth (%)", 1.0, 20.0, 5.0, 0.5) / 100
+        tax_rate = st.sidebar.slider("Tax Rate (%)", 15.0, 35.0, 25.0, 1.0) / 100
+        capex = st.sidebar.number_input("Annual CapEx", value=5_000_000, step=500_000, format="%d")
+        depreciation = st.sidebar.number_input("Annual Depreciation", value=3_000_000, step=500_000, format="%d")
+        nwc_pct = st.sidebar.slider("NWC Change (% of Revenue)", -5.0, 5.0, -1.0, 0.5) / 100
+
+        st.sidebar.markdown(sidebar_heading("🏦 Debt"), unsafe_allow_html=True)
+        interest_rate = st.sidebar.slider("Interest Rate (%)", 3.0, 12.0, 7.0, 0.5) / 100
+        mandatory_repay_pct = st.sidebar.slider("Mandatory Repayment (%)", 5.0, 20.0, 10.0, 1.0) / 100
+
+        st.sidebar.markdown(sidebar_heading("📏 Covenants"), unsafe_allow_html=True)
+        covenants = [
+            Covenant('Max Debt/EBITDA', 'leverage',
+                     st.sidebar.number_input("Max Debt / EBITDA (x)", value=6.0, step=0.25, format="%.2f")),
+            Covenant('Min Interest Cover', 'interest_cover',
+                     st.sidebar.number_input("Min Interest Cover (x)", value=2.0, step=0.25, format="%.2f")),
+            Covenant('Min DSCR', 'dscr',
+                     st.sidebar.number_input("Min DSCR (x)", value=1.2, step=0.05, format="%.2f")),
+        ]
+
+        ltm_ebitda = ltm_revenue * ebitda_margin
+        params = {
+            'purchase_price': purchase_price, 'fee_pct': fee_pct, 'debt_pct': debt_pct,
+            'ltm_revenue': ltm_revenue, 'ltm_ebitda': ltm_ebitda,
+            'ebitda_margin': ebitda_margin, 'revenue_growth': revenue_growth,
+            'tax_rate': tax_rate, 'capex': capex, 'depreciation': depreciation,
+            'nwc_pct': nwc_pct, 'interest_rate': interest_rate,
+            'mandatory_repay_pct': mandatory_repay_pct,
+            'exit_multiple': exit_multiple, 'hold_years': hold_years,
+        }
+        st.sidebar.checkbox("🩺 Diagnostics", key='diagnostics',
+                            help="Time each section of the page and show cache statistics")
+
+    # Per-session incremental model: e.g. an exit-multiple change reruns only the exit stage
+    cache = get_model_cache()
+    incremental = st.session_state.get('incremental_model')
+    if incremental is None or (incremental.frequency, incremental.start_year) != (frequency, start_year):
+        incremental = st.session_state['incremental_model'] = IncrementalModel(
+            frequency=frequency, start_year=start_year)
+    updates_before = incremental.updates
+    with profiler.section('model'):
+        model, projection, returns = cache.evaluate(params, incremental=incremental,
+                                                    frequency=frequency, start_year=start_year)
+    recomputed = incremental.last_recomputed if incremental.updates > updates_before else ()
+    profiler.count('model_evaluations', incremental.updates - updates_before)
+    profiler.count('stages_recomputed', len(recomputed))
+    st.sidebar.caption(f"⚙️ Stages recomputed this run: {len(recomputed)}/{len(STAGES)}"
+                       f"{' (' + ', '.join(recomputed) + ')' if recomputed else ' (cached)'}")
 
     # ========== TABS ==========
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "📋 Transaction Summary",
-        "📊 Financial Projections",
-        "💰 FCF & Debt Schedule",
-        "🎯 Exit & Returns",
-        "📈 Sensitivity",
-    ])
+    # Only the selected tab runs; switching tabs reruns the script (cheap: the model is cached)
+    try:
+        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(TAB_LABELS, key='active_tab', on_change='rerun')
+    except TypeError:  # Streamlit without tab state: every tab renders, as before
+        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(TAB_LABELS)
 
     # TAB 1
-    with tab1:
-        st.markdown('<div class="section-title">🏢 Transaction Overview</div>', unsafe_allow_html=True)
-        c1, c2, c3, c4 = st.columns(4)
-        with c1:
-            st.markdown(f'<div class="metric-card"><div class="label">Purchase Price</div>'
-                        f'<div class="value">{fmt_m(model.purchase_price)}</div></div>', unsafe_allow_html=True)
-        with c2:
-            st.markdown(f'<div class="metric-card"><div class="label">Total Cost</div>'
-                        f'<div class="value">{fmt_m(model.total_cost)}</div></div>', unsafe_allow_html=True)
-        with c3:
-            st.markdown(f'<div class="metric-card"><div class="label">Debt Raised</div>'
-                        f'<div class="value">{fmt_m(model.debt)}</div></div>', unsafe_allow_html=True)
-        with c4:
-            st.markdown(f'<div class="metric-card"><div class="label">Sponsor Equity</div>'
-                        f'<div class="value">{fmt_m(model.equity)}</div></div>', unsafe_allow_html=True)
-
-        st.markdown('<div class="section-title">📋 Sources & Uses</div>', unsafe_allow_html=True)
-        cs, cu = st.columns(2)
-        with cs:
-            st.dataframe(pd.DataFrame({
-                'Sources': ['Debt Raised', 'Sponsor Equity', '**Total**'],
-                'Amount': [fmt_m(model.debt), fmt_m(model.equity), fmt_m(model.total_cost)],
-            }), use_container_width=True, hide_index=True)
-        with cu:
+    with tab1, profiler.section('tab1 Transaction Summary'):
+        if tab_is_open(tab1):
+            st.markdown('<div class="section-title">🏢 Transaction Overview</div>', unsafe_allow_html=True)
+            c1, c2, c3, c4 = st.columns(4)
+            with c1:
+                st.markdown(f'<div class="metric-card"><div class="label">Purchase Price</div>'
+                            f'<div class="value">{fmt_m(model.purchase_price)}</div></div>', unsafe_allow_html=True)
+            with c2:
+                st.markdown(f'<div class="metric-card"><div class="label">Total Cost</div>'
+                            f'<div class="value">{fmt_m(model.total_cost)}</div></div>', unsafe_allow_html=True)
+            with c3:
+                st.markdown(f'<div class="metric-card"><div class="label">Debt Raised</div>'
+                            f'<div class="value">{fmt_m(model.debt)}</div></div>', unsafe_allow_html=True)
+            with c4:
+                st.markdown(f'<div class="metric-card"><div class="label">Sponsor Equity</div>'
+                            f'<div class="value">{fmt_m(model.equity)}</div></div>', unsafe_allow_html=True)
+
+            st.markdown('<div class="section-title">📋 Sources & Uses</div>', unsafe_allow_html=True)
+            cs, cu = st.columns(2)
+            with cs:
+                st.dataframe(pd.DataFrame({
+                    'Sources': ['Debt Raised', 'Sponsor Equity', '**Total**'],
+                    'Amount': format_millions([model.debt, model.equity, model.total_cost]),
+                }), use_container_width=True, hide_index=True)
+            with cu:
+                st.dataframe(pd.DataFrame({
+                    'Uses': ['Purchase Price', 'Fees & Expenses', '**Total**'],
+                    'Amount': format_millions([model.purchase_price, model.fees, model.total_cost]),
+                }), use_container_width=True, hide_index=True)
+            st.success("✅ Sources = Uses — Transaction balances perfectly")
+
+            st.markdown('<div class="section-title">📊 Key Assumptions</div>', unsafe_allow_html=True)
             st.dataframe(pd.DataFrame({
-                'Uses': ['Purchase Price', 'Fees & Expenses', '**Total**'],
-                'Amount': [fmt_m(model.purchase_price), fmt_m(model.fees), fmt_m(model.total_cost)],
+                'Category': ['Transaction', 'Transaction', 'Transaction', 'Operating', 'Operating',
+                              'Operating', 'Operating', 'Debt', 'Debt', 'Exit'],
+                'Parameter': ['Entry EV/EBITDA', 'Debt %', 'Fees %', 'Revenue Growth', 'EBITDA Margin',
+                              'CapEx', 'NWC Change', 'Interest Rate', 'Mandatory Repay %', 'Exit Multiple'],
+                'Value': [
+                    f"{model.purchase_price / model.entry_ebitda:.1f}x",
+                    f"{debt_pct * 100:.0f}%", f"{fee_pct * 100:.1f}%",
+                    f"{revenue_growth * 100:.1f}%", f"{ebitda_margin * 100:.1f}%",
+                    fmt_m(capex), f"{nwc_pct * 100:.1f}%",
+                    f"{interest_rate * 100:.1f}%", f"{mandatory_repay_pct * 100:.0f}%",
+                    f"{exit_multiple:.1f}x",
+                ],
             }), use_container_width=True, hide_index=True)
-        st.success("✅ Sources = Uses — Transaction balances perfectly")
-
-        st.markdown('<div class="section-title">📊 Key Assumptions</div>', unsafe_allow_html=True)
-        st.dataframe(pd.DataFrame({
-            'Category': ['Transaction', 'Transaction', 'Transaction', 'Operating', 'Operating',
-                          'Operating', 'Operating', 'Debt', 'Debt', 'Exit'],
-            'Parameter': ['Entry EV/EBITDA', 'Debt %', 'Fees %', 'Revenue Growth', 'EBITDA Margin',
-                          'CapEx', 'NWC Change', 'Interest Rate', 'Mandatory Repay %', 'Exit Multiple'],
-            'Value': [
-                f"{model.purchase_price / model.entry_ebitda:.1f}x",
-                f"{debt_pct * 100:.0f}%", f"{fee_pct * 100:.1f}%",
-                f"{revenue_growth * 100:.1f}%", f"{ebitda_margin * 100:.1f}%",
-                fmt_m(capex), f"{nwc_pct * 100:.1f}%",
-                f"{interest_rate * 100:.1f}%", f"{mandatory_repay_pct * 100:.0f}%",
-                f"{exit_multiple:.1f}x",
-            ],
-        }), use_container_width=True, hide_index=True)
 
     # TAB 2
-    with tab2:
-        st.markdown('<div class="section-title">📊 Income Statement Projections</div>', unsafe_allow_html=True)
-        income_display = df[['Calendar_Year', 'Revenue', 'EBITDA', 'Depreciation',
-                             'EBIT', 'Interest', 'EBT', 'Tax', 'Net_Income']].copy()
-        income_display.columns = ['Year', 'Revenue', 'EBITDA', 'Depreciation',
-                                  'EBIT', 'Interest', 'EBT', 'Tax', 'Net Income']
-        for col in income_display.columns:
-            if col != 'Year':
-                income_display[col] = income_display[col].apply(lambda x: f"{x:,.0f}")
-        st.dataframe(income_display, use_container_width=True, hide_index=True)
-
-        st.markdown('<div class="section-title">📈 Revenue & EBITDA Growth</div>', unsafe_allow_html=True)
-        chart_data = df[['Calendar_Year', 'Revenue', 'EBITDA']].copy()
-        chart_data = chart_data.set_index('Calendar_Year')
-        st.bar_chart(chart_data)
+    with tab2, profiler.section('tab2 Financial Projections'):
+        if tab_is_open(tab2):
+            from lbo import export_projection
+
+            st.markdown('<div class="section-title">📊 Income Statement Projections</div>', unsafe_allow_html=True)
+            df = labelled_frame(projection, frequency)  # frame built on first use, then memoized
+            income_display = df[['Calendar_Year', 'Revenue', 'EBITDA', 'Depreciation',
+                                 'EBIT', 'Interest', 'EBT', 'Tax', 'Net_Income']].copy()
+            income_display.columns = ['Year', 'Revenue', 'EBITDA', 'Depreciation',
+                                      'EBIT', 'Interest', 'EBT', 'Tax', 'Net Income']
+            st.dataframe(income_display, use_container_width=True, hide_index=True,
+                         column_config=number_columns(income_display.columns, labels=frequency != 'annual'))
+
+            st.markdown('<div class="section-title">📈 Revenue & EBITDA Growth</div>', unsafe_allow_html=True)
+            chart_data = df[['Calendar_Year', 'Revenue', 'EBITDA']].copy()
+            chart_data = chart_data.set_index('Calendar_Year')
+            with profiler.section('chart'):
+                st.bar_chart(chart_data)
+            export_button("⬇️ Download projection", 'export_projection',
+                          lambda buffer, fmt: export_projection(projection, buffer, fmt), 'lbo_projection')
 
     # TAB 3
-    with tab3:
-        st.markdown('<div class="section-title">💰 Levered Free Cash Flow</div>', unsafe_allow_html=True)
-        fcf_display = df[['Calendar_Year', 'Net_Income', 'Depreciation', 'NWC_Change',
-                          'Levered_FCF', 'Mandatory_Debt_Payment',
-                          'Balance_FCF', 'Accumulated_Balance_FCF']].copy()
-        fcf_display.insert(3, 'CapEx', model.capex)
-        fcf_display.columns = ['Year', 'Net Income', '+ Depreciation', 'Less: Chg NWC',
-                               '- CapEx', 'Levered FCF', '- Debt Repay',
-                               'Balance FCF', 'Accum Bal FCF']
-        for col in fcf_display.columns:
-            if col != 'Year':
-                fcf_display[col] = fcf_display[col].apply(
-                    lambda x: f"{x:,.0f}" if isinstance(x, (int, float)) else x)
-        st.dataframe(fcf_display, use_container_width=True, hide_index=True)
-
-        st.markdown('<div class="section-title">📈 FCF Components</div>', unsafe_allow_html=True)
-        fcf_chart = df[['Calendar_Year', 'Levered_FCF', 'Balance_FCF']].copy()
-        fcf_chart = fcf_chart.set_index('Calendar_Year')
-        fcf_chart.columns = ['Levered FCF', 'Balance FCF']
-        st.bar_chart(fcf_chart)
-
-        st.markdown('<div class="section-title">🏦 Debt Schedule</div>', unsafe_allow_html=True)
-        debt_display = df[['Calendar_Year', 'Beginning_Debt', 'Interest',
-                           'Mandatory_Debt_Payment', 'Ending_Debt']].copy()
-        debt_display.columns = ['Year', 'Beginning Debt', 'Interest', 'Mandatory Repayment', 'Ending Debt']
-        for col in debt_display.columns:
-            if col != 'Year':
-                debt_display[col] = debt_display[col].apply(lambda x: f"{x:,.0f}")
-        st.dataframe(debt_display, use_container_width=True, hide_index=True)
-
-        st.markdown('<div class="section-title">📉 Debt vs Accumulated FCF</div>', unsafe_allow_html=True)
-        debt_chart = df[['Calendar_Year', 'Ending_Debt', 'Accumulated_Balance_FCF']].copy()
-        debt_chart = debt_chart.set_index('Calendar_Year')
-        debt_chart.columns = ['Remaining Debt', 'Accumulated Balance FCF']
-        st.line_chart(debt_chart)
+    with tab3, profiler.section('tab3 FCF & Debt Schedule'):
+        if tab_is_open(tab3):
+            st.markdown('<div class="section-title">💰 Levered Free Cash Flow</div>', unsafe_allow_html=True)
+            df = labelled_frame(projection, frequency)
+            fcf_display = df[['Calendar_Year', 'Net_Income', 'Depreciation', 'NWC_Change',
+                              'Levered_FCF', 'Mandatory_Debt_Payment',
+                              'Balance_FCF', 'Accumulated_Balance_FCF']].copy()
+            fcf_display.insert(3, 'CapEx', model.capex / model.periods_per_year)
+            fcf_display.columns = ['Year', 'Net Income', '+ Depreciation', 'Less: Chg NWC',
+                                   '- CapEx', 'Levered FCF', '- Debt Repay',
+                                   'Balance FCF', 'Accum Bal FCF']
+            st.dataframe(fcf_display, use_container_width=True, hide_index=True,
+                         column_config=number_columns(fcf_display.columns, labels=frequency != 'annual'))
+
+            st.markdown('<div class="section-title">📈 FCF Components</div>', unsafe_allow_html=True)
+            fcf_chart = df[['Calendar_Year', 'Levered_FCF', 'Balance_FCF']].copy()
+            fcf_chart = fcf_chart.set_index('Calendar_Year')
+            fcf_chart.columns = ['Levered FCF', 'Balance FCF']
+            with profiler.section('chart'):
+                st.bar_chart(fcf_chart)
+
+            st.markdown('<div class="section-title">🏦 Debt Schedule</div>', unsafe_allow_html=True)
+            debt_display = df[['Calendar_Year', 'Beginning_Debt', 'Interest',
+                               'Mandatory_Debt_Payment', 'Ending_Debt']].copy()
+            debt_display.columns = ['Year', 'Beginning Debt', 'Interest', 'Mandatory Repayment', 'Ending Debt']
+            st.dataframe(debt_display, use_container_width=True, hide_index=True,
+                         column_config=number_columns(debt_display.columns, labels=frequency != 'annual'))
+
+            st.markdown('<div class="section-title">📉 Debt vs Accumulated FCF</div>', unsafe_allow_html=True)
+            debt_chart = df[['Calendar_Year', 'Ending_Debt', 'Accumulated_Balance_FCF']].copy()
+            debt_chart = debt_chart.set_index('Calendar_Year')
+            debt_chart.columns = ['Remaining Debt', 'Accumulated Balance FCF']
+            with profiler.section('chart_debt'):
+                st.line_chart(debt_chart)
+
+            st.markdown('<div class="section-title">📏 Covenant Compliance</div>', unsafe_allow_html=True)
+            with profiler.section('covenants'):
+                covenant_display, first_breach = covenant_table(cache, params, covenants, frequency, start_year)
+            breached = {name: period for name, period in first_breach.items() if period}
+            if breached:
+                st.error("❌ Breach: " + ", ".join(
+                    f"{name} in {covenant_display['Year'].iloc[period - 1]}" for name, period in breached.items()))
+            else:
+                st.success("✅ All covenants met in every period")
+            st.dataframe(covenant_display, use_container_width=True, hide_index=True,
+                         column_config=number_columns([], labels=frequency != 'annual'))
 
     # TAB 4 - EXIT & RETURNS (CORRECTED)
-    with tab4:
-        st.markdown('<div class="section-title">🎯 Exit & Returns Analysis</div>', unsafe_allow_html=True)
-
-        st.markdown(f"""
-        <div class="fix-banner">
-            <strong>✅ CORRECTED FORMULA:</strong><br>
-            Equity Value at Exit = Exit EV <strong>+ Sum of Balance FCF</strong> − Remaining Debt<br>
-            <span style="font-size:0.85rem; opacity:0.9;">
-                The accumulated Balance FCF (cash generated after mandatory debt repayments)
-                is added to exit proceeds.</span>
-        </div>
-        """, unsafe_allow_html=True)
-
-        c1, c2, c3 = st.columns(3)
-        with c1:
-            st.markdown(f'<div class="metric-card"><div class="label">MOIC</div>'
-                        f'<div class="value">{returns["moic"]:.2f}x</div></div>', unsafe_allow_html=True)
-        with c2:
-            st.markdown(f'<div class="metric-card"><div class="label">IRR</div>'
-                        f'<div class="value">{returns["irr"] * 100:.1f}%</div></div>', unsafe_allow_html=True)
-        with c3:
-            status = "✅ ATTRACTIVE" if returns['irr'] >= 0.25 else (
-                "⚠️ MARGINAL" if returns['irr'] >= 0.15 else "❌ WEAK")
-            st.markdown(f'<div class="metric-card"><div class="label">Deal Quality</div>'
-                        f'<div class="value">{status}</div></div>', unsafe_allow_html=True)
-
-        st.markdown('<div class="section-title">📋 Exit Calculation Waterfall</div>', unsafe_allow_html=True)
-        st.dataframe(pd.DataFrame({
-            'Metric': [
-                'Exit Year EBITDA', 'Exit Multiple', 'Exit Enterprise Value',
-                '➕ Accumulated Balance FCF', '➖ Remaining Debt',
-                '= Equity Value at Exit', '',
-                'Sponsor Equity Invested', 'MOIC', 'IRR',
-            ],
-            'Value': [
-                fmt_m(returns['exit_ebitda']), f"{model.exit_multiple:.1f}x",
-                fmt_m(returns['exit_ev']),
-                fmt_m(returns['accumulated_fcf']),
-                fmt_m(returns['remaining_debt']),
-                fmt_m(returns['equity_proceeds']), '',
-                fmt_m(model.equity),
-                f"{returns['moic']:.2f}x", f"{returns['irr'] * 100:.1f}%",
-            ],
-        }), use_container_width=True, hide_index=True)
-
-        st.markdown(f"""
-        <div class="formula-box">
-            <strong>Exit Equity Value Calculation:</strong><br><br>
-            Exit EV = {fmt_m(returns['exit_ebitda'])} × {model.exit_multiple:.1f}x
-            = <strong>{fmt_m(returns['exit_ev'])}</strong><br><br>
-            Equity = {fmt_m(returns['exit_ev'])} + {fmt_m(returns['accumulated_fcf'])}
-            − {fmt_m(returns['remaining_debt'])}
-            = <strong>{fmt_m(returns['equity_proceeds'])}</strong><br><br>
-            MOIC = {fmt_m(returns['equity_proceeds'])} / {fmt_m(model.equity)}
-            = <strong>{returns['moic']:.2f}x</strong><br>
-            IRR = ({returns['moic']:.2f})^(1/{model.hold_years}) − 1
-            = <strong>{returns['irr'] * 100:.1f}%</strong>
-        </div>
-        """, unsafe_allow_html=True)
-
-        wrong_eq = returns['exit_ev'] - returns['remaining_debt']
-        wrong_moic = wrong_eq / model.equity if model.equity > 0 else 0
-        wrong_irr = (wrong_moic ** (1 / model.hold_years)) - 1 if wrong_moic > 0 else 0
-
-        st.markdown(f"""
-
-        """, unsafe_allow_html=True)
-
-        st.markdown('<div class="section-title">📊 Returns Attribution Bridge</div>', unsafe_allow_html=True)
-        bridge_data = pd.DataFrame({
-            'Value': [
-                returns['debt_paydown'],
-                returns['ebitda_growth_value'],
-                returns['multiple_expansion_value'],
-                returns['fcf_contribution'],
-            ]
-        }, index=['Debt Paydown', 'EBITDA Growth', 'Multiple Expansion', 'Accumulated FCF'])
-        st.bar_chart(bridge_data)
+    with tab4, profiler.section('tab4 Exit & Returns'):
+        if tab_is_open(tab4):
+            from lbo import export_returns, goal_seek, goal_seek_batch
+
+            st.markdown('<div class="section-title">🎯 Exit & Returns Analysis</div>', unsafe_allow_html=True)
+
+            st.markdown(f"""
+            <div class="fix-banner">
+                <strong>✅ CORRECTED FORMULA:</strong><br>
+                Equity Value at Exit = Exit EV <strong>+ Sum of Balance FCF</strong> − Remaining Debt<br>
+                <span style="font-size:0.85rem; opacity:0.9;">
+                    The accumulated Balance FCF (cash generated after mandatory debt repayments)
+                    is added to exit proceeds.</span>
+            </div>
+            """, unsafe_allow_html=True)
+
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                st.markdown(f'<div class="metric-card"><div class="label">MOIC</div>'
+                            f'<div class="value">{returns["moic"]:.2f}x</div></div>', unsafe_allow_html=True)
+            with c2:
+                st.markdown(f'<div class="metric-card"><div class="label">IRR</div>'
+                            f'<div class="value">{returns["irr"] * 100:.1f}%</div></div>', unsafe_allow_html=True)
+            with c3:
+                status = "✅ ATTRACTIVE" if returns['irr'] >= ATTRACTIVE_IRR else (
+                    "⚠️ MARGINAL" if returns['irr'] >= MARGINAL_IRR else "❌ WEAK")
+                st.markdown(f'<div class="metric-card"><div class="label">Deal Quality</div>'
+                            f'<div class="value">{status}</div></div>', unsafe_allow_html=True)
+
+            st.markdown('<div class="section-title">📋 Exit Calculation Waterfall</div>', unsafe_allow_html=True)
+            st.dataframe(pd.DataFrame({
+                'Metric': [
+                    'Exit Year EBITDA', 'Exit Multiple', 'Exit Enterprise Value',
+                    '➕ Accumulated Balance FCF', '➖ Remaining Debt',
+                    '= Equity Value at Exit', '',
+                    'Sponsor Equity Invested', 'MOIC', 'IRR',
+                ],
+                'Value': [
+                    fmt_m(returns['exit_ebitda']), f"{model.exit_multiple:.1f}x",
+                    *format_millions([returns['exit_ev'], returns['accumulated_fcf'],
+                                      returns['remaining_debt'], returns['equity_proceeds']]), '',
+                    fmt_m(model.equity),
+                    f"{returns['moic']:.2f}x", f"{returns['irr'] * 100:.1f}%",
+                ],
+            }), use_container_width=True, hide_index=True)
+
+            st.markdown(f"""
+            <div class="formula-box">
+                <strong>Exit Equity Value Calculation:</strong><br><br>
+                Exit EV = {fmt_m(returns['exit_ebitda'])} × {model.exit_multiple:.1f}x
+                = <strong>{fmt_m(returns['exit_ev'])}</strong><br><br>
+                Equity = {fmt_m(returns['exit_ev'])} + {fmt_m(returns['accumulated_fcf'])}
+                − {fmt_m(returns['remaining_debt'])}
+                = <strong>{fmt_m(returns['equity_proceeds'])}</strong><br><br>
+                MOIC = {fmt_m(returns['equity_proceeds'])} / {fmt_m(model.equity)}
+                = <strong>{returns['moic']:.2f}x</strong><br>
+                IRR = ({returns['moic']:.2f})^(1/{model.hold_years}) − 1
+                = <strong>{returns['irr'] * 100:.1f}%</strong>
+            </div>
+            """, unsafe_allow_html=True)
+
+            wrong_eq = returns['exit_ev'] - returns['remaining_debt']
+            wrong_moic = wrong_eq / model.equity if model.equity > 0 else 0
+            wrong_irr = (wrong_moic ** (1 / model.hold_years)) - 1 if wrong_moic > 0 else 0
+
+            st.markdown(f"""
+
+            """, unsafe_allow_html=True)
+
+            st.markdown('<div class="section-title">📊 Returns Attribution Bridge</div>', unsafe_allow_html=True)
+            bridge_data = pd.DataFrame({
+                'Value': [
+                    returns['debt_paydown'],
+                    returns['ebitda_growth_value'],
+                    returns['multiple_expansion_value'],
+                    returns['fcf_contribution'],
+                ]
+            }, index=['Debt Paydown', 'EBITDA Growth', 'Multiple Expansion', 'Accumulated FCF'])
+            st.bar_chart(bridge_data)
+
+            st.markdown('<div class="section-title">🎯 Goal Seek</div>', unsafe_allow_html=True)
+            g1, g2 = st.columns(2)
+            with g1:
+                target_irr = st.number_input("Target IRR (%)", value=ATTRACTIVE_IRR * 100, step=1.0) / 100
+            with g2:
+                seek_label = st.selectbox("Solve For", list(GOAL_SEEK_PARAMS))
+            seek_param = GOAL_SEEK_PARAMS[seek_label]
+            solved = goal_seek(params, seek_param, target_irr, frequency=frequency)
+            if np.isnan(solved):
+                st.warning(f"⚠️ No {seek_label.lower()} reaches a {target_irr * 100:.1f}% IRR in the search range")
+            else:
+                solved_text = {
+                    'purchase_price': f"{fmt_m(solved)} ({solved / model.entry_ebitda:.1f}x EBITDA)",
+                    'exit_multiple': f"{solved:.2f}x",
+                    'debt_pct': f"{solved * 100:.1f}%",
+                }[seek_param]
+                st.markdown(f'<div class="metric-card"><div class="label">{seek_label} for '
+                            f'{target_irr * 100:.1f}% IRR</div><div class="value">{solved_text}</div></div>',
+                            unsafe_allow_html=True)
+
+            st.markdown('<div class="section-title">📋 Max Entry Multiple: Target IRR × Exit Multiple</div>',
+                        unsafe_allow_html=True)
+            target_range = np.array([0.15, 0.20, 0.25, 0.30])
+            seek_exit_range = np.arange(8.0, 13.0, 1.0)
+            seek_targets, seek_exits = np.meshgrid(target_range, seek_exit_range, indexing='ij')
+            max_price, _ = goal_seek_batch(dict(params, exit_multiple=seek_exits.ravel()),
+                                           'purchase_price', seek_targets.ravel(), frequency=frequency)
+            max_entry = (max_price / model.entry_ebitda).reshape(seek_targets.shape)
+            max_entry_df = pd.DataFrame(format_multiple(max_entry, missing="—"),
+                                        index=format_pct(target_range, 0),
+                                        columns=format_multiple(seek_exit_range))
+            max_entry_df.index.name = "Target IRR ↓ / Exit Multiple →"
+            st.dataframe(max_entry_df, use_container_width=True)
+            export_button("⬇️ Download inputs and returns", 'export_returns',
+                          lambda buffer, fmt: export_returns(returns, buffer, inputs=params, fmt=fmt),
+                          'lbo_returns')
 
     # TAB 5 - SENSITIVITY
-    with tab5:
-        st.markdown('<div class="section-title">📈 Exit Multiple Sensitivity</div>', unsafe_allow_html=True)
-        sensitivity = []
-        for exit_m in np.arange(5.0, 12.5, 0.5):
-            exit_ev_s = returns['exit_ebitda'] * exit_m
-            eq_proc = exit_ev_s + returns['accumulated_fcf'] - returns['remaining_debt']
-            m = eq_proc / model.equity if model.equity > 0 else 0
-            i = (m ** (1 / model.hold_years)) - 1 if m > 0 else 0
-            sensitivity.append({
-                'Exit Multiple': f"{exit_m:.1f}x",
-                'Exit EV': fmt_m(exit_ev_s),
-                'Equity Value': fmt_m(eq_proc),
-                'MOIC': f"{m:.2f}x",
-                'IRR': f"{i * 100:.1f}%",
-                'Status': '✅' if i >= 0.25 else ('⚠️' if i >= 0.15 else '❌'),
-            })
-        st.dataframe(pd.DataFrame(sensitivity), use_container_width=True, hide_index=True)
-
-        st.markdown('<div class="section-title">📊 2D Sensitivity: Exit Multiple × EBITDA Margin</div>',
-                    unsafe_allow_html=True)
-        exit_range = np.arange(6.0, 11.0, 1.0)
-        margin_range = np.arange(0.20, 0.36, 0.03)
-        irr_matrix = []
-        for margin in margin_range:
-            row = []
-            for exit_m in exit_range:
-                tp = params.copy()
-                tp['ebitda_margin'] = margin
-                tp['exit_multiple'] = exit_m
-                tp['ltm_ebitda'] = ltm_revenue * margin
-                tm = LBOModel(tp)
-                tm.project()
-                tr = tm.get_returns()
-                row.append(f"{tr['irr'] * 100:.1f}%")
-            irr_matrix.append(row)
-        sens_2d = pd.DataFrame(irr_matrix,
-                               index=[f"{m * 100:.0f}%" for m in margin_range],
-                               columns=[f"{e:.1f}x" for e in exit_range])
-        sens_2d.index.name = "EBITDA Margin ↓ / Exit Multiple →"
-        st.dataframe(sens_2d, use_container_width=True)
-
-        st.markdown('<div class="section-title">🏆 Value Creation Summary</div>', unsafe_allow_html=True)
-        st.markdown(f"""
-        <div class="formula-box">
-            <strong>Entry Equity:</strong> {fmt_m(model.equity)}<br><br>
-            <strong>Value Drivers:</strong><br>
-            • Debt Paydown: {fmt_m(returns['debt_paydown'])}<br>
-            • EBITDA Growth: {((returns['exit_ebitda'] / model.entry_ebitda) - 1) * 100:.1f}%
-              ({fmt_m(model.entry_ebitda)} → {fmt_m(returns['exit_ebitda'])})<br>
-            • Multiple Expansion: {model.purchase_price / model.entry_ebitda:.1f}x → {model.exit_multiple:.1f}x<br>
-            • Accumulated Balance FCF: {fmt_m(returns['accumulated_fcf'])}<br><br>
-            <strong>Exit Equity:</strong> {fmt_m(returns['equity_proceeds'])}<br>
-            <strong>Total Value Created:</strong>
-            {fmt_m(returns['equity_proceeds'] - model.equity)}
-            ({((returns['equity_proceeds'] / model.equity) - 1) * 100:.0f}%)
-        </div>
-        """, unsafe_allow_html=True)
+    with tab5, profiler.section('tab5 Sensitivity'):
+        if tab_is_open(tab5):
+            from lbo import export_grid
+
+            st.markdown('<div class="section-title">📈 Exit Multiple Sensitivity</div>', unsafe_allow_html=True)
+            misses_before = cache.stats()['misses']
+            with profiler.section('tables'):
+                exit_table, sens_2d = sensitivity_tables(cache, params, model, returns, frequency)
+            profiler.count('sensitivity_evaluations', cache.stats()['misses'] - misses_before)
+            st.dataframe(exit_table, use_container_width=True, hide_index=True)
+
+            st.markdown('<div class="section-title">📊 2D Sensitivity: Exit Multiple × EBITDA Margin</div>',
+                        unsafe_allow_html=True)
+            st.dataframe(sens_2d, use_container_width=True)
+            export_button("⬇️ Download grid (every return metric)", 'export_grid',
+                          lambda buffer, fmt: export_grid(
+                              cache.grid(params, 'ebitda_margin', SENSITIVITY_MARGINS,
+                                         'exit_multiple', SENSITIVITY_EXITS, frequency),
+                              'ebitda_margin', SENSITIVITY_MARGINS, 'exit_multiple', SENSITIVITY_EXITS,
+                              buffer, fmt), 'lbo_sensitivity_grid')
+
+            st.markdown('<div class="section-title">🌪️ Tornado: One-at-a-Time IRR Impact</div>',
+                        unsafe_allow_html=True)
+            flex = st.slider("Flex each input by (±%)", 5, 30, 10, 5, key='tornado_flex') / 100
+            with profiler.section('tornado'):
+                swings = cache.tornado(params, pct=flex, frequency=frequency)
+            labels = [PARAM_LABELS[p] for p in swings['param']]
+            base_irr = swings['base']['irr']
+            tornado_chart = pd.DataFrame({
+                f'-{flex:.0%}': (swings['irr_low'] - base_irr) * 100,
+                f'+{flex:.0%}': (swings['irr_high'] - base_irr) * 100,
+            }, index=labels)
+            tornado_chart.index.name = 'Input'
+            st.bar_chart(tornado_chart, horizontal=True, sort=False, y_label='IRR change (pp)',
+                         color=[COLORS['accent_gold'], COLORS['medium_blue']])
+            st.dataframe(pd.DataFrame({
+                'Input': labels,
+                'IRR Low': format_pct(swings['irr_low']),
+                'IRR High': format_pct(swings['irr_high']),
+                'IRR Swing': format_pct(swings['irr_swing']),
+                'MOIC Low': format_multiple(swings['moic_low'], 2),
+                'MOIC High': format_multiple(swings['moic_high'], 2),
+            }), use_container_width=True, hide_index=True)
+
+            st.markdown('<div class="section-title">📐 Return Sensitivities: Analytic Derivatives</div>',
+                        unsafe_allow_html=True)
+            with profiler.section('greeks'):
+                slopes = cache.greeks(params, frequency=frequency)
+            shown = [j for j, p in enumerate(slopes['param']) if p in PARAM_LABELS]
+            names = slopes['param'][shown]
+            # Change for a +1% move in each input, so the rows are comparable
+            bump = 0.01 * np.abs(np.array([float(params[p]) for p in names]))
+            st.caption("Exact slopes of IRR and MOIC at the current inputs, every input from one "
+                       "projection (no re-runs); the first-order change a small move would make.")
+            st.dataframe(pd.DataFrame({
+                'Input': [PARAM_LABELS[p] for p in names],
+                'IRR Δ for +1% (pp)': format_number(slopes['d_irr'][0, shown] * bump * 100, 3),
+                'MOIC Δ for +1%': format_number(slopes['d_moic'][0, shown] * bump, 4),
+            }), use_container_width=True, hide_index=True)
+
+            st.markdown('<div class="section-title">🎯 Global Sensitivity: Sobol Indices</div>',
+                        unsafe_allow_html=True)
+            c1, c2 = st.columns(2)
+            with c1:
+                sobol_flex = st.slider("Range for every input (±%)", 5, 30, 10, 5, key='sobol_flex') / 100
+            with c2:
+                sobol_n = st.selectbox("Base samples", [1024, 4096, 16384], index=1,
+                                       format_func=lambda n: f"{n:,}", key='sobol_n')
+            with profiler.section('sobol'):
+                indices = cache.sobol(params, n=sobol_n, pct=sobol_flex, frequency=frequency)
+            labels = [PARAM_LABELS[p] for p in indices['param']]
+            st.caption(f"All inputs flexed together, uniform on ±{sobol_flex:.0%}: "
+                       f"{indices['evaluations']:,} scenarios. First-order is an input's share of IRR "
+                       f"variance on its own; total-order adds its interactions with the others.")
+            sobol_chart = pd.DataFrame({'First-order': indices['irr_first'],
+                                        'Total-order': indices['irr_total']}, index=labels)
+            sobol_chart.index.name = 'Input'
+            st.bar_chart(sobol_chart, horizontal=True, sort=False, stack=False, y_label='Share of IRR variance',
+                         color=[COLORS['accent_gold'], COLORS['medium_blue']])
+            st.dataframe(pd.DataFrame({
+                'Input': labels,
+                'IRR First-Order': np.char.add(format_number(indices['irr_first'], 3),
+                                               np.char.add(' ± ', format_number(indices['irr_first_conf'], 3))),
+                'IRR Total-Order': np.char.add(format_number(indices['irr_total'], 3),
+                                               np.char.add(' ± ', format_number(indices['irr_total_conf'], 3))),
+                'MOIC First-Order': format_number(indices['moic_first'], 3),
+                'MOIC Total-Order': format_number(indices['moic_total'], 3),
+            }), use_container_width=True, hide_index=True)
+
+            st.markdown('<div class="section-title">🏆 Value Creation Summary</div>', unsafe_allow_html=True)
+            st.markdown(f"""
+            <div class="formula-box">
+                <strong>Entry Equity:</strong> {fmt_m(model.equity)}<br><br>
+                <strong>Value Drivers:</strong><br>
+                • Debt Paydown: {fmt_m(returns['debt_paydown'])}<br>
+                • EBITDA Growth: {((returns['exit_ebitda'] / model.entry_ebitda) - 1) * 100:.1f}%
+                  ({fmt_m(model.entry_ebitda)} → {fmt_m(returns['exit_ebitda'])})<br>
+                • Multiple Expansion: {model.purchase_price / model.entry_ebitda:.1f}x → {model.exit_multiple:.1f}x<br>
+                • Accumulated Balance FCF: {fmt_m(returns['accumulated_fcf'])}<br><br>
+                <strong>Exit Equity:</strong> {fmt_m(returns['equity_proceeds'])}<br>
+                <strong>Total Value Created:</strong>
+                {fmt_m(returns['equity_proceeds'] - model.equity)}
+                ({((returns['equity_proceeds'] / model.equity) - 1) * 100:.0f}%)
+            </div>
+            """, unsafe_allow_html=True)
+
+    # TAB 6 - MONTE CARLO
+    with tab6, profiler.section('tab6 Monte Carlo'):
+        if tab_is_open(tab6):
+            from lbo import MC_PARAMS, JobLimitError, export_table, simulation_job
+
+            jobs = get_job_queue()  # the worker pool starts on first use
+            st.markdown('<div class="section-title">🎲 Monte Carlo Returns Distribution</div>', unsafe_allow_html=True)
+            with st.form("monte_carlo"):
+                c1, c2, c3 = st.columns(3)
+                with c1:
+                    n_paths = st.selectbox("Paths", [10_000, 100_000, 250_000, 1_000_000], index=1,
+                                           format_func=lambda n: f"{n:,}")
+                    seed = st.number_input("Random Seed", value=42, step=1, format="%d")
+                with c2:
+                    growth_sd = st.number_input("Revenue Growth Std Dev (%)", value=2.0, step=0.5) / 100
+                    margin_sd = st.number_input("EBITDA Margin Std Dev (%)", value=2.0, step=0.5) / 100
+                    rate_sd = st.number_input("Interest Rate Std Dev (%)", value=1.0, step=0.25) / 100
+                with c3:
+                    exit_low = st.number_input("Exit Multiple Low", value=exit_multiple - 2.0, step=0.5)
+                    exit_high = st.number_input("Exit Multiple High", value=exit_multiple + 2.0, step=0.5)
+                    rho = st.slider("Growth ↔ Exit Multiple Correlation", -0.9, 0.9, 0.3, 0.1)
+                run_mc = st.form_submit_button("Run Simulation")
+
+            if run_mc:
+                distributions = {
+                    'revenue_growth': ('normal', revenue_growth, growth_sd),
+                    'ebitda_margin': ('normal', ebitda_margin, margin_sd),
+                    'exit_multiple': ('triangular', min(exit_low, exit_multiple), exit_multiple,
+                                      max(exit_high, exit_multiple)),
+                    'interest_rate': ('normal', interest_rate, rate_sd),
+                }
+                correlation = np.eye(len(MC_PARAMS))
+                correlation[0, 2] = correlation[2, 0] = rho
+                owner = st.session_state.setdefault('session_id', uuid.uuid4().hex)
+                request = dict(params=params, distributions=distributions, n_paths=n_paths,
+                               correlation=correlation, seed=int(seed), frequency=frequency,
+                               covenants=covenants)
+                try:
+                    st.session_state['mc_job'] = jobs.submit(simulation_job, cache=cache, owner=owner,
+                                                             name='Monte Carlo', **request)
+                    st.session_state['mc_pending_request'] = request
+                    st.session_state.pop('mc_error', None)
+                    profiler.count('monte_carlo_paths', n_paths)
+                except JobLimitError as e:
+                    st.warning(f"⏳ {e}")
+
+            if 'mc_job' in st.session_state:
+                simulation_progress(jobs)
+            if 'mc_error' in st.session_state:
+                st.error(f"❌ {st.session_state['mc_error']}")
+
+            if 'mc_summary' in st.session_state:
+                summary = st.session_state['mc_summary']
+                simulation_cards(summary)
+
+                st.dataframe(pd.DataFrame({
+                    'Percentile': [f"P{p}" for p in summary['percentiles']],
+                    'IRR': format_pct(summary['irr_percentiles']),
+                    'MOIC': format_multiple(summary['moic_percentiles'], 2),
+                }), use_container_width=True, hide_index=True)
+
+                if 'covenants' in summary:
+                    st.markdown('<div class="section-title">📏 Covenant Breach Probability</div>',
+                                unsafe_allow_html=True)
+                    breach = summary['covenants']
+                    st.dataframe(pd.DataFrame({
+                        'Covenant': [name if name != 'any' else 'Any covenant' for name in breach],
+                        'P(Breach)': format_pct([b['breach_probability'] for b in breach.values()]),
+                        'Min Headroom P5': format_pct([b['min_headroom_p5'] for b in breach.values()]),
+                        'Min Headroom P50': format_pct([b['min_headroom_p50'] for b in breach.values()]),
+                    }), use_container_width=True, hide_index=True)
+
+                st.markdown('<div class="section-title">📊 IRR Distribution</div>', unsafe_allow_html=True)
+                st.bar_chart(st.session_state['mc_histogram'])
+                # Seeded runs come back from the model cache (or are re-simulated identically)
+                request = st.session_state['mc_request']
+                export_button(f"⬇️ Download {request['n_paths']:,} simulated paths", 'export_simulation',
+                              lambda buffer, fmt: export_table(cache.simulate(**request), buffer, fmt,
+                                                               sheet='Paths'), 'lbo_monte_carlo')
+
+    # TAB 7 - PORTFOLIO
+    with tab7, profiler.section('tab7 Portfolio'):
+        if tab_is_open(tab7):
+            from lbo import Portfolio, sample_portfolio
+
+            st.markdown('<div class="section-title">🗂️ Fund Portfolio Under Macro Shocks</div>',
+                        unsafe_allow_html=True)
+            upload = st.file_uploader("Deals CSV: one row per deal with the model inputs as columns "
+                                      "(optional 'name' and 'vintage')", type='csv')
+            deals, names, vintages = None, None, None
+            if upload is not None:
+                deals = pd.read_csv(upload)
+                if 'ltm_ebitda' not in deals and {'ltm_revenue', 'ebitda_margin'} <= set(deals):
+                    deals['ltm_ebitda'] = deals['ltm_revenue'] * deals['ebitda_margin']
+                missing = [k for k in PARAM_KEYS if k not in deals]
+                if missing:
+                    st.error(f"❌ Missing columns: {', '.join(missing)}")
+                    deals = None
+                else:
+                    names = deals['name'] if 'name' in deals else None
+                    vintages = deals['vintage'] if 'vintage' in deals else None
+            else:
+                n_deals = st.slider("Sample Portfolio Size (deals around the sidebar inputs)",
+                                    100, 2000, 500, 100)
+                deals, vintages = sample_portfolio(params, n_deals)
+
+            c1, c2, c3, c4 = st.columns(4)
+            with c1:
+                rate_shift = st.number_input("Rate Shock (bp)", value=200, step=25) / 10_000
+            with c2:
+                exit_shift = st.number_input("Exit Multiple Shock (x)", value=-1.0, step=0.5)
+            with c3:
+                growth_shift = st.number_input("Growth Shock (pp)", value=-3.0, step=0.5) / 100
+            with c4:
+                risk_irr = st.number_input("At Risk Below IRR (%)", value=0.0, step=1.0) / 100
+            count_breaches = st.checkbox("Covenant breach also counts as at risk", value=True)
+
+            if deals is not None:
+                shocks = {
+                    'Base': {},
+                    f'Rates {rate_shift * 10_000:+.0f}bp': {'interest_rate': rate_shift},
+                    f'Exit {exit_shift:+.1f}x': {'exit_multiple': exit_shift},
+                    f'Growth {growth_shift * 100:+.1f}pp': {'revenue_growth': growth_shift},
+                    'Combined': {'interest_rate': rate_shift, 'exit_multiple': exit_shift,
+                                 'revenue_growth': growth_shift},
+                }
+                try:
+                    with profiler.section('portfolio'):
+                        portfolio = Portfolio(deals, names=names, vintages=vintages, frequency=frequency)
+                        stress = portfolio.stress(shocks, hurdle=risk_irr,
+                                                  covenants=covenants if count_breaches else None)
+                    profiler.count('portfolio_deal_evaluations', portfolio.n * len(shocks))
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                    stress = None
+
+            if deals is not None and stress is not None:
+                st.dataframe(pd.DataFrame({
+                    'Scenario': stress['scenarios'],
+                    'Pooled IRR': format_pct(stress['pooled_irr']),
+                    'Pooled MOIC': format_multiple(stress['pooled_moic'], 2),
+                    'Deals at Risk': [f"{k:,} / {portfolio.n:,}" for k in stress['deals_at_risk']],
+                    'Net Fund Cash': format_millions(stress['fund_cash_flows'].sum(axis=1)),
+                }), use_container_width=True, hide_index=True)
+
+                st.markdown('<div class="section-title">💵 Fund Cash Flows by Year</div>', unsafe_allow_html=True)
+                fund_chart = pd.DataFrame(stress['fund_cash_flows'].T, columns=stress['scenarios'],
+                                          index=start_year + np.arange(stress['fund_cash_flows'].shape[1]))
+                fund_chart.index.name = 'Fund Year'
+                with profiler.section('chart_fund'):
+                    st.line_chart(fund_chart)
+
+                worst = int(np.argmin(stress['pooled_irr']))
+                st.markdown(f'<div class="section-title">⚠️ Deals at Risk: {stress["scenarios"][worst]}</div>',
+                            unsafe_allow_html=True)
+                at_risk = np.flatnonzero(stress['at_risk'][worst])
+                at_risk = at_risk[np.argsort(stress['irr'][worst, at_risk])]
+                st.dataframe(pd.DataFrame({
+                    'Deal': [portfolio.names[i] for i in at_risk],
+                    'Vintage': start_year + portfolio.vintages[at_risk],
+                    'Base IRR': format_pct(stress['irr'][0, at_risk]),
+                    'Stressed IRR': format_pct(stress['irr'][worst, at_risk]),
+                    'Stressed MOIC': format_multiple(stress['moic'][worst, at_risk], 2),
+                }), use_container_width=True, hide_index=True,
+                    column_config={'Vintage': st.column_config.NumberColumn('Vintage', format="%d")})
+
+    if profiler.enabled:
+        profiler.record_stats('model_cache', cache.stats())
+        profiler.record_stats('incremental_model', incremental.stats())
+        trace_path = os.environ.get('LBO_PROFILE_TRACE')
+        if trace_path:
+            profiler.append_trace(trace_path)
+        render_diagnostics(profiler)
 
     # Footer
     st.divider()
-    st.markdown(f"""
-    <div style="text-align:center; padding:1rem;">
-        <p style="color:{COLORS['accent_gold']}; font-family:'Playfair Display', serif; font-weight:700;">
-            {BRANDING['icon']} {BRANDING['name']}</p>
-        <p style="color:{COLORS['text_secondary']}; font-size:0.8rem;">
-            {BRANDING['instructor']} | {BRANDING['credentials']}</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
 
 
 if __name__ == '__main__':
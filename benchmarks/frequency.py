@@ -0,0 +1,65 @@
+"""
+Batch engine cost by projection frequency: annual vs quarterly vs monthly.
+
+    python benchmarks/frequency.py [--scenarios 10000] [--hold-years 10] [--max-ratio 1.5]
+
+A 10-year monthly batch projects 120 periods per scenario, 12x the annual
+work. The engine is vectorized over time, so the cost per scenario-period
+should stay flat: the check fails (exit status 1) when quarterly or monthly
+costs more than --max-ratio times the annual cost per scenario-period.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lbo import PERIODS_PER_YEAR, BatchLBOModel  # noqa: E402
+from suite import random_scenarios  # noqa: E402
+
+
+def measure(columns, frequency, repeat):
+    BatchLBOModel(columns, frequency=frequency).get_returns()  # warm-up
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        BatchLBOModel(columns, frequency=frequency).get_returns()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--scenarios', type=int, default=10_000)
+    parser.add_argument('--hold-years', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-ratio', type=float, default=1.5,
+                        help="allowed per-period cost relative to annual (default 1.5)")
+    args = parser.parse_args(argv)
+
+    columns = random_scenarios(args.scenarios)
+    columns['hold_years'] = np.full(args.scenarios, float(args.hold_years))
+
+    print(f"{'frequency':<10} {'periods':>8} {'seconds':>10} {'vs annual':>10} {'ns/scenario-period':>20}")
+    per_period = {}
+    for frequency, ppy in PERIODS_PER_YEAR.items():
+        periods = args.hold_years * ppy
+        seconds = measure(columns, frequency, args.repeat)
+        per_period[frequency] = seconds / (args.scenarios * periods)
+        print(f"{frequency:<10} {periods:8d} {seconds:10.4f} "
+              f"{seconds / (per_period['annual'] * args.scenarios * args.hold_years):9.1f}x "
+              f"{per_period[frequency] * 1e9:20.1f}")
+
+    failures = [f for f, cost in per_period.items() if cost > per_period['annual'] * args.max_ratio]
+    for frequency in failures:
+        print(f"REGRESSION {frequency}: {per_period[frequency] / per_period['annual']:.2f}x the annual "
+              f"cost per scenario-period (limit {args.max_ratio:.2f}x)")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Cold import time of the engine vs. the Streamlit app stack.
+
+    python benchmarks/import_time.py [--repeat 7]
+
+Each measurement runs in a fresh interpreter. Exits non-zero if importing the
+engine drags in Streamlit or pandas.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    'lbo.engine': 'import lbo.engine',
+    'lbo': 'import lbo',
+    'app stack (streamlit + pandas + lbo)': 'import streamlit, pandas, lbo',
+}
+
+PROBE = """
+import sys, time, json
+t = time.perf_counter()
+{stmt}
+elapsed = time.perf_counter() - t
+print(json.dumps({{'seconds': elapsed, 'heavy': sorted(m for m in ('streamlit', 'pandas') if m in sys.modules)}}))
+"""
+
+
+def measure(stmt, repeat):
+    samples, heavy = [], []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', PROBE.format(stmt=stmt)], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout
+        result = json.loads(out)
+        samples.append(result['seconds'])
+        heavy = result['heavy']
+    return statistics.median(samples), heavy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    ok = True
+    for name, stmt in TARGETS.items():
+        seconds, heavy = measure(stmt, args.repeat)
+        print(f"{name:<40} {seconds * 1000:8.1f} ms   heavy modules: {', '.join(heavy) or '-'}")
+        if name.startswith('lbo') and heavy:
+            ok = False
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Per-scenario time and allocation of the scalar projection: the old
+list-of-dicts -> DataFrame path vs. the columnar Projection store.
+
+    python benchmarks/projection_store.py [--scenarios 2000] [--hold-years 5]
+
+Allocation is the tracemalloc peak per scenario (over up to 200 runs); time
+is perf_counter. Both paths price the exit off the final projection row.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lbo import LBOModel  # noqa: E402
+
+BASE_PARAMS = {
+    'purchase_price': 100e6, 'fee_pct': 0.02, 'debt_pct': 0.6,
+    'ltm_revenue': 100e6, 'ltm_ebitda': 25e6, 'ebitda_margin': 0.25,
+    'revenue_growth': 0.05, 'tax_rate': 0.25, 'capex': 5e6, 'depreciation': 3e6,
+    'nwc_pct': -0.01, 'interest_rate': 0.07, 'mandatory_repay_pct': 0.10,
+    'exit_multiple': 10.0, 'hold_years': 5,
+}
+
+
+class ListOfDictsModel(LBOModel):
+    """The pre-Projection implementation: one dict per year, then pd.DataFrame"""
+
+    def project(self):
+        import pandas as pd
+
+        results = []
+        current_debt = self.debt
+        prev_revenue = self.entry_revenue
+        accumulated_balance_fcf = 0.0
+        for year in range(1, self.hold_years + 1):
+            revenue = prev_revenue * (1 + self.revenue_growth)
+            ebitda = revenue * self.ebitda_margin
+            ebit = ebitda - self.depreciation
+            interest = current_debt * self.interest_rate
+            ebt = ebit - interest
+            tax = max(0, ebt * self.tax_rate)
+            net_income = ebt - tax
+            nwc_change = revenue * self.nwc_pct
+            fcf = net_income + self.depreciation - self.capex - nwc_change
+            mandatory_repay = current_debt * self.mandatory_repay_pct
+            balance_fcf = fcf - mandatory_repay
+            accumulated_balance_fcf += balance_fcf
+            ending_debt = current_debt - mandatory_repay
+            results.append({
+                'Year': year, 'Calendar_Year': 2024 + year - 1, 'Revenue': revenue,
+                'EBITDA': ebitda, 'Depreciation': self.depreciation, 'EBIT': ebit,
+                'Interest': interest, 'EBT': ebt, 'Tax': tax, 'Net_Income': net_income,
+                'NWC_Change': nwc_change, 'Levered_FCF': fcf,
+                'Mandatory_Debt_Payment': mandatory_repay, 'Balance_FCF': balance_fcf,
+                'Accumulated_Balance_FCF': accumulated_balance_fcf,
+                'Beginning_Debt': current_debt, 'Ending_Debt': ending_debt,
+            })
+            current_debt = ending_debt
+            prev_revenue = revenue
+        self.legacy_df = pd.DataFrame(results)
+        return self.legacy_df
+
+    def get_returns(self):
+        final = self.project().iloc[-1]
+        exit_ev = final['EBITDA'] * self.exit_multiple
+        return {'equity_proceeds': exit_ev + final['Accumulated_Balance_FCF'] - final['Ending_Debt']}
+
+
+def legacy(params):
+    return ListOfDictsModel(params).get_returns()
+
+
+def columnar(params):
+    return LBOModel(params).get_returns()
+
+
+def columnar_with_frame(params):
+    model = LBOModel(params)
+    model.run().frame()
+    return model.get_returns()
+
+
+CASES = {
+    'list-of-dicts + DataFrame (before)': legacy,
+    'Projection store, returns only': columnar,
+    'Projection store + lazy frame()': columnar_with_frame,
+}
+
+
+def measure(fn, scenarios, params):
+    fn(params)  # warm imports
+    start = time.perf_counter()
+    for _ in range(scenarios):
+        fn(params)
+    seconds = (time.perf_counter() - start) / scenarios
+
+    tracemalloc.start()
+    sample = min(scenarios, 200)
+    peak = 0
+    for _ in range(sample):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        fn(params)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--scenarios', type=int, default=2000)
+    parser.add_argument('--hold-years', type=int, default=5)
+    args = parser.parse_args(argv)
+    params = dict(BASE_PARAMS, hold_years=args.hold_years)
+
+    print(f"{'path':<38} {'us/scenario':>12} {'peak KiB/scenario':>18}")
+    for name, fn in CASES.items():
+        seconds, peak = measure(fn, args.scenarios, params)
+        print(f"{name:<38} {seconds * 1e6:12.1f} {peak / 1024:18.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
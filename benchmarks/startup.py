@@ -0,0 +1,119 @@
+"""
+Cold start and per-rerun overhead of the Streamlit app.
+
+    python benchmarks/startup.py [--repeat 5] [--reruns 20]
+    python benchmarks/startup.py --save benchmarks/startup.json     # record a baseline
+    python benchmarks/startup.py --compare benchmarks/startup.json  # fail on regressions
+
+Each sample runs in a fresh interpreter, as a new container would:
+
+    import      `import app`: Streamlit, pandas, the engine and app.py's module level
+    first run   the script's first run through streamlit.testing.v1.AppTest
+                (the page a new session sees, default tab)
+    cold        import + first run
+    rerun       best of --reruns further runs with nothing changed: the
+                fixed cost every interaction pays, as AppTest sees it (this
+                includes AppTest parsing the page it gets back)
+    script      main()'s own time in those reruns, from the app's
+                RerunProfiler trace (LBO_PROFILE=1): the server-side part
+
+and reports the best of --repeat samples (machine load only ever adds time),
+plus how many lbo modules the first page needed. With --compare, a metric regresses when it exceeds the
+baseline by more than --threshold (default 25%); the exit status is then 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METRICS = ('import', 'first_run', 'cold', 'rerun', 'script')
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app  # noqa: F401
+imported = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({script!r}, default_timeout=120)
+run_start = time.perf_counter()
+at.run()
+first = time.perf_counter()
+if at.exception:
+    sys.exit(str(at.exception))
+reruns = []
+for _ in range({reruns}):
+    t = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - t)
+with open({trace!r}) as f:
+    script = [json.loads(line)['total_seconds'] for line in f][1:]
+print(json.dumps({{
+    'import': imported - start, 'first_run': first - run_start,
+    'cold': (imported - start) + (first - run_start), 'rerun': min(reruns), 'script': min(script),
+    'lbo_modules': sorted(m for m in sys.modules if m.startswith('lbo.')),
+}}))
+"""
+
+
+def sample(reruns):
+    with tempfile.TemporaryDirectory() as tmp:
+        trace = os.path.join(tmp, 'trace.jsonl')
+        probe = PROBE.format(script=os.path.join(ROOT, 'app.py'), reruns=reruns, trace=trace)
+        env = dict(os.environ, LBO_PROFILE='1', LBO_PROFILE_TRACE=trace)
+        out = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, env=env, capture_output=True,
+                             text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    """Lines describing every metric that got slower than baseline"""
+    failures = []
+    for metric in METRICS:
+        base = baseline.get('metrics', {}).get(metric)
+        if base and results[metric] > base * (1 + threshold):
+            failures.append(f"{metric}: {results[metric] * 1000:.1f} ms vs baseline "
+                            f"{base * 1000:.1f} ms (+{results[metric] / base - 1:.0%})")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--repeat', type=int, default=5, help="fresh interpreters to sample (default 5)")
+    parser.add_argument('--reruns', type=int, default=20, help="warm reruns per sample (default 20)")
+    parser.add_argument('--save', metavar='JSON', help="write results as a baseline")
+    parser.add_argument('--compare', metavar='JSON', help="baseline to check against")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed fractional slowdown (default 0.25)")
+    args = parser.parse_args(argv)
+
+    samples = [sample(args.reruns) for _ in range(args.repeat)]
+    results = {m: min(s[m] for s in samples) for m in METRICS}
+    for metric in METRICS:
+        print(f"{metric:<12} {results[metric] * 1000:8.1f} ms")
+    modules = samples[-1]['lbo_modules']
+    print(f"lbo modules loaded by the first page: {len(modules)} ({', '.join(m[4:] for m in modules)})")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'metrics': results, 'lbo_modules': modules}, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            failures = compare(results, json.load(f), args.threshold)
+        for line in failures:
+            print(f"REGRESSION {line}")
+        if failures:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Benchmark and regression suite for the engine hot paths (no Streamlit needed).
+
+    python benchmarks/suite.py --save benchmarks/baseline.json     # record a baseline
+    python benchmarks/suite.py --compare benchmarks/baseline.json  # fail on regressions
+    python benchmarks/suite.py --quick --only grid                 # subset
+
+Each case reports its best-of-repeat wall time and tracemalloc peak (NumPy
+buffers included). With --compare, a case regresses when its time or peak
+memory exceeds the baseline by more than --threshold (default 25%); the
+exit status is then 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lbo import (  # noqa: E402
+    BatchLBOModel, Covenant, LBOModel, check_covenants, format_millions, format_number,
+    Portfolio, TORNADO_PARAMS, grid_sensitivity, run_parallel, sample_portfolio, sobol_indices, tornado,
+    greeks,
+)
+
+BASE_PARAMS = {
+    'purchase_price': 100e6, 'fee_pct': 0.02, 'debt_pct': 0.6,
+    'ltm_revenue': 100e6, 'ltm_ebitda': 25e6, 'ebitda_margin': 0.25,
+    'revenue_growth': 0.05, 'tax_rate': 0.25, 'capex': 5e6, 'depreciation': 3e6,
+    'nwc_pct': -0.01, 'interest_rate': 0.07, 'mandatory_repay_pct': 0.10,
+    'exit_multiple': 10.0, 'hold_years': 5,
+}
+
+BATCH_SIZES = (1_000, 100_000, 1_000_000)
+GRID_SIZES = (10, 100, 300)
+
+# Peaks below this are allocator noise and are not checked for regressions
+MIN_PEAK_BYTES = 1 << 20
+
+
+def random_scenarios(n, seed=0):
+    """Deterministic spread of deals around BASE_PARAMS"""
+    rng = np.random.default_rng(seed)
+    columns = {k: np.full(n, float(v)) for k, v in BASE_PARAMS.items()}
+    columns['purchase_price'] = rng.uniform(60e6, 160e6, n)
+    columns['debt_pct'] = rng.uniform(0.4, 0.8, n)
+    columns['ebitda_margin'] = rng.uniform(0.10, 0.50, n)
+    columns['revenue_growth'] = rng.uniform(0.01, 0.20, n)
+    columns['interest_rate'] = rng.uniform(0.03, 0.12, n)
+    columns['exit_multiple'] = rng.uniform(6.0, 14.0, n)
+    columns['hold_years'] = rng.integers(3, 8, n).astype(float)
+    columns['ltm_ebitda'] = columns['ltm_revenue'] * columns['ebitda_margin']
+    return columns
+
+
+def single_returns():
+    model = LBOModel(BASE_PARAMS)
+    model.run()
+    return model.get_returns()
+
+
+def single_project_frame():
+    model = LBOModel(BASE_PARAMS)
+    model.project()
+    return model.get_returns()
+
+
+def exit_sensitivity():
+    """Tab 5's 1-D exit multiple table: 15 exit multiples off one projection"""
+    model = BatchLBOModel(BASE_PARAMS)
+    return model.get_returns(exit_multiple=np.arange(6.0, 13.5, 0.5)[None, :])
+
+
+def build_cases(args):
+    """name -> (callable, repeat, scenarios per call)"""
+    margins = lambda k: np.linspace(0.10, 0.50, k)
+    cases = {
+        'single/run+returns': (single_returns, 200, 1),
+        'single/project+frame+returns': (single_project_frame, 50, 1),
+        'single/exit_sensitivity_15': (exit_sensitivity, 200, 15),
+        'single/tornado': (lambda: tornado(BASE_PARAMS), 200, 1 + 2 * len(TORNADO_PARAMS)),
+        'single/sobol_4096x13': (lambda: sobol_indices(BASE_PARAMS, n=4096), 5,
+                                 4096 * (len(TORNADO_PARAMS) + 2)),
+    }
+    values = random_scenarios(100_000)['purchase_price'] - 1.1e8
+    cases['format/number_100k'] = (lambda: format_number(values), 5, len(values))
+    cases['format/millions_100k'] = (lambda: format_millions(values), 5, len(values))
+    covenants = [Covenant('leverage', 'leverage', [6.0, 5.5, 5.0, 4.5]),
+                 Covenant('interest_cover', 'interest_cover', 2.0), Covenant('dscr', 'dscr', 1.2)]
+    screened = BatchLBOModel(random_scenarios(100_000))
+    screened.project()
+    cases['covenants/100k'] = (lambda: check_covenants(screened, covenants), 5, 100_000)
+    for n in (500, 5_000):
+        deals, vintages = sample_portfolio(BASE_PARAMS, n)
+        portfolio = Portfolio(deals, vintages=vintages)
+        cases[f'portfolio/{n}x5_shocks'] = (lambda p=portfolio: p.stress(), 10, n * 5)
+    greek_scenarios = random_scenarios(100_000)
+    cases['greeks/100k'] = (lambda: greeks(greek_scenarios), 5, 100_000)
+    ten_years = dict(random_scenarios(10_000), hold_years=10.0)
+    for frequency in ('annual', 'monthly'):
+        cases[f'frequency/{frequency}_10y_10k'] = (
+            lambda f=frequency: BatchLBOModel(ten_years, frequency=f).get_returns(), 5, 10_000)
+    for n in BATCH_SIZES:
+        if args.quick and n > 100_000:
+            continue
+        columns = random_scenarios(n)
+        fn = (lambda c=columns: run_parallel(c, workers=args.workers, chunk_size=args.chunk_size))
+        cases[f'batch/{n}'] = (fn, max(1, 30_000 // n) + 2, n)
+    for k in GRID_SIZES:
+        if args.quick and k > 100:
+            continue
+        repeat = 10 if k <= 100 else 3
+        exit_axis = np.linspace(6.0, 14.0, k)
+        growth_axis = np.linspace(0.01, 0.20, k)
+        cases[f'grid/{k}x{k}/margin_x_exit'] = (
+            lambda m=margins(k), e=exit_axis: grid_sensitivity(
+                BASE_PARAMS, 'ebitda_margin', m, 'exit_multiple', e), repeat, k * k)
+        cases[f'grid/{k}x{k}/margin_x_growth'] = (
+            lambda m=margins(k), g=growth_axis: grid_sensitivity(
+                BASE_PARAMS, 'ebitda_margin', m, 'revenue_growth', g), repeat, k * k)
+    return cases
+
+
+def measure(fn, repeat):
+    fn()  # warm-up: imports, caches
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def compare(results, baseline, threshold):
+    """Lines describing every case that got slower or heavier than baseline"""
+    failures = []
+    for name, result in results.items():
+        base = baseline.get('cases', {}).get(name)
+        if base is None:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            if metric == 'peak_bytes' and base[metric] < MIN_PEAK_BYTES:
+                continue
+            if base[metric] > 0 and result[metric] > base[metric] * (1 + threshold):
+                failures.append(f"{name}: {metric} {result[metric]:.4g} vs baseline "
+                                f"{base[metric]:.4g} (+{result[metric] / base[metric] - 1:.0%})")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--save', metavar='JSON', help="write results as a baseline")
+    parser.add_argument('--compare', metavar='JSON', help="baseline to check against")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed fractional slowdown / memory growth (default 0.25)")
+    parser.add_argument('--only', default='', help="run cases whose name contains this text")
+    parser.add_argument('--quick', action='store_true', help="skip the 1M batch and largest grid")
+    parser.add_argument('--workers', type=int, default=1, help="batch workers (default 1, inline)")
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'case':<36} {'seconds':>10} {'scen/sec':>12} {'peak KiB':>10}")
+    for name, (fn, repeat, scenarios) in build_cases(args).items():
+        if args.only not in name:
+            continue
+        seconds, peak = measure(fn, repeat)
+        results[name] = {'seconds': seconds, 'peak_bytes': peak,
+                         'scenarios_per_sec': scenarios / seconds}
+        print(f"{name:<36} {seconds:10.5f} {scenarios / seconds:12,.0f} {peak / 1024:10.1f}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'python': platform.python_version(), 'numpy': np.__version__,
+                       'machine': platform.machine(), 'cases': results}, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            failures = compare(results, json.load(f), args.threshold)
+        for line in failures:
+            print(f"REGRESSION {line}")
+        if failures:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+LBO model engine, independent of the Streamlit app.
+
+    from lbo import LBOModel, BatchLBOModel
+
+The engine core is imported eagerly; the rest (designs, portfolios,
+Monte Carlo, jobs, export, parallel batches, goal seek, debt tranches) is
+imported on first access, so `import lbo` stays cheap for scripts and for
+app sessions that never open those features.
+"""
+
+import importlib
+
+from .engine import (
+    ATTRACTIVE_IRR, MARGINAL_IRR, PARAM_KEYS, PERIOD_COLUMNS, PERIODS_PER_YEAR, PROJECTION_COLUMNS,
+    RETURN_KEYS, START_YEAR, BatchLBOModel, LBOModel, Projection, compound_rate, irr_from_moic,
+    to_columns,
+)
+from .sensitivity import EXIT_ONLY_PARAMS, TORNADO_PARAMS, grid_sensitivity, link_entry_ebitda, tornado
+# Eager although tab-only: the submodule shares the greeks() name, and any
+# `from .greeks import ...` would otherwise leave lbo.greeks bound to the module
+from .greeks import GREEK_PARAMS, greeks, rate_slope
+from .covenants import Covenant, breach_summary, check_covenants, covenant_metrics
+from .cache import ModelCache, params_key, value_nbytes
+from .incremental import STAGES, IncrementalModel, affected_stages
+from .profiling import RerunProfiler
+from .formatting import format_millions, format_multiple, format_number, format_pct
+
+# name -> submodule, imported by __getattr__ the first time the name is used
+_LAZY = {
+    **dict.fromkeys(('default_bounds', 'latin_hypercube', 'sample_design', 'sobol_indices',
+                     'sobol_sequence'), 'designs'),
+    **dict.fromkeys(('DEFAULT_SHOCKS', 'Portfolio', 'sample_portfolio'), 'portfolio'),
+    **dict.fromkeys(('MC_PARAMS', 'simulate_returns', 'summarize_simulation'), 'montecarlo'),
+    **dict.fromkeys(('DiskCache',), 'diskcache'),
+    **dict.fromkeys(('Cancelled', 'Job', 'JobLimitError', 'JobQueue', 'goal_seek_grid_job', 'grid_job',
+                     'simulation_job'), 'jobs'),
+    **dict.fromkeys(('available_workers', 'run_parallel'), 'parallel'),
+    **dict.fromkeys(('MIME_TYPES', 'ChunkWriter', 'available_formats', 'export_batch', 'export_grid',
+                     'export_projection', 'export_returns', 'export_table', 'write_chunks'), 'export'),
+    **dict.fromkeys(('npv', 'solve_irr'), 'irr'),
+    **dict.fromkeys(('DebtStructure', 'Tranche'), 'debt'),
+    **dict.fromkeys(('goal_seek', 'goal_seek_batch', 'goal_seek_grid'), 'goalseek'),
+}
+
+__all__ = [
+    'ATTRACTIVE_IRR', 'MARGINAL_IRR', 'PARAM_KEYS', 'PERIOD_COLUMNS', 'PERIODS_PER_YEAR',
+    'PROJECTION_COLUMNS', 'RETURN_KEYS', 'START_YEAR', 'BatchLBOModel', 'LBOModel', 'Projection',
+    'compound_rate', 'irr_from_moic', 'to_columns',
+    'EXIT_ONLY_PARAMS', 'TORNADO_PARAMS', 'grid_sensitivity', 'link_entry_ebitda', 'tornado',
+    'GREEK_PARAMS', 'greeks', 'rate_slope',
+    'Covenant', 'breach_summary', 'check_covenants', 'covenant_metrics',
+    'ModelCache', 'params_key', 'value_nbytes',
+    'STAGES', 'IncrementalModel', 'affected_stages',
+    'RerunProfiler',
+    'format_millions', 'format_multiple', 'format_number', 'format_pct',
+    *_LAZY,  # `from lbo import *` imports these submodules too
+]
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    submodule = _LAZY[name]
+    module = importlib.import_module(f'.{submodule}', __name__)
+    # Bind all of the submodule's names at once, after the import has set
+    # lbo.<submodule>, so none of them can be left shadowed by the module
+    globals().update({key: getattr(module, key) for key, mod in _LAZY.items() if mod == submodule})
+    return globals()[name]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,212 @@
+"""
+Memoized model evaluation keyed on a canonical params hash, with an
+optional lbo.diskcache.DiskCache behind it for array results
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .engine import START_YEAR, LBOModel
+from .sensitivity import grid_sensitivity, tornado
+
+
+def _canonical(value):
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+    return value
+
+
+def value_nbytes(value, _seen=None):
+    """
+    Approximate memory held by a cached value: the nbytes of every NumPy
+    array (and pandas memory_usage()) reachable through dicts, lists,
+    tuples and object attributes, each array counted once
+    """
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, 'memory_usage') and hasattr(value, 'dtypes'):  # pandas DataFrame / Series
+        return int(np.sum(value.memory_usage(deep=False)))
+    if isinstance(value, dict):
+        return sum(value_nbytes(v, seen) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(value_nbytes(v, seen) for v in value)
+    if isinstance(value, (str, bytes, int, float, bool, np.generic)) or value is None:
+        return 0
+    attrs = list(getattr(value, '__dict__', {}).values())
+    attrs += [getattr(value, k) for k in getattr(type(value), '__slots__', ()) if hasattr(value, k)]
+    return sum(value_nbytes(v, seen) for v in attrs)
+
+
+def params_key(*parts):
+    """
+    Canonical hash of params dicts and grid axes.
+    Numbers hash by value, so 5 and 5.0 (or np.float64(5)) share a key.
+    """
+    payload = json.dumps(_canonical(list(parts)), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ModelCache:
+    """
+    Thread-safe LRU cache of model evaluations keyed on params_key().
+    Bounded to maxsize entries and to max_bytes of arrays (value_nbytes()),
+    whichever binds first: a handful of million-path simulations would
+    otherwise fill a long-lived process long before the entry limit. A value
+    larger than max_bytes on its own is returned but not kept in memory.
+    With disk (an lbo.diskcache.DiskCache), grids, tornados, greeks and
+    simulations also persist across processes and restarts. hits count
+    lookups answered from memory, disk_hits those answered from disk, and
+    misses the rest, i.e. the number of compute() calls.
+    """
+
+    def __init__(self, maxsize=256, disk=None, max_bytes=512 << 20):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute, persist=False):
+        """
+        Memoized compute(). persist=True also reads and writes the disk cache
+        (if any); the value must then be a dict of arrays and scalars.
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+        value = None
+        if persist and self.disk is not None:
+            value = self.disk.get(key)
+        computed = value is None
+        if computed:
+            value = compute()
+            if persist and self.disk is not None:
+                self.disk.put(key, value)
+        nbytes = value_nbytes(value)
+        with self._lock:
+            if computed:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+            self._discard(key)
+            if nbytes <= self.max_bytes:
+                self._data[key] = value
+                self._sizes[key] = nbytes
+                self.bytes += nbytes
+                while len(self._data) > self.maxsize or self.bytes > self.max_bytes:
+                    self._discard(next(iter(self._data)))
+                    self.evictions += 1
+        return value
+
+    def _discard(self, key):
+        """Drop key if present; caller holds the lock"""
+        if key in self._data:
+            del self._data[key]
+            self.bytes -= self._sizes.pop(key)
+
+    def evaluate(self, params, incremental=None, frequency='annual', start_year=START_YEAR):
+        """
+        Cached (model, projection, returns) for one params dict; projection is
+        the columnar lbo.engine.Projection (projection.frame() for pandas).
+        On a miss, an lbo.incremental.IncrementalModel (if given) recomputes
+        only the stages invalidated since its previous params; it must have
+        been built with the same frequency and start_year.
+        """
+        def compute():
+            if incremental is not None:
+                return incremental.evaluate(params)
+            model = LBOModel(params, frequency=frequency, start_year=start_year)
+            return model, model.run(), model.get_returns()
+        key = params_key('model', params, frequency, start_year)
+        return self.get_or_compute(key, compute)
+
+    def grid(self, params, row_param, row_values, col_param, col_values, frequency='annual'):
+        """Cached grid_sensitivity(); the whole grid is one entry"""
+        key = params_key('grid', params, row_param, row_values, col_param, col_values, frequency)
+        return self.get_or_compute(key, lambda: grid_sensitivity(
+            params, row_param, row_values, col_param, col_values, frequency), persist=True)
+
+    def tornado(self, params, shocks=None, pct=0.10, frequency='annual'):
+        """Cached tornado(); one entry per params, shocks and flex"""
+        key = params_key('tornado', params, shocks or {}, pct, frequency)
+        return self.get_or_compute(key, lambda: tornado(params, shocks, pct, frequency=frequency),
+                                   persist=True)
+
+    def greeks(self, params, frequency='annual'):
+        """Cached greeks() of one params dict or a batch"""
+        from .greeks import greeks
+
+        key = params_key('greeks', params, frequency)
+        return self.get_or_compute(key, lambda: greeks(params, frequency), persist=True)
+
+    def sobol(self, params, bounds=None, n=4096, method='sobol', pct=0.10, frequency='annual'):
+        """Cached sobol_indices(); the design is seeded, so every run is reproducible"""
+        from .designs import sobol_indices
+
+        key = params_key('sobol', params, bounds or {}, n, method, pct, frequency)
+        return self.get_or_compute(
+            key, lambda: sobol_indices(params, bounds, n=n, method=method, pct=pct, frequency=frequency),
+            persist=True)
+
+    def simulate(self, params, distributions, n_paths=100_000, correlation=None, seed=None,
+                 frequency='annual', covenants=None, progress=None):
+        """
+        Cached simulate_returns(). Only seeded runs are reproducible, so
+        seed=None always simulates afresh. progress is passed through to a
+        fresh simulation and is not part of the key.
+        """
+        from .montecarlo import simulate_returns
+
+        def compute():
+            return simulate_returns(params, distributions, n_paths=n_paths, correlation=correlation,
+                                    seed=seed, frequency=frequency, covenants=covenants,
+                                    progress=progress)
+        if seed is None:
+            return compute()
+        key = params_key('simulate', params, distributions, n_paths, correlation, seed, frequency,
+                         [(c.name, c.metric, c.threshold) for c in covenants or ()])
+        return self.get_or_compute(key, compute, persist=True)
+
+    def stats(self):
+        with self._lock:
+            stats = {'hits': self.hits, 'misses': self.misses, 'disk_hits': self.disk_hits,
+                     'evictions': self.evictions, 'size': len(self._data), 'maxsize': self.maxsize,
+                     'bytes': self.bytes, 'max_bytes': self.max_bytes}
+        if self.disk is not None:
+            stats['disk'] = self.disk.stats()
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.bytes = 0
+            self.hits = self.misses = self.disk_hits = self.evictions = 0
@@ -0,0 +1,128 @@
+"""
+Headless batch runner: stream scenario rows through BatchLBOModel.
+
+    python -m lbo scenarios.csv -o results.csv
+    python -m lbo deals.parquet -o results.parquet --defaults base.json --chunk-size 200000
+    python -m lbo deals.parquet -o results.parquet --workers 8
+
+Each input row is one scenario. Columns missing from the file come from
+--defaults (a JSON params dict); ltm_ebitda falls back to
+ltm_revenue x ebitda_margin, as in the app sidebar. Rows are read, evaluated
+and written one chunk at a time, so memory stays flat whatever the file size.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from .engine import PARAM_KEYS, RETURN_KEYS
+from .export import FORMATS, ChunkWriter, detect_format, require_pyarrow
+from .parallel import WorkerStats, imap_returns
+
+
+def read_chunks(path, fmt, chunk_size):
+    """Yield DataFrames of at most chunk_size scenario rows"""
+    if fmt == 'parquet':
+        require_pyarrow()
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+
+    import pandas as pd
+
+    if fmt == 'csv':
+        reader = pd.read_csv(path, chunksize=chunk_size)
+    elif fmt == 'jsonl':
+        reader = pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        raise ValueError(f"Unknown input format '{fmt}'")
+    with reader:
+        yield from reader
+
+
+def frame_columns(frame, defaults):
+    """Struct-of-arrays params for one chunk of scenario rows"""
+    columns = {}
+    for key in PARAM_KEYS:
+        if key in frame.columns:
+            columns[key] = frame[key].to_numpy(dtype=float)
+        elif key in defaults:
+            columns[key] = np.full(len(frame), float(defaults[key]))
+    if 'ltm_ebitda' not in columns and {'ltm_revenue', 'ebitda_margin'} <= columns.keys():
+        columns['ltm_ebitda'] = columns['ltm_revenue'] * columns['ebitda_margin']
+    missing = [k for k in PARAM_KEYS if k not in columns]
+    if missing:
+        raise ValueError(f"Missing params (add columns or --defaults): {missing}")
+    return columns
+
+
+def run(input_path, output_path, defaults=None, chunk_size=100_000,
+        input_format=None, output_format=None, keep_inputs=True, log=None, workers=1):
+    """
+    Stream input_path through the engine into output_path.
+    Returns WorkerStats.summary() for the run (rows written, per-worker throughput).
+    """
+    defaults = defaults or {}
+    input_format = detect_format(input_path, input_format)
+    output_format = detect_format(output_path, output_format)
+    writer = ChunkWriter(output_path, output_format)
+    stats = WorkerStats()
+    start = time.perf_counter()
+    chunks = ((frame, frame_columns(frame, defaults))
+              for frame in read_chunks(input_path, input_format, chunk_size))
+    try:
+        for frame, returns in imap_returns(chunks, workers, stats=stats):
+            out = frame if keep_inputs else frame.iloc[:, :0]
+            out = out.assign(**{k: returns[k] for k in RETURN_KEYS})
+            writer.write(out)
+            if log:
+                elapsed = time.perf_counter() - start
+                log(f"{writer.rows:,} rows  {writer.rows / elapsed:,.0f} rows/s")
+    finally:
+        writer.close()
+    return stats.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m lbo', description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('input', help="Scenario file (.csv, .parquet, .jsonl)")
+    parser.add_argument('-o', '--output', required=True, help="Results file (.csv, .parquet, .jsonl)")
+    parser.add_argument('--defaults', help="JSON params dict for columns missing from the input")
+    parser.add_argument('--chunk-size', type=int, default=100_000, help="Rows per chunk (default 100000)")
+    parser.add_argument('--input-format', choices=sorted(set(FORMATS.values())))
+    parser.add_argument('--output-format', choices=sorted(set(FORMATS.values())))
+    parser.add_argument('--returns-only', action='store_true', help="Write only the returns columns")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes; 0 = all available cores (default 1)")
+    parser.add_argument('-q', '--quiet', action='store_true')
+    args = parser.parse_args(argv)
+
+    defaults = {}
+    if args.defaults:
+        with open(args.defaults) as f:
+            defaults = json.load(f)
+
+    log = None if args.quiet else (lambda msg: print(msg, file=sys.stderr))
+    try:
+        stats = run(args.input, args.output, defaults, args.chunk_size,
+                    args.input_format, args.output_format, not args.returns_only, log,
+                    args.workers or None)
+    except (ValueError, RuntimeError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    if log:
+        log(f"Wrote {stats['scenarios']:,} scenarios to {args.output} "
+            f"({stats['scenarios_per_sec']:,.0f}/s overall)")
+        for pid, worker in stats['per_worker'].items():
+            log(f"  worker {pid}: {worker['scenarios']:,} scenarios in {worker['chunks']} chunks, "
+                f"{worker['scenarios_per_sec']:,.0f}/s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
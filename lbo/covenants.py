@@ -0,0 +1,143 @@
+"""
+Financial covenants tested every period of every scenario in a batch.
+
+    covenants = [
+        Covenant('Max Leverage', 'leverage', [6.0, 5.5, 5.0, 4.5]),   # step-downs by hold year
+        Covenant('Min Interest Cover', 'interest_cover', 2.0),
+        Covenant('Min DSCR', 'dscr', 1.2),
+    ]
+    results = check_covenants(BatchLBOModel(scenarios), covenants)
+    results['Max Leverage']['first_breach']    # (n,) period of first breach, 0 if none
+
+Ratios use trailing-twelve-month flows against the period-end debt:
+    leverage        Ending_Debt / LTM EBITDA                        (maximum)
+    interest_cover  LTM EBITDA / LTM Interest                       (minimum)
+    dscr            LTM (Levered_FCF + Interest) / LTM (Interest + Mandatory_Debt_Payment)  (minimum)
+In the first year of a quarterly or monthly projection the year-to-date
+flows are annualised. Headroom is the distance to the threshold as a
+fraction of it (1 - value / threshold for a maximum, value / threshold - 1
+for a minimum): positive when compliant, negative in breach. Everything is
+whole-array arithmetic over (n_scenarios, n_periods); periods after exit
+are NaN and never breach.
+"""
+
+import numpy as np
+
+# metric -> 'max' (breach above threshold) or 'min' (breach below)
+METRICS = {'leverage': 'max', 'interest_cover': 'min', 'dscr': 'min'}
+
+
+class Covenant:
+    """
+    One maintenance covenant. threshold is a ratio, or a sequence of ratios
+    by year of the hold for step-downs (the last one holds thereafter).
+    """
+
+    def __init__(self, name, metric, threshold):
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {list(METRICS)}")
+        self.name = name
+        self.metric = metric
+        self.threshold = threshold
+
+    @property
+    def kind(self):
+        return METRICS[self.metric]
+
+    def thresholds(self, year):
+        """Threshold in force for each entry of the Year line"""
+        steps = np.atleast_1d(np.asarray(self.threshold, dtype=float))
+        return steps[np.minimum(year, len(steps)) - 1]
+
+
+def trailing_sum(line, periods):
+    """
+    Rolling sum over the last periods columns of an (n, n_periods) line;
+    the first periods - 1 columns are year-to-date sums scaled up to a year.
+    """
+    if periods == 1:
+        return line
+    total = np.cumsum(line, axis=1)
+    ltm = np.empty_like(total)
+    ltm[:, periods:] = total[:, periods:] - total[:, :-periods]
+    ltm[:, :periods] = total[:, :periods] * (periods / np.arange(1, min(periods, line.shape[1]) + 1))
+    return ltm
+
+
+def covenant_metrics(model):
+    """(n_scenarios, n_periods) leverage, interest cover and DSCR for a projected BatchLBOModel"""
+    if model.lines is None:
+        model.project()
+    lines, ppy = model.lines, model.periods_per_year
+    ebitda = trailing_sum(lines['EBITDA'], ppy)
+    interest = trailing_sum(lines['Interest'], ppy)
+    cash_flow = trailing_sum(lines['Levered_FCF'] + lines['Interest'], ppy)
+    debt_service = interest + trailing_sum(lines['Mandatory_Debt_Payment'], ppy)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            # Debt against nil or negative EBITDA is unbounded leverage
+            'leverage': np.where(ebitda > 0, lines['Ending_Debt'] / ebitda,
+                                 np.where(np.isnan(ebitda), np.nan, np.inf)),
+            'interest_cover': ebitda / interest,
+            'dscr': cash_flow / debt_service,
+        }
+
+
+def headroom(value, threshold, kind):
+    """Distance to threshold as a fraction of it (negative once breached)"""
+    if kind == 'max':
+        return 1 - value / threshold
+    return value / threshold - 1
+
+
+def check_covenants(model, covenants, metrics=None):
+    """
+    Test every covenant in every period of every scenario.
+    Returns {covenant name: {'value', 'headroom', 'breach'}} with (n, n_periods)
+    arrays plus per-scenario reductions: 'first_breach' (1-based period, 0 if
+    never), 'min_headroom' and 'breached'. An extra 'any' entry combines all
+    covenants. metrics (from covenant_metrics()) can be passed in to reuse them.
+    """
+    metrics = covenant_metrics(model) if metrics is None else metrics
+    year = model.lines['Year'][0]
+    results = {}
+    for covenant in covenants:
+        value = metrics[covenant.metric]
+        room = headroom(value, covenant.thresholds(year)[None, :], covenant.kind)
+        breach = room < 0
+        results[covenant.name] = {'value': value, 'headroom': room, 'breach': breach,
+                                  **_reduce(breach, room)}
+    if results:
+        breach = np.logical_or.reduce([r['breach'] for r in results.values()])
+        room = np.fmin.reduce([r['headroom'] for r in results.values()])
+        results['any'] = {'breach': breach, 'headroom': room, **_reduce(breach, room)}
+    return results
+
+
+def _reduce(breach, room):
+    breached = breach.any(axis=1)
+    with np.errstate(invalid='ignore'):
+        min_headroom = np.fmin.reduce(room, axis=1)
+    return {
+        'first_breach': np.where(breached, breach.argmax(axis=1) + 1, 0),
+        'min_headroom': min_headroom,
+        'breached': breached,
+    }
+
+
+def breach_summary(results):
+    """
+    Breach probability, mean first-breach period and min-headroom percentiles
+    per covenant, from check_covenants() output (or any dict of
+    first_breach / min_headroom arrays, as simulate_returns() keeps).
+    """
+    summary = {}
+    for name, r in results.items():
+        first = r['first_breach']
+        summary[name] = {
+            'breach_probability': float((first > 0).mean()) if len(first) else float('nan'),
+            'mean_first_breach': float(first[first > 0].mean()) if (first > 0).any() else float('nan'),
+            'min_headroom_p5': float(np.nanpercentile(r['min_headroom'], 5)),
+            'min_headroom_p50': float(np.nanpercentile(r['min_headroom'], 50)),
+        }
+    return summary
@@ -0,0 +1,170 @@
+"""
+Persistent, content-addressed cache of array results (grids, tornados,
+Monte Carlo runs) shared across sessions, restarts and processes.
+
+    disk = DiskCache('~/.cache/lbo', max_bytes=2 << 30)
+    ModelCache(disk=disk).grid(params, ...)    # computed once, then loaded from disk
+
+An entry is a directory named after the SHA-256 of ENGINE_VERSION and the
+params_key(), holding one .npy file per array plus a manifest.json for the
+dict structure and scalars. Arrays come back memory-mapped, read-only.
+Writers build an entry in a private temporary directory and rename it
+into place, so readers in other processes never see a half-written
+entry. Once the total size passes max_bytes, the least recently used
+entries (manifest mtime, touched on every hit) are evicted, never the one
+just written; a value whose arrays alone exceed max_bytes is not stored.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+
+import numpy as np
+
+from .engine import ENGINE_VERSION
+
+MANIFEST = 'manifest.json'
+
+
+def _encode(value, files):
+    """Manifest tree for a value; arrays are appended to files as (name, array)"""
+    if isinstance(value, dict):
+        return {'dict': {str(k): _encode(v, files) for k, v in value.items()}}
+    if isinstance(value, np.ndarray) and value.ndim > 0:
+        name = f"{len(files)}.npy"
+        files.append((name, value))
+        return {'npy': name}
+    if isinstance(value, (np.generic, np.ndarray)):
+        value = value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return {'json': value}
+    raise TypeError(f"DiskCache stores dicts of arrays and scalars, not {type(value).__name__}")
+
+
+def _decode(node, directory):
+    if 'dict' in node:
+        return {k: _decode(v, directory) for k, v in node['dict'].items()}
+    if 'npy' in node:
+        path = os.path.join(directory, node['npy'])
+        try:
+            return np.load(path, mmap_mode='r')
+        except ValueError:  # empty arrays cannot be mapped
+            return np.load(path)
+    return node['json']
+
+
+def _size(directory):
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+
+class DiskCache:
+    """
+    Directory of content-addressed entries, bounded to max_bytes.
+    Keys are params_key() strings; get() returns None on a miss.
+    """
+
+    def __init__(self, directory, max_bytes=1 << 30):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(self.directory, 'tmp'), exist_ok=True)
+
+    def path(self, key):
+        digest = hashlib.sha256(f"{ENGINE_VERSION}:{key}".encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get(self, key):
+        directory = self.path(key)
+        try:
+            with open(os.path.join(directory, MANIFEST)) as f:
+                manifest = json.load(f)
+            value = _decode(manifest['value'], directory)
+            os.utime(os.path.join(directory, MANIFEST))
+        except (OSError, ValueError, KeyError):
+            # Missing, or evicted by another process while we were reading
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store value (a dict of arrays and scalars) under key; first writer wins"""
+        files = []
+        manifest = {'engine_version': ENGINE_VERSION, 'key': key, 'value': _encode(value, files)}
+        if sum(array.nbytes for _, array in files) > self.max_bytes:
+            return  # it would only evict everything else, then itself
+        staging = os.path.join(self.directory, 'tmp', uuid.uuid4().hex)
+        os.makedirs(staging)
+        try:
+            for name, array in files:
+                np.save(os.path.join(staging, name), np.ascontiguousarray(array), allow_pickle=False)
+            with open(os.path.join(staging, MANIFEST), 'w') as f:
+                json.dump(manifest, f)
+            target = self.path(key)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                os.rename(staging, target)
+            except OSError:  # another process stored the same entry first
+                return
+            with self._lock:
+                self.writes += 1
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict(keep=target)
+
+    def entries(self):
+        """(mtime, bytes, path) for every complete entry"""
+        found = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir() or shard.name == 'tmp':
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    mtime = os.stat(os.path.join(entry.path, MANIFEST)).st_mtime
+                    found.append((mtime, _size(entry.path), entry.path))
+                except OSError:
+                    continue
+        return found
+
+    def evict(self, keep=None):
+        """
+        Drop least recently used entries until the cache fits in max_bytes.
+        keep (an entry path) is never dropped: put() passes the entry it wrote.
+        """
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            # Rename first so readers see the entry vanish whole, never half-deleted
+            trash = os.path.join(self.directory, 'tmp', uuid.uuid4().hex)
+            try:
+                os.rename(path, trash)
+            except OSError:
+                continue
+            shutil.rmtree(trash, ignore_errors=True)
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self):
+        entries = self.entries()
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'writes': self.writes,
+                    'evictions': self.evictions, 'entries': len(entries),
+                    'bytes': sum(size for _, size, _ in entries), 'max_bytes': self.max_bytes}
+
+    def clear(self):
+        for _, _, path in self.entries():
+            shutil.rmtree(path, ignore_errors=True)
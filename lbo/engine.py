@@ -0,0 +1,557 @@
+"""
+LBO Engine - scalar and vectorized batch models
+The Mountain Path - World of Finance
+
+Pure NumPy: no Streamlit, and pandas is only imported when a DataFrame is
+actually requested, so batch jobs import this module cheaply.
+"""
+
+import numpy as np
+
+# Bump whenever a change alters any computed number: persisted results
+# (lbo.diskcache) are keyed on it, so entries from older engines stop matching
+ENGINE_VERSION = '1'
+
+
+# ============================================================================
+# LBO MODEL ENGINE
+# ============================================================================
+# IRR hurdles behind the "Deal Quality" badge
+MARGINAL_IRR = 0.15
+ATTRACTIVE_IRR = 0.25
+
+
+def irr_from_moic(moic, hold_years):
+    """
+    Annualised IRR from MOIC (0 where MOIC <= 0).
+    Shared by LBOModel and BatchLBOModel so both use the same NumPy pow kernel
+    and agree bit-for-bit.
+    """
+    moic = np.atleast_1d(np.asarray(moic, dtype=float))
+    # A scalar (or stride-0) exponent takes NumPy's sqrt fast path for hold_years 2,
+    # which rounds differently from the general kernel: always pass a full array
+    exponent = np.broadcast_to(1 / np.asarray(hold_years, dtype=float), moic.shape).copy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(moic > 0, np.power(moic, exponent) - 1, 0.0)
+
+
+# Projection frequency: periods per year. Rates and flows in params are
+# annual; the models convert them to per-period values.
+PERIODS_PER_YEAR = {'annual': 1, 'quarterly': 4, 'monthly': 12}
+START_YEAR = 2024
+
+
+def periods_per_year(frequency):
+    if frequency not in PERIODS_PER_YEAR:
+        raise ValueError(f"frequency must be one of {list(PERIODS_PER_YEAR)}")
+    return PERIODS_PER_YEAR[frequency]
+
+
+def compound_rate(rate, periods):
+    """Per-period rate that compounds to the annual rate over periods periods"""
+    if periods == 1:
+        return rate
+    return np.power(1 + np.asarray(rate, dtype=float), 1 / periods) - 1
+
+
+PROJECTION_COLUMNS = [
+    'Year', 'Calendar_Year', 'Revenue', 'EBITDA', 'Depreciation', 'EBIT',
+    'Interest', 'EBT', 'Tax', 'Net_Income', 'NWC_Change', 'Levered_FCF',
+    'Mandatory_Debt_Payment', 'Balance_FCF', 'Accumulated_Balance_FCF',
+    'Beginning_Debt', 'Ending_Debt',
+]
+
+# Quarterly/monthly projections carry a running period number in front
+PERIOD_COLUMNS = ['Period'] + PROJECTION_COLUMNS
+
+INTEGER_COLUMNS = ('Period', 'Year', 'Calendar_Year')
+
+
+class Projection:
+    """
+    One deal's projection as a preallocated (n_lines, n_periods) float64 block,
+    one row per PROJECTION_COLUMNS line item. proj['EBITDA'] is a row view;
+    the pandas DataFrame is only built (once) when frame() is called.
+    """
+
+    __slots__ = ('block', 'index', '_frame')
+
+    def __init__(self, n_periods, columns=PROJECTION_COLUMNS):
+        self.block = np.empty((len(columns), n_periods))
+        self.index = {k: i for i, k in enumerate(columns)}
+        self._frame = None
+
+    @classmethod
+    def from_lines(cls, lines, columns=PROJECTION_COLUMNS):
+        """Projection from a dict of equal-length 1-D arrays"""
+        proj = cls(len(lines[columns[0]]), columns)
+        for i, key in enumerate(columns):
+            proj.block[i] = lines[key]
+        return proj
+
+    def __getitem__(self, key):
+        return self.block[self.index[key]]
+
+    def __len__(self):
+        return self.block.shape[1]
+
+    @property
+    def columns(self):
+        return list(self.index)
+
+    def final(self, key):
+        """Value of a line item in the exit (last) period"""
+        return self.block[self.index[key], -1]
+
+    def trailing(self, key, periods):
+        """Sum of a line item over the last periods periods (LTM at exit)"""
+        return self.block[self.index[key], -periods:].sum()
+
+    def frame(self):
+        import pandas as pd
+
+        if self._frame is None:
+            self._frame = pd.DataFrame({
+                k: self.block[i].astype(np.int64) if k in INTEGER_COLUMNS else self.block[i]
+                for k, i in self.index.items()
+            })
+        return self._frame
+
+
+class LBOModel:
+    """
+    Single-deal model. frequency ('annual', 'quarterly' or 'monthly') sets the
+    projection period; growth, interest and repayment stay annual in params
+    and are converted per period. start_year is the first Calendar_Year.
+    """
+
+    def __init__(self, params, frequency='annual', start_year=START_YEAR):
+        self.p = params
+        self.projection = None
+        self.frequency = frequency
+        self.periods_per_year = periods_per_year(frequency)
+        self.start_year = start_year
+
+        self.purchase_price = params['purchase_price']
+        self.fees = params['purchase_price'] * params['fee_pct']
+        self.total_cost = self.purchase_price + self.fees
+        self.debt = params['purchase_price'] * params['debt_pct']
+        self.equity = self.total_cost - self.debt
+
+        self.entry_revenue = params['ltm_revenue']
+        self.entry_ebitda = params['ltm_ebitda']
+        self.ebitda_margin = params['ebitda_margin']
+        self.revenue_growth = params['revenue_growth']
+        self.tax_rate = params['tax_rate']
+        self.capex = params['capex']
+        self.depreciation = params['depreciation']
+        self.nwc_pct = params['nwc_pct']
+
+        self.interest_rate = params['interest_rate']
+        self.mandatory_repay_pct = params['mandatory_repay_pct']
+
+        self.exit_multiple = params['exit_multiple']
+        self.hold_years = params['hold_years']
+
+    @property
+    def df(self):
+        """Projection DataFrame, built lazily from the columnar store"""
+        return None if self.projection is None else self.projection.frame()
+
+    def project(self):
+        """Projection DataFrame (see run() for the pandas-free store)"""
+        return self.run().frame()
+
+    @property
+    def columns(self):
+        return PROJECTION_COLUMNS if self.periods_per_year == 1 else PERIOD_COLUMNS
+
+    def run(self):
+        ppy = self.periods_per_year
+        proj = Projection(self.hold_years * ppy, self.columns)
+        current_debt = self.debt
+        prev_revenue = self.entry_revenue / ppy
+        accumulated_balance_fcf = 0.0
+
+        # Per-period drivers (the annual inputs themselves when ppy == 1)
+        revenue_growth = compound_rate(self.revenue_growth, ppy)
+        interest_rate = self.interest_rate / ppy
+        mandatory_repay_pct = -compound_rate(-self.mandatory_repay_pct, ppy)
+        capex = self.capex / ppy
+
+        for period in range(1, self.hold_years * ppy + 1):
+            year = (period - 1) // ppy + 1
+            revenue = prev_revenue * (1 + revenue_growth)
+            ebitda = revenue * self.ebitda_margin
+            depreciation = self.depreciation / ppy
+            ebit = ebitda - depreciation
+            interest = current_debt * interest_rate
+            ebt = ebit - interest
+            tax = max(0, ebt * self.tax_rate)
+            net_income = ebt - tax
+
+            nwc_change = revenue * self.nwc_pct
+            fcf = net_income + depreciation - capex - nwc_change
+
+            mandatory_repay = current_debt * mandatory_repay_pct
+            balance_fcf = fcf - mandatory_repay
+            accumulated_balance_fcf += balance_fcf
+            ending_debt = current_debt - mandatory_repay
+
+            # One column of the preallocated block per period, in self.columns order
+            values = (
+                year, self.start_year + year - 1, revenue, ebitda, depreciation, ebit,
+                interest, ebt, tax, net_income, nwc_change, fcf,
+                mandatory_repay, balance_fcf, accumulated_balance_fcf,
+                current_debt, ending_debt,
+            )
+            proj.block[:, period - 1] = values if ppy == 1 else (period,) + values
+
+            current_debt = ending_debt
+            prev_revenue = revenue
+
+        self.projection = proj
+        return proj
+
+    def get_returns(self):
+        """
+        CRITICAL FIX:
+        Equity Value at Exit = Exit EV + Sum of Balance FCF - Remaining Debt
+        """
+        if self.projection is None:
+            self.run()
+
+        final = self.projection.final
+        exit_ebitda = self.projection.trailing('EBITDA', self.periods_per_year)
+        exit_ev = exit_ebitda * self.exit_multiple
+        accumulated_fcf = final('Accumulated_Balance_FCF')
+        remaining_debt = final('Ending_Debt')
+
+        equity_proceeds = exit_ev + accumulated_fcf - remaining_debt
+
+        moic = equity_proceeds / self.equity if self.equity > 0 else 0
+        irr = float(irr_from_moic(moic, self.hold_years)[0])
+
+        entry_ev_multiple = self.purchase_price / self.entry_ebitda
+        debt_paydown = self.debt - remaining_debt
+        ebitda_growth_value = (exit_ebitda - self.entry_ebitda) * entry_ev_multiple
+        multiple_expansion_value = (self.exit_multiple - entry_ev_multiple) * exit_ebitda
+        fcf_contribution = accumulated_fcf
+
+        return {
+            'exit_ebitda': exit_ebitda,
+            'exit_ev': exit_ev,
+            'accumulated_fcf': accumulated_fcf,
+            'remaining_debt': remaining_debt,
+            'equity_proceeds': equity_proceeds,
+            'moic': moic,
+            'irr': irr,
+            'debt_paydown': debt_paydown,
+            'ebitda_growth_value': ebitda_growth_value,
+            'multiple_expansion_value': multiple_expansion_value,
+            'fcf_contribution': fcf_contribution,
+        }
+
+    def cash_flows(self, distributions=None):
+        """
+        Sponsor cash flows for years 0..hold_years: -equity at entry, equity
+        proceeds at exit. Interim distributions (one per year) are paid out of
+        accumulated Balance FCF, so they reduce the exit flow one-for-one.
+        """
+        flows = np.zeros(self.hold_years + 1)
+        flows[0] = -self.equity
+        flows[-1] = self.get_returns()['equity_proceeds']
+        if distributions is not None:
+            distributions = np.asarray(distributions, dtype=float)
+            flows[1:] += distributions
+            flows[-1] -= distributions.sum()
+        return flows
+
+
+# ============================================================================
+# BATCH LBO ENGINE (VECTORIZED)
+# ============================================================================
+PARAM_KEYS = [
+    'purchase_price', 'fee_pct', 'debt_pct', 'ltm_revenue', 'ltm_ebitda',
+    'ebitda_margin', 'revenue_growth', 'tax_rate', 'capex', 'depreciation',
+    'nwc_pct', 'interest_rate', 'mandatory_repay_pct', 'exit_multiple', 'hold_years',
+]
+
+RETURN_KEYS = [
+    'exit_ebitda', 'exit_ev', 'accumulated_fcf', 'remaining_debt', 'equity_proceeds',
+    'moic', 'irr', 'debt_paydown', 'ebitda_growth_value', 'multiple_expansion_value',
+    'fcf_contribution',
+]
+
+
+def to_columns(params):
+    """
+    Struct-of-arrays view of scenario params.
+    Accepts a dict of arrays/scalars, a DataFrame, a NumPy structured array
+    or a list of params dicts; scalars broadcast against the array columns.
+    """
+    if isinstance(params, (list, tuple)):
+        columns = {k: np.array([p[k] for p in params], dtype=float) for k in PARAM_KEYS}
+    else:
+        columns = {k: np.asarray(params[k], dtype=float) for k in PARAM_KEYS}
+    arrays = np.broadcast_arrays(*[np.atleast_1d(columns[k]) for k in PARAM_KEYS])
+    return dict(zip(PARAM_KEYS, arrays))
+
+
+class BatchLBOModel:
+    """
+    Vectorized LBOModel over n scenarios in one NumPy pass.
+    Projection lines are (n_scenarios, n_periods) arrays, NaN past each
+    scenario's hold period; returns are (n_scenarios,) arrays.
+    debt_structure (lbo.debt.DebtStructure) replaces the single-tranche
+    interest_rate / mandatory_repay_pct debt with a multi-tranche waterfall.
+    frequency and start_year work as in LBOModel; only the debt balance is
+    stepped period by period, everything else is whole-array ops over time.
+    """
+
+    def __init__(self, params, debt_structure=None, frequency='annual', start_year=START_YEAR):
+        p = to_columns(params)
+        self.p = p
+        self.lines = None
+        self.tranche_lines = None
+        self.debt_structure = debt_structure
+        self.frequency = frequency
+        self.periods_per_year = periods_per_year(frequency)
+        self.start_year = start_year
+        self.n = len(p['purchase_price'])
+
+        self.purchase_price = p['purchase_price']
+        self.fees = p['purchase_price'] * p['fee_pct']
+        self.total_cost = self.purchase_price + self.fees
+        self.debt = p['purchase_price'] * p['debt_pct']
+        self.equity = self.total_cost - self.debt
+
+        self.entry_revenue = p['ltm_revenue']
+        self.entry_ebitda = p['ltm_ebitda']
+        self.ebitda_margin = p['ebitda_margin']
+        self.revenue_growth = p['revenue_growth']
+        self.tax_rate = p['tax_rate']
+        self.capex = p['capex']
+        self.depreciation = p['depreciation']
+        self.nwc_pct = p['nwc_pct']
+
+        self.interest_rate = p['interest_rate']
+        self.mandatory_repay_pct = p['mandatory_repay_pct']
+
+        self.exit_multiple = p['exit_multiple']
+        self.hold_years = p['hold_years'].astype(np.int64)
+        self.n_years = int(self.hold_years.max()) if self.n else 0
+        if self.n and self.hold_years.min() < 1:
+            raise ValueError("hold_years must be at least 1")
+        self.n_periods = self.n_years * self.periods_per_year
+        self.exit_period = self.hold_years * self.periods_per_year
+
+    @property
+    def columns(self):
+        return PROJECTION_COLUMNS if self.periods_per_year == 1 else PERIOD_COLUMNS
+
+    def project(self):
+        operating = self.operating_lines()
+        return self.assemble(operating, self.financing_lines(operating))
+
+    def operating_lines(self):
+        """Operating stage: revenue through NWC, independent of the debt"""
+        n, n_periods, ppy = self.n, self.n_periods, self.periods_per_year
+        col = lambda a: a[:, None]
+
+        # Revenue compounds in the same order as the scalar loop
+        growth = np.empty((n, n_periods + 1))
+        growth[:, 0] = self.entry_revenue / ppy
+        growth[:, 1:] = col(1 + compound_rate(self.revenue_growth, ppy))
+        revenue = np.cumprod(growth, axis=1)[:, 1:]
+
+        ebitda = revenue * col(self.ebitda_margin)
+        depreciation = np.broadcast_to(col(self.depreciation / ppy), (n, n_periods)).copy()
+        return {
+            'Revenue': revenue,
+            'EBITDA': ebitda,
+            'Depreciation': depreciation,
+            'EBIT': ebitda - depreciation,
+            'NWC_Change': revenue * col(self.nwc_pct),
+        }
+
+    def financing_lines(self, operating):
+        """Debt stage: interest, tax, FCF and debt balances given the operating lines"""
+        ebit, depreciation, nwc_change = (operating[k] for k in ('EBIT', 'Depreciation', 'NWC_Change'))
+        if self.debt_structure is None:
+            self.tranche_lines = None
+            return self._single_tranche(ebit, depreciation, nwc_change)
+        financing, self.tranche_lines = self.debt_structure.schedule(
+            self, ebit, depreciation, nwc_change)
+        return financing
+
+    def assemble(self, operating, financing):
+        """
+        Projection lines from the two stages, NaN past each exit period.
+        Masking only touches periods after exit, so stage outputs stay valid
+        for reuse by lbo.incremental.
+        """
+        n, n_periods, ppy = self.n, self.n_periods, self.periods_per_year
+        period = np.arange(1, n_periods + 1)
+        year = np.broadcast_to((period - 1) // ppy + 1, (n, n_periods))
+        lines = {} if ppy == 1 else {'Period': np.broadcast_to(period, (n, n_periods))}
+        lines.update({
+            'Year': year,
+            'Calendar_Year': year + self.start_year - 1,
+            'Revenue': operating['Revenue'],
+            'EBITDA': operating['EBITDA'],
+            'Depreciation': operating['Depreciation'],
+            'EBIT': operating['EBIT'],
+            'Interest': financing['Interest'],
+            'EBT': financing['EBT'],
+            'Tax': financing['Tax'],
+            'Net_Income': financing['Net_Income'],
+            'NWC_Change': operating['NWC_Change'],
+            'Levered_FCF': financing['Levered_FCF'],
+            'Mandatory_Debt_Payment': financing['Mandatory_Debt_Payment'],
+            'Balance_FCF': financing['Balance_FCF'],
+            'Accumulated_Balance_FCF': np.cumsum(financing['Balance_FCF'], axis=1),
+            'Beginning_Debt': financing['Beginning_Debt'],
+            'Ending_Debt': financing['Ending_Debt'],
+        })
+        # Extra debt lines (Cash_Sweep, PIK_Interest, Revolver_Draw) from a DebtStructure
+        lines.update({k: v for k, v in financing.items() if k not in lines})
+
+        past_exit = period[None, :] > self.exit_period[:, None]
+        if past_exit.any():
+            for key in lines:
+                if key not in INTEGER_COLUMNS:
+                    lines[key][past_exit] = np.nan
+            for tranche in (self.tranche_lines or {}).values():
+                for value in tranche.values():
+                    value[past_exit] = np.nan
+
+        self.lines = lines
+        return self.lines
+
+    def _single_tranche(self, ebit, depreciation, nwc_change):
+        n, n_periods, ppy = self.n, self.n_periods, self.periods_per_year
+        col = lambda a: a[:, None]
+
+        # Debt is the only true recurrence: one vector op per period, not per scenario
+        beginning_debt = np.empty((n, n_periods))
+        mandatory_repay = np.empty((n, n_periods))
+        repay_pct = -compound_rate(-self.mandatory_repay_pct, ppy)
+        current_debt = self.debt
+        for t in range(n_periods):
+            beginning_debt[:, t] = current_debt
+            mandatory_repay[:, t] = current_debt * repay_pct
+            current_debt = current_debt - mandatory_repay[:, t]
+        ending_debt = beginning_debt - mandatory_repay
+
+        interest = beginning_debt * col(self.interest_rate / ppy)
+        ebt = ebit - interest
+        tax = np.maximum(0, ebt * col(self.tax_rate))
+        net_income = ebt - tax
+        fcf = net_income + depreciation - col(self.capex / ppy) - nwc_change
+
+        return {
+            'Interest': interest,
+            'EBT': ebt,
+            'Tax': tax,
+            'Net_Income': net_income,
+            'Levered_FCF': fcf,
+            'Mandatory_Debt_Payment': mandatory_repay,
+            'Balance_FCF': fcf - mandatory_repay,
+            'Beginning_Debt': beginning_debt,
+            'Ending_Debt': ending_debt,
+        }
+
+    def final(self, key):
+        """Value of a projection line in each scenario's exit period"""
+        if self.lines is None:
+            self.project()
+        idx = (self.exit_period - 1)[:, None]
+        return np.take_along_axis(self.lines[key], idx, axis=1)[:, 0]
+
+    def trailing(self, key):
+        """Sum of a projection line over each scenario's last year of periods (LTM at exit)"""
+        if self.periods_per_year == 1:
+            return self.final(key)
+        if self.lines is None:
+            self.project()
+        idx = self.exit_period[:, None] - np.arange(self.periods_per_year, 0, -1)[None, :]
+        return np.take_along_axis(self.lines[key], idx, axis=1).sum(axis=1)
+
+    def get_returns(self, exit_multiple=None):
+        """
+        Vectorized LBOModel.get_returns(): one (n_scenarios,) array per key.
+        exit_multiple overrides the exit step only; an (n_scenarios, k) array
+        prices k exit multiples off the same projection, giving (n_scenarios, k)
+        results.
+        """
+        if exit_multiple is None:
+            exit_multiple = self.exit_multiple
+        exit_multiple = np.asarray(exit_multiple, dtype=float)
+        expand = (lambda a: a[:, None]) if exit_multiple.ndim == 2 else (lambda a: a)
+
+        exit_ebitda = expand(self.trailing('EBITDA'))
+        exit_ev = exit_ebitda * exit_multiple
+        accumulated_fcf = expand(self.final('Accumulated_Balance_FCF'))
+        remaining_debt = expand(self.final('Ending_Debt'))
+        equity = expand(self.equity)
+        entry_ebitda = expand(self.entry_ebitda)
+
+        equity_proceeds = exit_ev + accumulated_fcf - remaining_debt
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            moic = np.where(equity > 0, equity_proceeds / equity, 0.0)
+            entry_ev_multiple = expand(self.purchase_price) / entry_ebitda
+
+        irr = irr_from_moic(moic, expand(self.hold_years))
+
+        debt_paydown = expand(self.debt) - remaining_debt
+        ebitda_growth_value = (exit_ebitda - entry_ebitda) * entry_ev_multiple
+        multiple_expansion_value = (exit_multiple - entry_ev_multiple) * exit_ebitda
+        fcf_contribution = accumulated_fcf
+
+        return {
+            'exit_ebitda': exit_ebitda,
+            'exit_ev': exit_ev,
+            'accumulated_fcf': accumulated_fcf,
+            'remaining_debt': remaining_debt,
+            'equity_proceeds': equity_proceeds,
+            'moic': moic,
+            'irr': irr,
+            'debt_paydown': debt_paydown,
+            'ebitda_growth_value': ebitda_growth_value,
+            'multiple_expansion_value': multiple_expansion_value,
+            'fcf_contribution': fcf_contribution,
+        }
+
+    def cash_flows(self, distributions=None):
+        """
+        Sponsor cash flows, (n_scenarios, n_years + 1): -equity at year 0 and
+        equity proceeds in each scenario's exit year, zero elsewhere. Optional
+        (n_scenarios, n_years) interim distributions are paid out of accumulated
+        Balance FCF, so they reduce the exit flow one-for-one. Feed to
+        lbo.irr.solve_irr() for a cash-flow IRR.
+        """
+        flows = np.zeros((self.n, self.n_years + 1))
+        flows[:, 0] = -self.equity
+        exit_col = self.hold_years[:, None]
+        np.put_along_axis(flows, exit_col, self.get_returns()['equity_proceeds'][:, None], axis=1)
+        if distributions is not None:
+            distributions = np.broadcast_to(np.asarray(distributions, dtype=float), (self.n, self.n_years))
+            live = np.arange(1, self.n_years + 1)[None, :] <= exit_col
+            distributions = np.where(live, distributions, 0.0)
+            flows[:, 1:] += distributions
+            paid = distributions.sum(axis=1)[:, None]
+            np.put_along_axis(flows, exit_col, np.take_along_axis(flows, exit_col, axis=1) - paid, axis=1)
+        return flows
+
+    def projection(self, i):
+        """Scenario i as the Projection LBOModel.run() would return"""
+        if self.lines is None:
+            self.project()
+        periods = int(self.exit_period[i])
+        return Projection.from_lines({k: self.lines[k][i, :periods] for k in self.columns}, self.columns)
+
+    def frame(self, i):
+        """Scenario i as the DataFrame LBOModel.project() would return"""
+        return self.projection(i).frame()
@@ -0,0 +1,337 @@
+"""
+Export of raw numeric results (projections, returns, sensitivity grids,
+simulations, batches) to CSV, JSONL, Parquet or XLSX, a chunk of rows at
+a time.
+
+    export_projection(BatchLBOModel(scenarios), 'projection.parquet')
+    export_returns(model.get_returns(), 'returns.csv', inputs=scenarios)
+    export_grid(grid, 'exit_multiple', exits, 'debt_pct', leverage, 'grid.xlsx')
+    export_batch(scenarios, 'results.parquet', chunk_size=200_000)
+
+Values are written as numbers (an IRR of 0.2345, not "23.5%"). Every
+exporter builds one DataFrame of at most chunk_size rows at a time and
+appends it to the file; export_batch() also evaluates chunk by chunk, so
+not even the results are ever all in memory. path may also be a binary
+file object (e.g. io.BytesIO for a download). Parquet needs pyarrow and
+XLSX needs openpyxl; XLSX output rolls over to a new sheet at Excel's row
+limit.
+"""
+
+import io
+import json
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from .engine import INTEGER_COLUMNS, PARAM_KEYS, RETURN_KEYS, BatchLBOModel, to_columns
+
+FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.xlsx': 'xlsx'}
+MIME_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower() if isinstance(path, (str, os.PathLike)) else ''
+    if ext not in FORMATS:
+        raise ValueError(f"Cannot infer format of '{path}' from its extension; pass the format explicitly")
+    return FORMATS[ext]
+
+
+def require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Parquet support needs pyarrow: pip install pyarrow") from None
+
+
+def require_openpyxl():
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        raise RuntimeError("XLSX support needs openpyxl: pip install openpyxl") from None
+
+
+@lru_cache(maxsize=None)
+def available_formats():
+    """
+    Output formats whose optional dependencies are installed, as a tuple.
+    Checked once per process: a failed import is retried from disk every
+    time, and the app asks on every rerun of a tab with a download button.
+    """
+    formats = ['csv', 'jsonl']
+    for fmt, check in (('parquet', require_pyarrow), ('xlsx', require_openpyxl)):
+        try:
+            check()
+            formats.append(fmt)
+        except RuntimeError:
+            pass
+    return tuple(formats)
+
+
+def _json_lines(frame):
+    """
+    frame as JSON Lines, like to_json(orient='records', lines=True) but with
+    floats in their shortest round-trip form, as in CSV and Parquet (to_json
+    keeps 10 significant digits by default, 15 at most). NaN and inf become
+    null.
+    """
+    names = [str(name) for name in frame.columns]
+    columns = []
+    for _, column in frame.items():
+        values = column.tolist()
+        if column.dtype.kind in 'fO':
+            values = [None if isinstance(v, float) and not math.isfinite(v) else v for v in values]
+        columns.append(values)
+    encode = json.JSONEncoder(separators=(',', ':'), check_circular=False).encode
+    return ''.join([encode(dict(zip(names, row))) + '\n' for row in zip(*columns)])
+
+
+class ChunkWriter:
+    """
+    Append DataFrame chunks to CSV, JSONL, Parquet or XLSX without holding
+    earlier chunks. path is a file path or a binary file object.
+    """
+
+    def __init__(self, path, fmt, sheet='Sheet1'):
+        self.path = path
+        self.fmt = fmt
+        self.sheet = sheet
+        self.rows = 0
+        self._file = None
+        self._parquet = None
+        self._workbook = None
+        self._worksheet = None
+        self._sheet_rows = 0
+        if fmt == 'parquet':
+            require_pyarrow()
+        elif fmt == 'xlsx':
+            require_openpyxl()
+        elif fmt not in ('csv', 'jsonl'):
+            raise ValueError(f"Unknown output format '{fmt}'")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, frame):
+        if self.fmt in ('csv', 'jsonl'):
+            if self._file is None:
+                self._file = (open(self.path, 'w', newline='') if isinstance(self.path, (str, os.PathLike))
+                              else io.TextIOWrapper(self.path, encoding='utf-8', newline='', write_through=True))
+            if self.fmt == 'csv':
+                frame.to_csv(self._file, header=self.rows == 0, index=False)
+            else:
+                self._file.write(_json_lines(frame))
+        elif self.fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            self._write_xlsx(frame)
+        self.rows += len(frame)
+
+    def _write_xlsx(self, frame):
+        from openpyxl import Workbook
+
+        if self._workbook is None:
+            self._workbook = Workbook(write_only=True)
+        values = np.empty(frame.shape, dtype=object)
+        for j, column in enumerate(frame.columns):
+            data = frame[column].to_numpy()
+            values[:, j] = data.astype(object)
+            if data.dtype.kind == 'f':
+                # Excel has no NaN or infinity: leave those cells empty
+                values[~np.isfinite(data), j] = None
+        if self._worksheet is None:
+            self._new_sheet(frame.columns)
+        start = 0
+        while start < len(values):
+            if self._sheet_rows == EXCEL_MAX_ROWS:
+                self._new_sheet(frame.columns)
+            stop = min(len(values), start + EXCEL_MAX_ROWS - self._sheet_rows)
+            for row in values[start:stop]:
+                self._worksheet.append(row.tolist())
+            self._sheet_rows += stop - start
+            start = stop
+
+    def _new_sheet(self, columns):
+        n_sheets = len(self._workbook.worksheets)
+        title = self.sheet if n_sheets == 0 else f"{self.sheet} ({n_sheets + 1})"
+        self._worksheet = self._workbook.create_sheet(title[:31])
+        self._worksheet.append([str(c) for c in columns])
+        self._sheet_rows = 1
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        if self._file is not None:
+            if isinstance(self.path, (str, os.PathLike)):
+                self._file.close()
+            else:
+                self._file.flush()
+                self._file.detach()  # leave the caller's file object open
+            self._file = None
+        if self.fmt == 'xlsx':
+            if self._workbook is None:  # nothing written: still produce a valid, empty sheet
+                from openpyxl import Workbook
+
+                self._workbook = Workbook(write_only=True)
+                self._workbook.create_sheet(self.sheet)
+            self._workbook.save(self.path)
+            self._workbook = None
+
+
+def write_chunks(frames, path, fmt=None, sheet='Sheet1'):
+    """Write an iterable of DataFrames to one file; returns the rows written"""
+    with ChunkWriter(path, detect_format(path, fmt), sheet) as writer:
+        for frame in frames:
+            writer.write(frame)
+    return writer.rows
+
+
+def flatten(columns, prefix=''):
+    """Nested dicts of arrays -> one level, keys joined with '_'"""
+    flat = {}
+    for key, value in columns.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}_"))
+        else:
+            flat[name] = np.atleast_1d(np.asarray(value))
+    return flat
+
+
+def table_chunks(columns, chunk_size=100_000):
+    """DataFrames of at most chunk_size rows from a dict of equal-length arrays"""
+    import pandas as pd
+
+    columns = flatten(columns)
+    n = len(next(iter(columns.values()))) if columns else 0
+    if any(len(v) != n for v in columns.values()):
+        raise ValueError("Every column must have the same length")
+    for start in range(0, max(n, 1), chunk_size):
+        yield pd.DataFrame({k: v[start:start + chunk_size] for k, v in columns.items()})
+
+
+def export_table(columns, path, fmt=None, chunk_size=100_000, sheet='Sheet1'):
+    """
+    A dict of equal-length arrays (nested dicts flattened, e.g.
+    simulate_returns() output with covenants) as one row per element
+    """
+    return write_chunks(table_chunks(columns, chunk_size), path, fmt, sheet)
+
+
+def export_returns(returns, path, inputs=None, fmt=None, chunk_size=100_000):
+    """
+    get_returns() output (scalar or batch), one row per scenario, after a
+    'scenario' index and, when given, the input params (anything
+    to_columns() accepts)
+    """
+    returns = {k: np.atleast_1d(np.asarray(v)) for k, v in returns.items()}
+    n = len(returns['irr'])
+    columns = {'scenario': np.arange(n)}
+    if inputs is not None:
+        columns.update({k: np.broadcast_to(v, (n,)) for k, v in to_columns(inputs).items()})
+    columns.update(returns)
+    return export_table(columns, path, fmt, chunk_size, sheet='Returns')
+
+
+def projection_chunks(model, chunk_size=100_000):
+    """
+    Long-format DataFrames of a BatchLBOModel's projection: one row per
+    scenario and period up to that scenario's exit, every line a column
+    """
+    import pandas as pd
+
+    if model.lines is None:
+        model.project()
+    keys = model.columns
+    per_chunk = max(1, chunk_size // model.n_periods)
+    exit_period = model.exit_period.astype(np.int64)
+    for start in range(0, model.n, per_chunk):
+        stop = min(start + per_chunk, model.n)
+        live = np.arange(model.n_periods)[None, :] < exit_period[start:stop, None]
+        scenario = np.broadcast_to(np.arange(start, stop)[:, None], live.shape)
+        frame = {'scenario': scenario[live]}
+        for key in keys:
+            values = model.lines[key][start:stop][live]
+            frame[key] = values.astype(np.int64) if key in INTEGER_COLUMNS else values
+        yield pd.DataFrame(frame)
+
+
+def export_projection(model, path, fmt=None, chunk_size=100_000):
+    """
+    The projection of a BatchLBOModel (long format, see projection_chunks())
+    or an LBOModel's Projection / project() DataFrame
+    """
+    if isinstance(model, BatchLBOModel):
+        return write_chunks(projection_chunks(model, chunk_size), path, fmt, sheet='Projection')
+    frame = model if hasattr(model, 'to_numpy') else model.frame()
+    return write_chunks([frame], path, fmt, sheet='Projection')
+
+
+def grid_chunks(grid, row_param, row_values, col_param, col_values, chunk_size=100_000):
+    """
+    Long-format DataFrames of a grid_sensitivity() (or goal_seek_grid())
+    result: one row per (row, col) point with both param values, a block of
+    grid rows at a time. A bare array is written as a 'value' column.
+    """
+    import pandas as pd
+
+    grid = grid if isinstance(grid, dict) else {'value': grid}
+    row_values = np.asarray(row_values, dtype=float)
+    col_values = np.asarray(col_values, dtype=float)
+    rows_per_chunk = max(1, chunk_size // max(len(col_values), 1))
+    for start in range(0, max(len(row_values), 1), rows_per_chunk):
+        rows = slice(start, start + rows_per_chunk)
+        block = row_values[rows]
+        frame = {row_param: np.repeat(block, len(col_values)),
+                 col_param: np.tile(col_values, len(block))}
+        frame.update({k: np.asarray(v)[rows].ravel() for k, v in grid.items()})
+        yield pd.DataFrame(frame)
+
+
+def export_grid(grid, row_param, row_values, col_param, col_values, path, fmt=None, chunk_size=100_000):
+    return write_chunks(grid_chunks(grid, row_param, row_values, col_param, col_values, chunk_size),
+                        path, fmt, sheet='Grid')
+
+
+def export_batch(scenarios, path, fmt=None, chunk_size=100_000, frequency='annual', keep_inputs=True):
+    """
+    Evaluate scenarios (anything to_columns() accepts) through
+    BatchLBOModel chunk_size at a time and write each chunk's inputs and
+    returns as it finishes
+    """
+    import pandas as pd
+
+    columns = to_columns(scenarios)
+    n = len(columns['purchase_price'])
+
+    def frames():
+        for start in range(0, n, chunk_size):
+            chunk = {k: v[start:start + chunk_size] for k, v in columns.items()}
+            returns = BatchLBOModel(chunk, frequency=frequency).get_returns()
+            frame = {'scenario': np.arange(start, start + len(chunk['purchase_price']))}
+            if keep_inputs:
+                frame.update({k: chunk[k] for k in PARAM_KEYS})
+            frame.update({k: returns[k] for k in RETURN_KEYS})
+            yield pd.DataFrame(frame)
+
+    return write_chunks(frames(), path, fmt, sheet='Results')
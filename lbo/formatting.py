@@ -0,0 +1,113 @@
+"""
+Vectorized display formatting: one call formats a whole array of values.
+
+    format_millions([1.5e6, 2.35e9, 950])   # ['$1.5M', '$2,350.0M', '$950']
+    format_number(values)                     # '1,234,567'
+    format_pct(irr)                           # '23.4%'
+    format_multiple(moic, 2)                  # '2.15x'
+
+Output matches the app's per-value f-strings (f"{x:,.0f}", fmt_m, ...)
+character for character. Digits come from integer arithmetic on the whole
+array and are laid out, with thousands separators, on a fixed-width
+character matrix: no Python loop over cells. Values within a hair of a
+rounding tie (and nan/inf) are rendered by Python so ties round the same way.
+"""
+
+import numpy as np
+
+# Beyond this the integer part no longer fits the int64 digit path
+_MAX_FAST = 2.0 ** 62
+
+
+_DIGITS = np.array(list('0123456789'))
+
+
+def _layout(integer, fraction, decimals):
+    """
+    Character matrix for non-negative integer/fraction parts: right-aligned
+    digits in 3-digit groups, each group preceded by ',' (or ' ' while still
+    in the leading padding), then '.' and the fraction digits. One view turns
+    the matrix back into strings.
+    """
+    n = integer.shape[0]
+    width = -(-max(1, len(str(int(integer.max())))) // 3) * 3
+    groups = width // 3
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    digits = (integer[:, None] // powers) % 10
+    padding = np.cumsum(digits, axis=1) == 0
+    padding[:, -1] = False
+
+    chars = np.where(padding, ' ', _DIGITS[digits]).reshape(n, groups, 3)
+    matrix = np.empty((n, groups * 4 + (decimals + 1 if decimals else 0)), dtype='U1')
+    body = matrix[:, :groups * 4].reshape(n, groups, 4)
+    body[:, :, 1:] = chars
+    body[:, 0, 0] = ' '
+    body[:, 1:, 0] = np.where(padding.reshape(n, groups, 3)[:, :-1].all(axis=2), ' ', ',')
+    if decimals:
+        matrix[:, groups * 4] = '.'
+        powers = 10 ** np.arange(decimals - 1, -1, -1, dtype=np.int64)
+        matrix[:, groups * 4 + 1:] = _DIGITS[(fraction[:, None] // powers) % 10]
+    return np.char.lstrip(matrix.view(f'U{matrix.shape[1]}')[:, 0], ' ')
+
+
+def _exact(values, decimals):
+    """Python's own formatting, element by element (nan/inf, huge values, ties)"""
+    return np.array([f"{v:,.{decimals}f}" for v in values.tolist()], dtype=str)
+
+
+def format_number(values, decimals=0):
+    """f"{x:,.{decimals}f}" for every element"""
+    values = np.asarray(values, dtype=float)
+    shape = values.shape
+    values = values.reshape(-1)
+    if values.size == 0:
+        return np.empty(shape, dtype=str)
+
+    finite = np.isfinite(values)
+    magnitude = np.abs(np.where(finite, values, 0.0))
+    slow = ~finite | (magnitude >= _MAX_FAST)
+    magnitude[slow] = 0.0
+    if decimals == 0:
+        integer = np.rint(magnitude)
+    else:
+        scale = 10 ** decimals
+        integer = np.floor(magnitude)
+        scaled = (magnitude - integer) * scale
+        fraction = np.rint(scaled)
+        # The product may land on the wrong side of an exact tie; let Python decide those
+        slow |= np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+        carry = fraction >= scale
+        integer = integer + carry
+        fraction = np.where(carry, 0.0, fraction)
+
+    text = _layout(integer.astype(np.int64), None if decimals == 0 else fraction.astype(np.int64),
+                   decimals)
+    text = np.char.add(np.where(np.signbit(values), '-', ''), text)
+    if slow.any():
+        text = text.astype(object)
+        text[slow] = _exact(values[slow], decimals)
+        text = text.astype(str)
+    return text.reshape(shape)
+
+
+def format_millions(values, decimals=1):
+    """The app's fmt_m(): '$12.3M' from $1M up, '$950,000' below"""
+    values = np.asarray(values, dtype=float)
+    large = np.abs(values) >= 1e6
+    millions = np.char.add(np.char.add('$', format_number(values / 1e6, decimals)), 'M')
+    return np.where(large, millions, np.char.add('$', format_number(values, 0)))
+
+
+def format_pct(values, decimals=1):
+    """f"{x * 100:.{decimals}f}%" for every element"""
+    text = format_number(np.asarray(values, dtype=float) * 100, decimals)
+    return np.char.add(np.char.replace(text, ',', ''), '%')
+
+
+def format_multiple(values, decimals=1, missing=None):
+    """f"{x:.{decimals}f}x"; non-finite values become missing when it is given"""
+    values = np.asarray(values, dtype=float)
+    text = np.char.add(np.char.replace(format_number(values, decimals), ',', ''), 'x')
+    if missing is not None:
+        text = np.where(np.isfinite(values), text, missing)
+    return text
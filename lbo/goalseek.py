@@ -0,0 +1,140 @@
+"""
+Goal seek: solve for the input that hits a target IRR or MOIC.
+
+    goal_seek(params, 'purchase_price', 0.25)        # max price for a 25% IRR
+    goal_seek_batch(deals, 'purchase_price', 0.25)   # same, for every row at once
+
+Exit multiple has a closed-form inverse. Every other input uses a vectorized
+Illinois (modified regula falsi) search inside a bracket, evaluating all
+unconverged rows in one BatchLBOModel pass per iteration.
+"""
+
+import numpy as np
+
+from .engine import PARAM_KEYS, BatchLBOModel, to_columns
+from .sensitivity import link_entry_ebitda
+
+# Default search ranges; callables get the params columns
+DEFAULT_BRACKETS = {
+    'purchase_price': lambda c: (1.0 * c['ltm_ebitda'], 40.0 * c['ltm_ebitda']),
+    'debt_pct': lambda c: (0.0, 0.95),
+    'exit_multiple': lambda c: (0.0, 50.0),
+    'ebitda_margin': lambda c: (0.01, 0.9),
+    'revenue_growth': lambda c: (-0.5, 1.0),
+    'interest_rate': lambda c: (0.0, 0.5),
+}
+
+METRICS = ('irr', 'moic')
+
+
+def _bracket(columns, solve_param, bracket, n):
+    if bracket is None:
+        if solve_param not in DEFAULT_BRACKETS:
+            raise ValueError(f"No default bracket for '{solve_param}'; pass bracket=(low, high)")
+        bracket = DEFAULT_BRACKETS[solve_param](columns)
+    low, high = bracket
+    return (np.array(np.broadcast_to(np.asarray(low, dtype=float), (n,))),
+            np.array(np.broadcast_to(np.asarray(high, dtype=float), (n,))))
+
+
+def _solve_exit_multiple(columns, target, metric, frequency):
+    """Closed form: the exit multiple whose equity proceeds give the target"""
+    model = BatchLBOModel(columns, frequency=frequency)
+    moic = target if metric == 'moic' else (1 + target) ** model.hold_years
+    proceeds = moic * model.equity
+    exit_multiple = (proceeds - model.final('Accumulated_Balance_FCF')
+                     + model.final('Ending_Debt')) / model.trailing('EBITDA')
+    ok = np.isfinite(exit_multiple) & (model.equity > 0) & (moic > 0)
+    return np.where(ok, exit_multiple, np.nan), ok
+
+
+def goal_seek_batch(params, solve_param, target, metric='irr', bracket=None,
+                    tol=1e-10, max_iter=100, frequency='annual'):
+    """
+    Value of solve_param at which each scenario's metric ('irr' or 'moic')
+    equals target (scalar or per-scenario array).
+    params is anything to_columns() accepts. bracket is (low, high), each a
+    scalar or per-scenario array; it defaults to DEFAULT_BRACKETS. Returns
+    (values, converged); rows whose metric does not cross target inside the
+    bracket get NaN and converged=False.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}")
+    if solve_param not in PARAM_KEYS or solve_param in ('hold_years', 'ltm_ebitda'):
+        raise ValueError(f"Cannot goal-seek '{solve_param}'")
+    columns = {k: np.array(v) for k, v in to_columns(params).items()}
+    n = len(columns['purchase_price'])
+    target = np.array(np.broadcast_to(np.asarray(target, dtype=float), (n,)))
+    linked = solve_param in ('ebitda_margin', 'ltm_revenue')
+
+    if solve_param == 'exit_multiple' and bracket is None:
+        return _solve_exit_multiple(columns, target, metric, frequency)
+
+    def excess(rows, x):
+        cols = {k: v[rows] for k, v in columns.items()}
+        cols[solve_param] = x
+        if linked:
+            link_entry_ebitda(cols)
+        return BatchLBOModel(cols, frequency=frequency).get_returns()[metric] - target[rows]
+
+    a, b = _bracket(columns, solve_param, bracket, n)
+    rows = np.arange(n)
+    fa, fb = excess(rows, a), excess(rows, b)
+    values = np.full(n, np.nan)
+    converged = np.zeros(n, dtype=bool)
+
+    at_end = (fa == 0) | (fb == 0)
+    values[at_end] = np.where(fa == 0, a, b)[at_end]
+    converged[at_end] = True
+    active = np.flatnonzero(~at_end & (np.sign(fa) * np.sign(fb) < 0))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for _ in range(max_iter):
+            if not active.size:
+                break
+            a_, b_, fa_, fb_ = a[active], b[active], fa[active], fb[active]
+            c = b_ - fb_ * (b_ - a_) / (fb_ - fa_)
+            lo, hi = np.minimum(a_, b_), np.maximum(a_, b_)
+            outside = ~np.isfinite(c) | (c <= lo) | (c >= hi)
+            c = np.where(outside, 0.5 * (a_ + b_), c)
+            fc = excess(active, c)
+
+            # Illinois step: keep the bracket, halve the stale end's weight
+            crossed = np.sign(fc) * np.sign(fb_) < 0
+            a[active] = np.where(crossed, b_, a_)
+            fa[active] = np.where(crossed, fb_, fa_ / 2)
+            b[active], fb[active] = c, fc
+
+            values[active] = c
+            scale = tol * (1 + np.abs(c))
+            done = (fc == 0) | (np.abs(c - b_) <= scale) | (np.abs(c - a[active]) <= scale)
+            converged[active[done]] = True
+            active = active[~done]
+
+    return values, converged
+
+
+def goal_seek(params, solve_param, target, metric='irr', bracket=None, tol=1e-10, frequency='annual'):
+    """Single-deal goal seek; NaN when target is not reachable inside the bracket"""
+    values, _ = goal_seek_batch([params], solve_param, target, metric, bracket, tol,
+                                frequency=frequency)
+    return float(values[0])
+
+
+def goal_seek_grid(params, solve_param, target, row_param, row_values, col_param, col_values,
+                   metric='irr', bracket=None, frequency='annual'):
+    """
+    Goal seek at every (row, col) point of a two-param grid in one batched
+    solve, e.g. max purchase price for a 25% IRR across exit multiple x leverage.
+    Returns a (len(row_values), len(col_values)) array.
+    """
+    row_values = np.asarray(row_values, dtype=float)
+    col_values = np.asarray(col_values, dtype=float)
+    row_grid, col_grid = np.meshgrid(row_values, col_values, indexing='ij')
+    columns = {k: params[k] for k in PARAM_KEYS}
+    columns[row_param] = row_grid.ravel()
+    columns[col_param] = col_grid.ravel()
+    if {'ebitda_margin', 'ltm_revenue'} & {row_param, col_param}:
+        columns = link_entry_ebitda(dict(to_columns(columns)))
+    values, _ = goal_seek_batch(columns, solve_param, target, metric, bracket, frequency=frequency)
+    return values.reshape(row_grid.shape)
@@ -0,0 +1,123 @@
+"""
+Analytic derivatives ("greeks") of IRR and MOIC with respect to every
+continuous input, for one deal or a whole batch in one pass.
+
+    g = greeks(scenarios)                  # anything to_columns() accepts
+    g['param']                             # GREEK_PARAMS, the column order
+    g['d_irr'][:, list(g['param']).index('exit_multiple')]   # dIRR/d exit multiple
+
+The projection runs once through BatchLBOModel for the values. Equity
+proceeds at exit are linear in each period's revenue, debt and tax slopes,
+so their derivative with respect to an input is a weighted sum over the
+periods up to exit: forward-mode differentiation of project() and
+get_returns() written out by hand, costing a few (n_scenarios, n_periods)
+reductions instead of one bumped re-run per input, and without
+finite-difference noise. Derivatives are per unit of each input (per 1.0
+of a rate, so dIRR/d interest_rate x 0.01 is the IRR change for +1pp).
+Tax uses the slope on the side the projection is on (zero while EBT is
+negative); hold_years, being whole years, is left out; ltm_ebitda only
+enters the value-creation split, so its IRR and MOIC derivatives are 0.
+Covers the single-tranche debt schedule of BatchLBOModel.
+"""
+
+import numpy as np
+
+from .engine import PARAM_KEYS, BatchLBOModel, compound_rate
+
+GREEK_PARAMS = [k for k in PARAM_KEYS if k != 'hold_years']
+
+
+def rate_slope(rate, periods):
+    """Derivative of compound_rate(rate, periods) with respect to rate"""
+    rate = np.asarray(rate, dtype=float)
+    if periods == 1:
+        return np.ones_like(rate)
+    return np.power(1 + rate, 1 / periods - 1) / periods
+
+
+def _powers(base, exponents):
+    """base ** s and its derivative s * base ** (s - 1), as (n, len(exponents))"""
+    base = base[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(exponents > 0, exponents * np.power(base, exponents - 1), 0.0)
+    return np.power(base, exponents), slope
+
+
+def greeks(params, frequency='annual'):
+    """
+    dIRR/dparam and dMOIC/dparam for every scenario and every GREEK_PARAMS
+    input. Returns a dict: 'param' (the GREEK_PARAMS column order), 'irr'
+    and 'moic' (n,) values as BatchLBOModel computes them, and 'd_irr',
+    'd_moic' and 'd_equity_proceeds' as (n, len(GREEK_PARAMS)) arrays.
+    """
+    model = BatchLBOModel(params, frequency=frequency)
+    p, ppy = model.p, model.periods_per_year
+    lines = model.project()
+    returns = model.get_returns()
+    exit_period = model.exit_period[:, None]
+    s = np.arange(model.n_periods)
+
+    # Period weights: up to exit (Balance FCF accumulates), the same net of
+    # tax where the period pays tax, and the last year before exit (LTM EBITDA)
+    live = s[None, :] < exit_period
+    clean = lambda key: np.where(live, lines[key], 0.0)
+    revenue, ebt, beginning_debt = clean('Revenue'), clean('EBT'), clean('Beginning_Debt')
+    taxed = live & (ebt * p['tax_rate'][:, None] > 0)
+    after_tax = np.where(taxed, 1 - p['tax_rate'][:, None], live.astype(float))
+    ltm = live & (s[None, :] >= exit_period - ppy)
+    total = lambda weight, x: (weight * x).sum(axis=1)
+
+    # Revenue_s = ltm_revenue / ppy * (1 + g) ** (s + 1)
+    growth = 1 + compound_rate(p['revenue_growth'], ppy)
+    compounded, d_compounded = _powers(growth, s + 1)
+    # Beginning debt_s = debt * (1 - r) ** s
+    repay = -compound_rate(-p['mandatory_repay_pct'], ppy)
+    outstanding, d_outstanding = _powers(1 - repay, s)
+    left_at_exit, d_left_at_exit = _powers(1 - repay, model.exit_period[:, None])
+    left_at_exit, d_left_at_exit = left_at_exit[:, 0], d_left_at_exit[:, 0]
+
+    def revenue_terms(curve):
+        """Exit-proceeds coefficient of a change in the revenue curve"""
+        return (p['exit_multiple'] * p['ebitda_margin'] * total(ltm, curve)
+                + p['ebitda_margin'] * total(after_tax, curve) - p['nwc_pct'] * total(live, curve))
+
+    rate = p['interest_rate'] / ppy
+    debt = model.debt
+    # Coefficients of a change in entry debt and in the per-period repayment rate
+    d_debt = -rate * total(after_tax, outstanding) - repay * total(live, outstanding) - left_at_exit
+    d_rate = (debt * (rate * total(after_tax, d_outstanding) + repay * total(live, d_outstanding)
+                      + d_left_at_exit) - total(live, beginning_debt))
+
+    d = {
+        'purchase_price': d_debt * p['debt_pct'],
+        'fee_pct': np.zeros(model.n),
+        'debt_pct': d_debt * p['purchase_price'],
+        'ltm_revenue': revenue_terms(compounded) / ppy,
+        'ltm_ebitda': np.zeros(model.n),
+        'ebitda_margin': p['exit_multiple'] * total(ltm, revenue) + total(after_tax, revenue),
+        'revenue_growth': (p['ltm_revenue'] / ppy * rate_slope(p['revenue_growth'], ppy)
+                           * revenue_terms(d_compounded)),
+        'tax_rate': -total(taxed, ebt),
+        'capex': -total(live, 1.0) / ppy,
+        'depreciation': (total(live, 1.0) - total(after_tax, 1.0)) / ppy,
+        'nwc_pct': -total(live, revenue),
+        'interest_rate': -total(after_tax, beginning_debt) / ppy,
+        'mandatory_repay_pct': d_rate * rate_slope(-p['mandatory_repay_pct'], ppy),
+        'exit_multiple': returns['exit_ebitda'],
+    }
+    d_proceeds = np.stack([d[k] for k in GREEK_PARAMS], axis=1)
+
+    # Equity = purchase_price * (1 + fee_pct - debt_pct)
+    d_equity = np.zeros_like(d_proceeds)
+    d_equity[:, GREEK_PARAMS.index('purchase_price')] = 1 + p['fee_pct'] - p['debt_pct']
+    d_equity[:, GREEK_PARAMS.index('fee_pct')] = p['purchase_price']
+    d_equity[:, GREEK_PARAMS.index('debt_pct')] = -p['purchase_price']
+
+    equity = model.equity[:, None]
+    moic, irr = returns['moic'][:, None], returns['irr'][:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d_moic = np.where(equity > 0, (d_proceeds - moic * d_equity) / equity, 0.0)
+        d_irr = np.where(moic > 0, (1 + irr) / (model.hold_years[:, None] * moic) * d_moic, 0.0)
+    return {'param': np.array(GREEK_PARAMS), 'irr': returns['irr'], 'moic': returns['moic'],
+            'd_irr': d_irr, 'd_moic': d_moic, 'd_equity_proceeds': d_proceeds}
+
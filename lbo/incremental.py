@@ -0,0 +1,122 @@
+"""
+Incremental recomputation over the model's stage dependency graph.
+
+    model = IncrementalModel()
+    model.update(params)                       # ('operating', 'debt', 'exit')
+    model.update({**params, 'exit_multiple': 11.0})   # ('exit',)
+
+The projection splits into three stages. Each declares the inputs it reads
+directly and the stages it consumes; changing an input invalidates its stage
+and everything downstream, and only those stages are recomputed.
+"""
+
+import numpy as np
+
+from .engine import PARAM_KEYS, RETURN_KEYS, START_YEAR, BatchLBOModel, LBOModel, to_columns
+
+STAGES = ('operating', 'debt', 'exit')
+
+# Inputs each stage reads directly (hold_years sets the horizon, so it is operating)
+STAGE_INPUTS = {
+    'operating': {'ltm_revenue', 'revenue_growth', 'ebitda_margin', 'depreciation', 'nwc_pct',
+                  'hold_years'},
+    'debt': {'purchase_price', 'debt_pct', 'interest_rate', 'mandatory_repay_pct', 'tax_rate',
+             'capex'},
+    'exit': {'exit_multiple', 'purchase_price', 'fee_pct', 'debt_pct', 'ltm_ebitda',
+             'hold_years'},
+}
+
+STAGE_DEPENDS = {
+    'operating': (),
+    'debt': ('operating',),
+    'exit': ('operating', 'debt'),
+}
+
+
+def affected_stages(changed):
+    """Stages to recompute, in STAGES order, when the inputs in changed move"""
+    dirty = set()
+    for stage in STAGES:
+        if STAGE_INPUTS[stage] & set(changed) or dirty & set(STAGE_DEPENDS[stage]):
+            dirty.add(stage)
+    return tuple(s for s in STAGES if s in dirty)
+
+
+class IncrementalModel:
+    """
+    BatchLBOModel that keeps its stage outputs between updates.
+    update() diffs the new params against the last ones and recomputes only
+    the affected stages. last_recomputed names the stages the latest update
+    ran; stage_runs counts runs per stage since construction.
+    frequency and start_year are fixed for the model's lifetime.
+    """
+
+    def __init__(self, debt_structure=None, frequency='annual', start_year=START_YEAR):
+        self.debt_structure = debt_structure
+        self.frequency = frequency
+        self.start_year = start_year
+        self.columns = None
+        self.model = None
+        self.returns = None
+        self._operating = None
+        self._financing = None
+        self._projection = None
+        self.updates = 0
+        self.last_recomputed = ()
+        self.stage_runs = dict.fromkeys(STAGES, 0)
+
+    def changed_inputs(self, columns):
+        if self.columns is None:
+            return set(PARAM_KEYS)
+        return {k for k in PARAM_KEYS
+                if self.columns[k].shape != columns[k].shape
+                or not np.array_equal(self.columns[k], columns[k])}
+
+    def update(self, params):
+        """Bring the model up to date with params; returns the recomputed stages"""
+        columns = {k: np.array(v) for k, v in to_columns(params).items()}
+        stages = affected_stages(self.changed_inputs(columns))
+        self.columns = columns
+        self.updates += 1
+        self.last_recomputed = stages
+        if not stages:
+            return stages
+
+        model = BatchLBOModel(columns, debt_structure=self.debt_structure,
+                              frequency=self.frequency, start_year=self.start_year)
+        if 'operating' in stages:
+            self._operating = model.operating_lines()
+        if 'debt' in stages:
+            self._financing = model.financing_lines(self._operating)
+            self._projection = None
+        elif self.model is not None:
+            model.tranche_lines = self.model.tranche_lines
+        model.assemble(self._operating, self._financing)
+        self.model = model
+        self.returns = model.get_returns()
+        for stage in stages:
+            self.stage_runs[stage] += 1
+        return stages
+
+    def evaluate(self, params):
+        """
+        Single-deal (model, projection, returns) like LBOModel, rebuilding
+        only what the change from the previous call invalidates. The projection
+        (and its DataFrame) is reused as long as neither the operating nor the
+        debt stage reran.
+        """
+        self.update(params)
+        model = LBOModel(params, frequency=self.frequency, start_year=self.start_year)
+        if self._projection is None:
+            self._projection = self.model.projection(0)
+        model.projection = self._projection
+        returns = {k: self.returns[k][0].item() for k in RETURN_KEYS}
+        return model, self._projection, returns
+
+    def stats(self):
+        return {
+            'updates': self.updates,
+            'last_recomputed': list(self.last_recomputed),
+            'stages_recomputed': len(self.last_recomputed),
+            'stage_runs': dict(self.stage_runs),
+        }
@@ -0,0 +1,141 @@
+"""
+Vectorized IRR over many cash-flow series at once.
+
+irr_from_moic() is exact when the sponsor has one entry and one exit flow.
+solve_irr() handles any cash-flow vector (dividends, recaps, interim
+distributions): safeguarded Halley/Newton iterations on all rows together,
+falling back to bisection inside a per-row sign-change bracket.
+"""
+
+import numpy as np
+
+from .engine import irr_from_moic  # noqa: F401  (closed form, re-exported)
+
+
+def _times(times, shape):
+    """Flow times in periods: (1, m) shared or (n, m) per row"""
+    if times is None:
+        return np.arange(shape[1], dtype=float)[None, :]
+    times = np.asarray(times, dtype=float)
+    return times[None, :] if times.ndim == 1 else times
+
+
+def _npv_derivatives(rate, cashflows, times):
+    """NPV and its first two derivatives in rate, one value per row"""
+    growth = 1.0 + rate[:, None]
+    discounted = cashflows * np.exp(-times * np.log(growth))
+    f = discounted.sum(axis=1)
+    f1 = (-times * discounted).sum(axis=1) / growth[:, 0]
+    f2 = (times * (times + 1) * discounted).sum(axis=1) / growth[:, 0] ** 2
+    return f, f1, f2
+
+
+def _sign_changes(cashflows):
+    """Sign changes along each row, zero flows skipped"""
+    signs = np.sign(cashflows)
+    last_nonzero = np.maximum.accumulate(
+        np.where(signs != 0, np.arange(signs.shape[1]), 0), axis=1)
+    filled = np.take_along_axis(signs, last_nonzero, axis=1)
+    return (filled[:, 1:] * filled[:, :-1] < 0).sum(axis=1)
+
+
+def _scan_brackets(cashflows, times, per_row_times, lo, hi, f_lo, has_root, sign_changes,
+                   points=129):
+    """
+    Flows with several sign changes can have roots without an NPV sign change
+    at the bracket ends: scan a log-spaced rate grid for the first crossing
+    (updates lo/hi/f_lo/has_root in place). With a single sign change the
+    root is unique (Descartes), so only multi-change rows are scanned.
+    """
+    missing = np.flatnonzero(~has_root & (sign_changes >= 2))
+    if not missing.size:
+        return
+    grid = np.expm1(np.linspace(np.log1p(lo[0]), np.log1p(hi[0]), points))
+    rows = cashflows[missing]
+    row_times = times[missing] if per_row_times else times
+    prev = _npv_derivatives(np.full(missing.size, grid[0]), rows, row_times)[0]
+    found = np.zeros(missing.size, dtype=bool)
+    for a, b in zip(grid[:-1], grid[1:]):
+        cur = _npv_derivatives(np.full(missing.size, b), rows, row_times)[0]
+        crossing = ~found & (np.sign(prev) * np.sign(cur) <= 0) & np.isfinite(prev) & np.isfinite(cur)
+        idx = missing[crossing]
+        lo[idx], hi[idx], f_lo[idx] = a, b, prev[crossing]
+        found |= crossing
+        prev = cur
+    has_root[missing[found]] = True
+
+
+def npv(rate, cashflows, times=None):
+    """NPV of each cash-flow row at its rate (NaN flows count as zero)"""
+    cashflows = np.nan_to_num(np.atleast_2d(np.asarray(cashflows, dtype=float)))
+    rate = np.broadcast_to(np.asarray(rate, dtype=float), (cashflows.shape[0],))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _npv_derivatives(rate, cashflows, _times(times, cashflows.shape))[0]
+
+
+def solve_irr(cashflows, times=None, tol=1e-10, max_iter=100, bracket=(-0.99, 10.0),
+              method='halley'):
+    """
+    IRR of every row of cashflows, shape (n_series, n_flows).
+    times gives each flow's time in periods (default 0, 1, 2, ...), shared or
+    per row; NaN flows count as zero, so ragged hold periods can be NaN-padded.
+    Returns (irr, converged). Rows with no sign change of NPV inside bracket get
+    NaN and converged=False, as do rows whose flows never change sign (all
+    zero, where every rate is a root, or all one sign, where none is). With
+    several sign changes in the flows, one root inside the bracket is returned.
+    """
+    if method not in ('halley', 'newton'):
+        raise ValueError(f"Unknown method '{method}'")
+    cashflows = np.nan_to_num(np.atleast_2d(np.asarray(cashflows, dtype=float)))
+    n = cashflows.shape[0]
+    times = _times(times, cashflows.shape)
+    per_row_times = times.shape[0] == n and n > 1
+
+    lo = np.full(n, float(bracket[0]))
+    hi = np.full(n, float(bracket[1]))
+    rate = np.full(n, np.nan)
+    converged = np.zeros(n, dtype=bool)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        f_lo = _npv_derivatives(lo, cashflows, times)[0]
+        f_hi = _npv_derivatives(hi, cashflows, times)[0]
+        sign_changes = _sign_changes(cashflows)
+        has_root = (np.sign(f_lo) * np.sign(f_hi) <= 0) & (sign_changes > 0)
+        _scan_brackets(cashflows, times, per_row_times, lo, hi, f_lo, has_root, sign_changes)
+
+        # Start from the single-flow closed form: (inflows / outflows) ** (1 / span) - 1
+        inflows = np.where(cashflows > 0, cashflows, 0).sum(axis=1)
+        outflows = -np.where(cashflows < 0, cashflows, 0).sum(axis=1)
+        span = np.where(cashflows != 0, np.broadcast_to(times, cashflows.shape), 0).max(axis=1)
+        guess = (inflows / outflows) ** (1 / np.maximum(span, 1e-12)) - 1
+        guess = np.where(np.isfinite(guess), guess, 0.1)
+        rate[has_root] = np.clip(guess, lo + 1e-9, hi - 1e-9)[has_root]
+
+        active = np.flatnonzero(has_root)
+        for _ in range(max_iter):
+            if not active.size:
+                break
+            r = rate[active]
+            f, f1, f2 = _npv_derivatives(r, cashflows[active], times[active] if per_row_times else times)
+
+            # Keep the sign-change bracket tight around the root
+            below = np.sign(f) == np.sign(f_lo[active])
+            lo[active] = np.where(below, r, lo[active])
+            f_lo[active] = np.where(below, f, f_lo[active])
+            hi[active] = np.where(below, hi[active], r)
+
+            if method == 'halley':
+                step = 2 * f * f1 / (2 * f1 * f1 - f * f2)
+            else:
+                step = f / f1
+            candidate = r - step
+            a, b = lo[active], hi[active]
+            outside = ~np.isfinite(candidate) | (candidate <= a) | (candidate >= b)
+            candidate = np.where(outside, 0.5 * (a + b), candidate)
+
+            done = (f == 0) | (np.abs(candidate - r) <= tol * (1 + np.abs(r))) | (b - a <= tol)
+            rate[active] = np.where(f == 0, r, candidate)
+            converged[active[done]] = True
+            active = active[~done]
+
+    return rate, converged
@@ -0,0 +1,261 @@
+"""
+Background jobs for long runs (large grids, Monte Carlo, goal-seek grids),
+so a caller can submit, poll and cancel instead of blocking on the result.
+
+    queue = JobQueue(max_workers=2, max_per_owner=1)
+    job_id = queue.submit(simulation_job, params, distributions, n_paths=1_000_000,
+                          owner=session_id, name='Monte Carlo')
+    job = queue.get(job_id)
+    job.status, job.progress, job.partial    # poll; partial grows as chunks finish
+    queue.cancel(job_id)
+
+A job function takes the Job as its first argument and calls
+job.report(progress, partial) between chunks of work; report() raises
+Cancelled once the job has been cancelled, which is how a running job
+stops. Jobs run on a local thread pool: the batch engine spends its time
+in NumPy, which releases the GIL, and partial results are shared without
+copying them between processes. max_workers bounds the jobs running at
+once across all owners and max_per_owner bounds one owner's queued plus
+running jobs, so a heavy user cannot starve the others.
+"""
+
+import math
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .goalseek import goal_seek_grid
+from .montecarlo import simulate_returns, summarize_simulation
+from .sensitivity import grid_sensitivity
+
+STATUSES = ('queued', 'running', 'done', 'failed', 'cancelled')
+FINISHED = ('done', 'failed', 'cancelled')
+
+
+class Cancelled(Exception):
+    """Raised inside a job by Job.report() once the job has been cancelled"""
+
+
+class JobLimitError(RuntimeError):
+    """The owner already has max_per_owner jobs queued or running"""
+
+
+class Job:
+    """
+    One submitted run. status is one of STATUSES; progress runs 0 to 1;
+    partial is the latest partial result the job reported, result the
+    final one and error the message of a failed job.
+    """
+
+    def __init__(self, name, owner):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.owner = owner
+        self.status = 'queued'
+        self.progress = 0.0
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def done(self):
+        return self.status in FINISHED
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def report(self, progress, partial=None):
+        """Publish progress (0 to 1) and optionally a partial result; raises Cancelled"""
+        if self._cancel.is_set():
+            raise Cancelled(self.id)
+        with self._lock:
+            self.progress = min(max(float(progress), 0.0), 1.0)
+            if partial is not None:
+                self.partial = partial
+
+    def snapshot(self):
+        """(status, progress, partial) read together"""
+        with self._lock:
+            return self.status, self.progress, self.partial
+
+
+class JobQueue:
+    """
+    Local worker pool running Jobs in submission order. Finished jobs are
+    kept for keep_seconds so their owner can collect the result.
+    """
+
+    def __init__(self, max_workers=2, max_per_owner=1, keep_seconds=600):
+        if max_workers < 1 or max_per_owner < 1:
+            raise ValueError("max_workers and max_per_owner must be at least 1")
+        self.max_workers = max_workers
+        self.max_per_owner = max_per_owner
+        self.keep_seconds = keep_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='lbo-job')
+        self._jobs = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, name=None, owner=None, **kwargs):
+        """
+        Queue fn(job, *args, **kwargs) and return the job id. Raises
+        JobLimitError when owner already has max_per_owner unfinished jobs.
+        """
+        job = Job(name or getattr(fn, '__name__', 'job'), owner)
+        with self._lock:
+            self._prune()
+            active = sum(1 for j in self._jobs.values() if j.owner == owner and not j.done)
+            if active >= self.max_per_owner:
+                raise JobLimitError(f"{active} job(s) already running for this user "
+                                    f"(limit {self.max_per_owner}); wait or cancel one")
+            self._jobs[job.id] = job
+            self._futures[job.id] = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def get(self, job_id):
+        """The Job, or None for an unknown or expired id"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, owner=None):
+        with self._lock:
+            return [j for j in self._jobs.values() if owner is None or j.owner == owner]
+
+    def cancel(self, job_id):
+        """Stop a queued job now, or a running one at its next report(); False if already finished"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            future = self._futures.get(job_id)
+        if job is None or job.done:
+            return False
+        job._cancel.set()
+        if future is not None and future.cancel():
+            self._finish(job, 'cancelled')
+        return True
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancelled:
+            self._finish(job, 'cancelled')
+            return
+        with job._lock:
+            job.status = 'running'
+            job.started = time.time()
+        try:
+            result = fn(job, *args, **kwargs)
+        except Cancelled:
+            self._finish(job, 'cancelled')
+        except Exception as e:
+            self._finish(job, 'failed', error=f"{type(e).__name__}: {e}")
+        else:
+            self._finish(job, 'done', result=result)
+
+    def _finish(self, job, status, result=None, error=None):
+        with job._lock:
+            if job.done:
+                return
+            job.result = result
+            job.error = error
+            if status == 'done':
+                job.progress = 1.0
+            job.finished = time.time()
+            job.status = status
+        with self._lock:
+            self._futures.pop(job.id, None)
+
+    def _prune(self):
+        cutoff = time.time() - self.keep_seconds
+        for job_id in [i for i, j in self._jobs.items() if j.done and j.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            counts = {s: 0 for s in STATUSES}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {**counts, 'max_workers': self.max_workers, 'max_per_owner': self.max_per_owner}
+
+    def shutdown(self, wait=True):
+        """Cancel everything outstanding and stop the workers"""
+        for job in self.jobs():
+            self.cancel(job.id)
+        self._executor.shutdown(wait=wait)
+
+
+def simulation_job(job, params, distributions, n_paths=100_000, cache=None, summary_every=0.5,
+                   **kwargs):
+    """
+    simulate_returns() as a job (through cache.simulate() when a ModelCache
+    is given). partial is summarize_simulation() over the paths finished so
+    far, plus 'paths', refreshed at most every summary_every seconds (the
+    percentiles re-sort every finished path); the result is
+    {'sim': ..., 'summary': ...}.
+    """
+    last = [0.0]
+
+    def progress(done, sim):
+        now = time.perf_counter()
+        if now - last[0] < summary_every:
+            job.report(done / n_paths)
+            return
+        job.report(done / n_paths, {**summarize_simulation(sim), 'paths': done})
+        last[0] = time.perf_counter()
+
+    if cache is not None:
+        sim = cache.simulate(params, distributions, n_paths=n_paths, progress=progress, **kwargs)
+    else:
+        sim = simulate_returns(params, distributions, n_paths=n_paths, progress=progress, **kwargs)
+    return {'sim': sim, 'summary': summarize_simulation(sim)}
+
+
+def _row_blocks(n_rows, steps):
+    size = max(1, math.ceil(n_rows / steps))
+    return [slice(start, min(start + size, n_rows)) for start in range(0, n_rows, size)]
+
+
+def grid_job(job, params, row_param, row_values, col_param, col_values, frequency='annual', steps=20):
+    """
+    grid_sensitivity() as a job, a block of rows at a time (about steps
+    blocks). partial is the grid so far, NaN where rows are still pending.
+    """
+    row_values = np.asarray(row_values, dtype=float)
+    col_values = np.asarray(col_values, dtype=float)
+    grid = None
+    for rows in _row_blocks(len(row_values), steps):
+        block = grid_sensitivity(params, row_param, row_values[rows], col_param, col_values, frequency)
+        if grid is None:
+            grid = {k: np.full((len(row_values), len(col_values)), np.nan) for k in block}
+        for key, values in block.items():
+            grid[key][rows] = values
+        job.report(rows.stop / len(row_values), {k: v.copy() for k, v in grid.items()})
+    return grid
+
+
+def goal_seek_grid_job(job, params, solve_param, target, row_param, row_values, col_param, col_values,
+                       metric='irr', bracket=None, frequency='annual', steps=20):
+    """
+    goal_seek_grid() as a job, a block of rows at a time. partial is the
+    solved grid so far, NaN where rows are still pending.
+    """
+    row_values = np.asarray(row_values, dtype=float)
+    col_values = np.asarray(col_values, dtype=float)
+    grid = np.full((len(row_values), len(col_values)), np.nan)
+    for rows in _row_blocks(len(row_values), steps):
+        grid[rows] = goal_seek_grid(params, solve_param, target, row_param, row_values[rows],
+                                    col_param, col_values, metric, bracket, frequency)
+        job.report(rows.stop / len(row_values), grid.copy())
+    return grid
@@ -0,0 +1,132 @@
+"""
+Monte Carlo IRR/MOIC simulation on top of the batch engine
+"""
+
+import numpy as np
+
+from .covenants import breach_summary, check_covenants
+from .engine import ATTRACTIVE_IRR, MARGINAL_IRR, PARAM_KEYS, BatchLBOModel, periods_per_year
+
+
+MC_PARAMS = ['revenue_growth', 'ebitda_margin', 'exit_multiple', 'interest_rate']
+
+
+def _norm_cdf(z):
+    """Standard normal CDF via a Chebyshev erfc fit (|error| < 1.2e-7)"""
+    x = np.abs(z) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.5 * x)
+    poly = -1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (
+            -0.82215223 + t * 0.17087277))))))))
+    erfc = t * np.exp(-x * x + poly)
+    return np.where(z >= 0, 1.0 - 0.5 * erfc, 0.5 * erfc)
+
+
+def _sample(spec, z):
+    """Map standard normal draws z onto a distribution spec tuple"""
+    kind = spec[0]
+    if kind == 'normal':
+        _, mean, sd = spec
+        return mean + sd * z
+    u = _norm_cdf(z)
+    if kind == 'uniform':
+        _, low, high = spec
+        return low + (high - low) * u
+    if kind == 'triangular':
+        _, low, mode, high = spec
+        if not low <= mode <= high or low == high:
+            raise ValueError(f"Triangular needs low <= mode <= high, got {spec}")
+        split = (mode - low) / (high - low)
+        return np.where(u < split,
+                        low + np.sqrt(u * (high - low) * (mode - low)),
+                        high - np.sqrt((1 - u) * (high - low) * (high - mode)))
+    raise ValueError(f"Unknown distribution '{kind}'")
+
+
+def simulate_returns(params, distributions, n_paths=100_000, correlation=None,
+                     seed=None, chunk_size=50_000, frequency='annual', covenants=None, progress=None):
+    """
+    Monte Carlo IRR/MOIC over n_paths.
+    distributions maps param name -> ('normal', mean, sd) | ('uniform', low, high)
+    | ('triangular', low, mode, high); other params stay fixed. correlation is an
+    optional matrix over the distributions in dict order (Gaussian copula).
+    Paths run through BatchLBOModel chunk_size at a time, so peak memory depends
+    on chunk_size, not n_paths; only IRR and MOIC are kept per path.
+    chunk_size counts annual paths: quarterly and monthly chunks hold
+    proportionally fewer paths, so a chunk's projection stays the same size.
+    With covenants (lbo.covenants.Covenant list), each path also keeps its
+    first breach period and minimum headroom per covenant under
+    sim['covenants'].
+    progress, if given, is called as progress(paths_done, partial) after every
+    chunk, partial being the same dict over the paths finished so far; it may
+    raise to abandon the run.
+    """
+    names = list(distributions)
+    unknown = set(names) - set(PARAM_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown params: {sorted(unknown)}")
+    chol = None
+    if correlation is not None:
+        correlation = np.asarray(correlation, dtype=float)
+        if correlation.shape != (len(names), len(names)):
+            raise ValueError(f"Correlation must be {len(names)}x{len(names)}")
+        try:
+            chol = np.linalg.cholesky(correlation)
+        except np.linalg.LinAlgError:
+            raise ValueError("Correlation matrix must be positive definite") from None
+
+    chunk_size = max(1, chunk_size // periods_per_year(frequency))
+    rng = np.random.default_rng(seed)
+    irr = np.empty(n_paths)
+    moic = np.empty(n_paths)
+    tested = {}
+    if covenants:
+        tested = {name: {'first_breach': np.zeros(n_paths, dtype=np.int64),
+                         'min_headroom': np.empty(n_paths)}
+                  for name in [c.name for c in covenants] + ['any']}
+    for start in range(0, n_paths, chunk_size):
+        stop = min(start + chunk_size, n_paths)
+        z = rng.standard_normal((stop - start, len(names)))
+        if chol is not None:
+            z = z @ chol.T
+        columns = {k: params[k] for k in PARAM_KEYS}
+        for j, name in enumerate(names):
+            columns[name] = _sample(distributions[name], z[:, j])
+        model = BatchLBOModel(columns, frequency=frequency)
+        returns = model.get_returns()
+        irr[start:stop] = returns['irr']
+        moic[start:stop] = returns['moic']
+        if covenants:
+            for name, result in check_covenants(model, covenants).items():
+                for key, out in tested[name].items():
+                    out[start:stop] = result[key]
+        if progress is not None:
+            progress(stop, _paths(irr, moic, tested, stop))
+    return _paths(irr, moic, tested, n_paths)
+
+
+def _paths(irr, moic, tested, stop):
+    """Simulation result over the first stop paths"""
+    sim = {'irr': irr[:stop], 'moic': moic[:stop]}
+    if tested:
+        sim['covenants'] = {name: {k: v[:stop] for k, v in out.items()} for name, out in tested.items()}
+    return sim
+
+
+def summarize_simulation(sim, percentiles=(5, 25, 50, 75, 95),
+                         hurdles=(MARGINAL_IRR, ATTRACTIVE_IRR)):
+    """
+    Percentiles, means and IRR hurdle probabilities of simulate_returns() output,
+    plus per-covenant breach probabilities when the simulation tested covenants
+    """
+    summary = {
+        'percentiles': list(percentiles),
+        'irr_percentiles': np.percentile(sim['irr'], percentiles),
+        'moic_percentiles': np.percentile(sim['moic'], percentiles),
+        'irr_mean': float(sim['irr'].mean()),
+        'moic_mean': float(sim['moic'].mean()),
+        'hurdle_probability': {h: float((sim['irr'] >= h).mean()) for h in hurdles},
+    }
+    if 'covenants' in sim:
+        summary['covenants'] = breach_summary(sim['covenants'])
+    return summary
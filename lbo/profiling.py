@@ -0,0 +1,89 @@
+"""
+Lightweight wall-time profiler for one app rerun (or any other unit of work).
+
+    profiler = RerunProfiler(enabled=True)
+    with profiler.section('model'):
+        ...
+    profiler.count('model_evaluations')
+    profiler.to_json(), profiler.to_csv()
+
+Sections nest: a section opened inside another is recorded as
+'outer/inner'. When disabled, section() and count() do nothing.
+"""
+
+import csv
+import io
+import json
+import time
+import uuid
+from contextlib import contextmanager
+
+
+class RerunProfiler:
+    """Section wall times, counters and stats snapshots for one rerun"""
+
+    def __init__(self, enabled=True, rerun_id=None):
+        self.enabled = enabled
+        self.rerun_id = rerun_id or uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self.sections = []
+        self.counters = {}
+        self.stats = {}
+        self._stack = []
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def section(self, name):
+        if not self.enabled:
+            yield
+            return
+        self._stack.append(name)
+        path = '/'.join(self._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections.append({'section': path, 'depth': len(self._stack) - 1,
+                                  'start': start - self._t0, 'seconds': time.perf_counter() - start})
+            self._stack.pop()
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record_stats(self, name, stats):
+        """Snapshot of a stats dict (e.g. ModelCache.stats()) under name"""
+        if self.enabled:
+            self.stats[name] = dict(stats)
+
+    def total_seconds(self):
+        return time.perf_counter() - self._t0
+
+    def records(self):
+        """One flat row per section, in completion order"""
+        return [{'rerun_id': self.rerun_id, 'timestamp': self.started, **s} for s in self.sections]
+
+    def to_dict(self):
+        return {
+            'rerun_id': self.rerun_id,
+            'timestamp': self.started,
+            'total_seconds': self.total_seconds(),
+            'sections': self.sections,
+            'counters': self.counters,
+            'stats': self.stats,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), default=str)
+
+    def to_csv(self):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, ['rerun_id', 'timestamp', 'section', 'depth', 'start', 'seconds'])
+        writer.writeheader()
+        writer.writerows(self.records())
+        return buffer.getvalue()
+
+    def append_trace(self, path):
+        """Append this rerun as one JSON line, so traces aggregate across sessions"""
+        with open(path, 'a') as f:
+            f.write(self.to_json() + '\n')
@@ -0,0 +1,116 @@
+"""
+Grid and tornado (one-at-a-time) sensitivity on top of the batch engine
+"""
+
+import numpy as np
+
+from .engine import PARAM_KEYS, BatchLBOModel
+
+
+# Inputs that only enter the exit step: flexing them never changes the projection
+EXIT_ONLY_PARAMS = {'exit_multiple'}
+
+# Flexed by tornado() by default. ltm_ebitda follows revenue x margin and
+# hold_years is an integer, so both are left out unless shocks names them.
+TORNADO_PARAMS = [k for k in PARAM_KEYS if k not in ('ltm_ebitda', 'hold_years')]
+
+
+def link_entry_ebitda(columns):
+    """Entry EBITDA follows LTM revenue x EBITDA margin, as in the sidebar"""
+    columns['ltm_ebitda'] = columns['ltm_revenue'] * columns['ebitda_margin']
+    return columns
+
+
+def grid_sensitivity(params, row_param, row_values, col_param, col_values, frequency='annual'):
+    """
+    Evaluate every (row, col) combination of two params in one batched call.
+    Returns a dict of (len(row_values), len(col_values)) arrays, one per
+    get_returns() key. When one axis is exit-only, the operating projection
+    runs once per value of the other axis and the exit step is broadcast
+    across the exit axis.
+    """
+    if row_param == col_param:
+        raise ValueError("Grid axes must be two different params")
+    row_values = np.asarray(row_values, dtype=float)
+    col_values = np.asarray(col_values, dtype=float)
+    shape = (len(row_values), len(col_values))
+    linked = {'ebitda_margin', 'ltm_revenue'} & {row_param, col_param}
+
+    if row_param in EXIT_ONLY_PARAMS or col_param in EXIT_ONLY_PARAMS:
+        transpose = row_param in EXIT_ONLY_PARAMS
+        exit_values, other_param, other_values = (
+            (row_values, col_param, col_values) if transpose
+            else (col_values, row_param, row_values))
+        columns = {k: params[k] for k in PARAM_KEYS}
+        columns[other_param] = other_values
+        if linked:
+            link_entry_ebitda(columns)
+        model = BatchLBOModel(columns, frequency=frequency)
+        model.project()
+        exit_grid = np.broadcast_to(exit_values, (model.n, len(exit_values)))
+        returns = model.get_returns(exit_multiple=exit_grid)
+        if transpose:
+            returns = {k: v.T for k, v in returns.items()}
+    else:
+        row_grid, col_grid = np.meshgrid(row_values, col_values, indexing='ij')
+        columns = {k: params[k] for k in PARAM_KEYS}
+        columns[row_param] = row_grid.ravel()
+        columns[col_param] = col_grid.ravel()
+        if linked:
+            link_entry_ebitda(columns)
+        returns = BatchLBOModel(columns, frequency=frequency).get_returns()
+        returns = {k: v.reshape(shape) for k, v in returns.items()}
+
+    return {k: np.array(np.broadcast_to(v, shape)) for k, v in returns.items()}
+
+
+def tornado(params, shocks=None, pct=0.10, rank_by='irr', frequency='annual'):
+    """
+    One-at-a-time sensitivity: every param flexed down and up on its own,
+    with all 2 x N cases (plus the base case) in one BatchLBOModel call.
+    shocks maps a param to a delta, or a (down, up) pair of deltas, added to
+    its base value; TORNADO_PARAMS missing from shocks move by -/+ pct of
+    their base value. Returns a dict of arrays, one entry per param, sorted
+    by the absolute IRR (or MOIC, rank_by='moic') swing: 'param', 'low' and
+    'high' input values, 'irr_low', 'irr_high', 'moic_low', 'moic_high',
+    'irr_swing' and 'moic_swing' (high minus low); 'base' holds the base
+    case IRR and MOIC.
+    """
+    if rank_by not in ('irr', 'moic'):
+        raise ValueError("rank_by must be 'irr' or 'moic'")
+    shocks = dict(shocks or {})
+    names = TORNADO_PARAMS + [k for k in shocks if k not in TORNADO_PARAMS]
+    unknown = set(names) - set(PARAM_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown params: {sorted(unknown)}")
+    base = {k: float(params[k]) for k in PARAM_KEYS}
+
+    def deltas(k):
+        if k not in shocks:
+            return -pct * abs(base[k]), pct * abs(base[k])
+        return tuple(shocks[k]) if np.ndim(shocks[k]) else (-shocks[k], shocks[k])
+
+    down, up = np.array([deltas(k) for k in names], dtype=float).T
+    low = np.array([base[k] for k in names]) + down
+    high = np.array([base[k] for k in names]) + up
+
+    # Row 0 is the base case, then a (low, high) pair of rows per param
+    columns = {k: np.full(1 + 2 * len(names), v) for k, v in base.items()}
+    linked = np.zeros(1 + 2 * len(names), dtype=bool)
+    for i, name in enumerate(names):
+        rows = slice(1 + 2 * i, 3 + 2 * i)
+        columns[name][rows] = (low[i], high[i])
+        linked[rows] = name in ('ebitda_margin', 'ltm_revenue')
+    columns['ltm_ebitda'] = np.where(linked, columns['ltm_revenue'] * columns['ebitda_margin'],
+                                     columns['ltm_ebitda'])
+    returns = BatchLBOModel(columns, frequency=frequency).get_returns()
+
+    result = {'param': np.array(names), 'low': low, 'high': high}
+    for metric in ('irr', 'moic'):
+        result[f'{metric}_low'] = returns[metric][1::2]
+        result[f'{metric}_high'] = returns[metric][2::2]
+        result[f'{metric}_swing'] = result[f'{metric}_high'] - result[f'{metric}_low']
+    order = np.argsort(-np.abs(result[f'{rank_by}_swing']), kind='stable')
+    result = {k: v[order] for k, v in result.items()}
+    result['base'] = {'irr': float(returns['irr'][0]), 'moic': float(returns['moic'][0])}
+    return result
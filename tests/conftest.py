@@ -0,0 +1,12 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASE_PARAMS = {
+    'purchase_price': 100e6, 'fee_pct': 0.02, 'debt_pct': 0.6,
+    'ltm_revenue': 100e6, 'ltm_ebitda': 25e6, 'ebitda_margin': 0.25,
+    'revenue_growth': 0.05, 'tax_rate': 0.25, 'capex': 5e6, 'depreciation': 3e6,
+    'nwc_pct': -0.01, 'interest_rate': 0.07, 'mandatory_repay_pct': 0.10,
+    'exit_multiple': 10.0, 'hold_years': 5,
+}
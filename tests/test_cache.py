@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from lbo import DiskCache, ModelCache
+
+
+def test_byte_budget_evicts_oldest_entries():
+    cache = ModelCache(maxsize=100, max_bytes=3_000)
+    for i in range(5):
+        cache.get_or_compute(f'k{i}', lambda: {'values': np.zeros(100)})  # 800 bytes each
+    stats = cache.stats()
+    assert stats['size'] == 3 and stats['bytes'] == 2_400 and stats['evictions'] == 2
+    assert cache.get_or_compute('k4', lambda: None) is not None  # newest kept
+
+
+def test_value_over_budget_is_returned_but_not_kept():
+    cache = ModelCache(max_bytes=1_000)
+    cache.get_or_compute('small', lambda: np.zeros(10))
+    big = cache.get_or_compute('big', lambda: np.zeros(1_000))
+    assert big.shape == (1_000,)
+    assert cache.stats()['size'] == 1 and cache.stats()['bytes'] == 80
+
+
+def test_disk_hit_is_not_a_miss(tmp_path):
+    first = ModelCache(disk=DiskCache(tmp_path))
+    first.get_or_compute('k', lambda: {'values': np.arange(10.0)}, persist=True)
+    second = ModelCache(disk=DiskCache(tmp_path))
+    value = second.get_or_compute('k', lambda: pytest.fail("recomputed"), persist=True)
+    assert np.array_equal(value['values'], np.arange(10.0))
+    assert second.stats()['misses'] == 0 and second.stats()['disk_hits'] == 1
+    second.get_or_compute('k', lambda: pytest.fail("recomputed"), persist=True)
+    assert second.stats()['hits'] == 1  # now kept in memory too
+
+
+def test_disk_put_keeps_new_entry_and_skips_oversize(tmp_path):
+    disk = DiskCache(tmp_path, max_bytes=2_000)
+    disk.put('old', {'values': np.zeros(100)})
+    disk.put('new', {'values': np.zeros(245)})  # arrays fit; with .npy header and manifest, not
+    assert disk.get('old') is None and disk.get('new') is not None
+    disk.put('huge', {'values': np.zeros(1_000)})
+    assert disk.get('huge') is None and disk.get('new') is not None
+    assert disk.stats()['writes'] == 2
@@ -0,0 +1,18 @@
+import pytest
+
+from conftest import BASE_PARAMS
+from lbo import BatchLBOModel, DebtStructure, Tranche
+
+
+@pytest.mark.parametrize('shares', [(0.5, 0.4), (0.6, 0.6)])
+def test_shares_must_sum_to_one(shares):
+    with pytest.raises(ValueError, match="sum to 1"):
+        DebtStructure([Tranche('A', shares[0], 0.07), Tranche('B', shares[1], 0.09)])
+
+
+def test_average_interest_reports_convergence():
+    tranches = [Tranche('A', 0.5, 0.07, amort_pct=0.10), Tranche('B', 0.5, 0.09)]
+    for max_iter, converged in ((2, False), (50, True)):
+        structure = DebtStructure(tranches, average_interest=True, max_iter=max_iter)
+        BatchLBOModel(BASE_PARAMS, debt_structure=structure).get_returns()
+        assert structure.converged is converged
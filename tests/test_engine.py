@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import BASE_PARAMS
+from lbo import PERIODS_PER_YEAR, RETURN_KEYS, BatchLBOModel, LBOModel
+
+# Mixed hold periods plus a loss-making deal (negative EBT, no tax) and an
+# all-debt one (equity <= 0, MOIC 0)
+SCENARIOS = [
+    dict(BASE_PARAMS, hold_years=hold, exit_multiple=exit_multiple, revenue_growth=growth)
+    for hold, exit_multiple, growth in [(1, 8.0, 0.0), (3, 9.5, 0.08), (5, 10.0, 0.05), (7, 12.0, -0.03)]
+] + [
+    dict(BASE_PARAMS, hold_years=4, ebitda_margin=0.02, interest_rate=0.12),
+    dict(BASE_PARAMS, hold_years=2, debt_pct=1.05),
+]
+
+
+@pytest.mark.parametrize('frequency', list(PERIODS_PER_YEAR))
+def test_batch_reproduces_scalar_model(frequency):
+    batch = BatchLBOModel(SCENARIOS, frequency=frequency)
+    returns = batch.get_returns()
+    for i, params in enumerate(SCENARIOS):
+        model = LBOModel(params, frequency=frequency)
+        expected = model.get_returns()
+        for key in RETURN_KEYS:
+            assert returns[key][i] == expected[key], (i, key)
+        pd.testing.assert_frame_equal(batch.frame(i), model.project(), check_exact=True)
@@ -0,0 +1,30 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import BASE_PARAMS
+from lbo import RETURN_KEYS, BatchLBOModel, export_returns
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'jsonl'])
+def test_returns_round_trip_at_full_precision(fmt):
+    scenarios = dict(BASE_PARAMS, exit_multiple=np.linspace(6.0, 14.0, 50) / 3)
+    returns = BatchLBOModel(scenarios).get_returns()
+    buffer = io.BytesIO()
+    export_returns(returns, buffer, inputs=scenarios, fmt=fmt, chunk_size=16)
+    buffer.seek(0)
+    if fmt == 'csv':
+        frame = pd.read_csv(buffer, float_precision='round_trip')
+    else:
+        frame = pd.read_json(buffer, lines=True, precise_float=True)
+    assert len(frame) == 50
+    for key in RETURN_KEYS:
+        assert np.array_equal(frame[key].to_numpy(), np.asarray(returns[key])), key
+
+
+def test_jsonl_writes_non_finite_as_null():
+    buffer = io.BytesIO()
+    export_returns({'irr': np.array([np.nan, 0.1]), 'moic': np.array([np.inf, 2.0])}, buffer, fmt='jsonl')
+    assert buffer.getvalue().decode().splitlines()[0] == '{"scenario":0,"irr":null,"moic":null}'
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from lbo import format_millions, format_multiple, format_number, format_pct
+
+
+def fmt_m(value, decimals=1):
+    """The app's per-value formatter the vectorized one replaced"""
+    if abs(value) >= 1e6:
+        return f"${value / 1e6:,.{decimals}f}M"
+    else:
+        return f"${value:,.0f}"
+
+
+rng = np.random.default_rng(0)
+VALUES = np.concatenate([
+    [0.0, -0.0, -0.4, 0.5, 1.5, 2.5, -2.5, 0.125, 0.05, 0.15, 999.5, 999_999.5, 1e6, -1e6, 1_234_567.891],
+    [np.nan, np.inf, -np.inf, 2.0 ** 62, -(2.0 ** 62), 1e15 + 0.5, 1e20, -3.3e25],
+    rng.standard_normal(2_000) * 10.0 ** rng.integers(-2, 10, 2_000),  # every magnitude up to billions
+])
+
+
+@pytest.mark.parametrize('decimals', [0, 1, 2, 3])
+def test_format_number_matches_fstring(decimals):
+    expected = [f"{v:,.{decimals}f}" for v in VALUES.tolist()]
+    assert format_number(VALUES, decimals).tolist() == expected
+
+
+@pytest.mark.parametrize('decimals', [0, 1, 2])
+def test_format_millions_matches_fmt_m(decimals):
+    assert format_millions(VALUES, decimals).tolist() == [fmt_m(v, decimals) for v in VALUES.tolist()]
+
+
+@pytest.mark.parametrize('decimals', [0, 1])
+def test_format_pct_and_multiple_match_fstrings(decimals):
+    assert format_pct(VALUES, decimals).tolist() == [f"{v * 100:.{decimals}f}%" for v in VALUES.tolist()]
+    assert format_multiple(VALUES, decimals).tolist() == [f"{v:.{decimals}f}x" for v in VALUES.tolist()]
+
+
+def test_shape_is_kept():
+    assert format_number(np.arange(6.0).reshape(2, 3) * 1e3).tolist() == [['0', '1,000', '2,000'],
+                                                                          ['3,000', '4,000', '5,000']]
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import lbo
+from conftest import BASE_PARAMS
+from lbo import GREEK_PARAMS, BatchLBOModel, compound_rate, rate_slope, to_columns
+
+SCENARIOS = [BASE_PARAMS,
+             dict(BASE_PARAMS, hold_years=3, revenue_growth=0.12, exit_multiple=8.0),
+             dict(BASE_PARAMS, hold_years=7, debt_pct=0.7, mandatory_repay_pct=0.05),
+             dict(BASE_PARAMS, hold_years=4, ebitda_margin=0.05)]  # negative EBT, no tax
+
+
+def central_difference(frequency, key, rel=1e-6):
+    """Step h and (d IRR, d MOIC) for key by central finite differences"""
+    base = to_columns(SCENARIOS)
+    h = rel * np.maximum(np.abs(base[key]), 1e-3)
+    bumped = [BatchLBOModel(dict(base, **{key: base[key] + s * h}), frequency=frequency).get_returns()
+              for s in (1, -1)]
+    return h, [(bumped[0][k] - bumped[1][k]) / (2 * h) for k in ('irr', 'moic')]
+
+
+@pytest.mark.parametrize('frequency', ['annual', 'quarterly'])
+def test_greeks_match_finite_differences(frequency):
+    # Compared as the change over one step h, so the absolute tolerance (the
+    # differences' cancellation noise) means the same for every input
+    g = lbo.greeks(SCENARIOS, frequency=frequency)
+    assert list(g['param']) == GREEK_PARAMS
+    for j, key in enumerate(GREEK_PARAMS):
+        h, (d_irr, d_moic) = central_difference(frequency, key)
+        np.testing.assert_allclose(g['d_irr'][:, j] * h, d_irr * h, rtol=1e-7, atol=1e-15, err_msg=key)
+        np.testing.assert_allclose(g['d_moic'][:, j] * h, d_moic * h, rtol=1e-7, atol=1e-15, err_msg=key)
+
+
+@pytest.mark.parametrize('periods', [1, 4, 12])
+def test_rate_slope_matches_finite_differences(periods):
+    rate, h = np.array([-0.05, 0.0, 0.07, 0.3]), 1e-7
+    expected = (compound_rate(rate + h, periods) - compound_rate(rate - h, periods)) / (2 * h)
+    np.testing.assert_allclose(rate_slope(rate, periods), expected, rtol=1e-7)
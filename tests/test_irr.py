@@ -0,0 +1,16 @@
+import numpy as np
+
+from lbo import solve_irr
+
+
+def test_rows_without_a_sign_change_have_no_irr():
+    flows = np.array([
+        [-100.0, 10.0, 110.0],   # IRR 10%
+        [0.0, 0.0, 0.0],         # every rate is a root
+        [100.0, 10.0, 10.0],     # no root
+        [-100.0, 0.0, -5.0],     # no root
+    ])
+    irr, converged = solve_irr(flows)
+    np.testing.assert_allclose(irr[0], 0.10, rtol=1e-9)
+    np.testing.assert_array_equal(converged, [True, False, False, False])
+    assert np.isnan(irr[1:]).all()
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import lbo
+
+
+def test_all_covers_lazy_names():
+    assert set(lbo._LAZY) <= set(lbo.__all__) <= set(dir(lbo))
+    assert all(not name.startswith('_') for name in lbo.__all__)
+
+
+def test_star_import_binds_lazy_names():
+    namespace = {}
+    exec('from lbo import *', namespace)
+    assert set(lbo.__all__) <= set(namespace)
+    assert namespace['available_formats'] is lbo.export.available_formats
+
+
+def run_fresh(code):
+    """stdout of code run in a new interpreter, from the repo root"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True,
+                          check=True).stdout.strip()
+
+
+def test_import_stays_lazy():
+    code = "import sys, lbo; print(any(m in sys.modules for m in ('lbo.montecarlo', 'lbo.export')))"
+    assert run_fresh(code) == 'False'
+
+
+@pytest.mark.parametrize('touch', ['lbo.GREEK_PARAMS', 'lbo.ModelCache().greeks(BASE_PARAMS)',
+                                   'lbo.DiskCache', 'lbo.solve_irr'])
+def test_function_names_not_shadowed_by_submodules(touch):
+    code = f"""
+import types, lbo
+from tests.conftest import BASE_PARAMS
+{touch}
+namespace = {{}}
+exec('from lbo import *', namespace)
+print(callable(lbo.greeks), callable(namespace['greeks']),
+      [k for k in lbo.__all__ if isinstance(getattr(lbo, k), types.ModuleType)])
+"""
+    assert run_fresh(code) == 'True True []'
@@ -0,0 +1,16 @@
+import numpy as np
+
+from conftest import BASE_PARAMS
+from lbo import Portfolio
+
+
+def test_wiped_out_deal_is_at_risk_at_zero_hurdle():
+    # 10% margin, 80% debt, exit at 1x EBITDA: exit EV is far below the remaining debt
+    wiped_out = dict(BASE_PARAMS, debt_pct=0.8, exit_multiple=1.0, ebitda_margin=0.10, ltm_ebitda=10e6)
+    portfolio = Portfolio([BASE_PARAMS, wiped_out])
+    result = portfolio.stress({'Base': {}}, hurdle=0.0)
+
+    assert result['moic'][0, 1] < 0
+    assert result['irr'][0, 1] == 0.0  # irr_from_moic() floors a loss at 0
+    np.testing.assert_array_equal(result['at_risk'][0], [False, True])
+    assert result['deals_at_risk'][0] == 1
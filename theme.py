@@ -0,0 +1,223 @@
+"""
+Static styling and branding for the Streamlit app, built once per process.
+
+Streamlit re-executes app.py on every rerun, but modules it imports stay in
+sys.modules, so the CSS block and the header, sidebar and footer HTML are
+formatted here once, when the server first imports this module, instead of
+on every interaction. Comments and indentation are dropped as well, which
+trims the payload sent to the browser with each rerun.
+"""
+
+import re
+from functools import lru_cache
+
+COLORS = {
+    'dark_blue': '#003366',
+    'medium_blue': '#004d80',
+    'light_blue': '#ADD8E6',
+    'accent_gold': '#FFD700',
+    'bg_dark': '#0a1628',
+    'card_bg': '#112240',
+    'text_primary': '#e6f1ff',
+    'text_secondary': '#8892b0',
+    'success': '#28a745',
+    'danger': '#dc3545',
+}
+
+BRANDING = {
+    'name': 'The Mountain Path - World of Finance',
+    'instructor': 'Prof. V. Ravichandran',
+    'credentials': '28+ Years Corporate Finance & Banking | 10+ Years Academic Excellence',
+    'icon': '🏔️',
+}
+
+PAGE_CONFIG = {
+    'page_title': 'LBO Model | Mountain Path',
+    'page_icon': '🏔️',
+    'layout': 'wide',
+    'initial_sidebar_state': 'expanded',
+}
+
+
+def _compact(html):
+    """Strip CSS comments, indentation and blank lines"""
+    html = re.sub(r'/\*.*?\*/', '', html, flags=re.S)
+    return '\n'.join(line.strip() for line in html.splitlines() if line.strip())
+
+
+STYLES = _compact(f"""
+<style>
+    @import url('https://fonts.googleapis.com/css2?family=Playfair+Display:wght@600;700&family=Source+Sans+Pro:wght@300;400;600;700&display=swap');
+
+    .stApp {{
+        background: linear-gradient(135deg, {COLORS['bg_dark']} 0%, {COLORS['dark_blue']} 50%, #0d2137 100%);
+    }}
+
+    section[data-testid="stSidebar"] {{
+        background: linear-gradient(180deg, {COLORS['bg_dark']} 0%, {COLORS['dark_blue']} 100%);
+        border-right: 1px solid rgba(255,215,0,0.2);
+    }}
+
+    /* Force all sidebar text to be light colored */
+    section[data-testid="stSidebar"] label,
+    section[data-testid="stSidebar"] .stSlider label,
+    section[data-testid="stSidebar"] .stNumberInput label,
+    section[data-testid="stSidebar"] .stSelectbox label,
+    section[data-testid="stSidebar"] p,
+    section[data-testid="stSidebar"] span,
+    section[data-testid="stSidebar"] .stMarkdown p,
+    section[data-testid="stSidebar"] [data-testid="stWidgetLabel"] p,
+    section[data-testid="stSidebar"] [data-testid="stWidgetLabel"] label,
+    section[data-testid="stSidebar"] .stSlider [data-testid="stTickBarMin"],
+    section[data-testid="stSidebar"] .stSlider [data-testid="stTickBarMax"] {{
+        color: {COLORS['text_primary']} !important;
+    }}
+
+    /* Slider current value text */
+    section[data-testid="stSidebar"] [data-testid="stThumbValue"],
+    section[data-testid="stSidebar"] .stSlider div[data-testid="stTickBarMin"],
+    section[data-testid="stSidebar"] .stSlider div[data-testid="stTickBarMax"] {{
+        color: {COLORS['accent_gold']} !important;
+    }}
+
+    /* Number input and select box text inside fields */
+    section[data-testid="stSidebar"] input {{
+        color: #1a1a2e !important;
+        background-color: #ffffff !important;
+    }}
+    section[data-testid="stSidebar"] select,
+    section[data-testid="stSidebar"] .stSelectbox div[data-baseweb="select"] span {{
+        color: {COLORS['text_primary']} !important;
+    }}
+
+    .header-container {{
+        background: linear-gradient(135deg, {COLORS['dark_blue']}, {COLORS['medium_blue']});
+        border: 2px solid {COLORS['accent_gold']};
+        border-radius: 12px;
+        padding: 1.5rem 2rem;
+        margin-bottom: 1.5rem;
+        text-align: center;
+    }}
+    .header-container h1 {{
+        font-family: 'Playfair Display', serif;
+        color: {COLORS['accent_gold']};
+        margin: 0; font-size: 2rem;
+    }}
+    .header-container p {{
+        color: {COLORS['text_primary']};
+        font-family: 'Source Sans Pro', sans-serif;
+        margin: 0.3rem 0 0; font-size: 0.9rem;
+    }}
+
+    .metric-card {{
+        background: {COLORS['card_bg']};
+        border: 1px solid rgba(255,215,0,0.3);
+        border-radius: 10px;
+        padding: 1.2rem; text-align: center;
+        margin-bottom: 0.8rem;
+    }}
+    .metric-card .label {{
+        color: {COLORS['text_secondary']};
+        font-size: 0.8rem; text-transform: uppercase;
+        letter-spacing: 1px;
+        font-family: 'Source Sans Pro', sans-serif;
+    }}
+    .metric-card .value {{
+        color: {COLORS['accent_gold']};
+        font-size: 1.6rem; font-weight: 700;
+        font-family: 'Playfair Display', serif;
+        margin-top: 0.3rem;
+    }}
+
+    .fix-banner {{
+        background: linear-gradient(90deg, #1a472a, #2d6a3e);
+        border: 2px solid {COLORS['success']};
+        border-radius: 10px;
+        padding: 1rem 1.5rem; margin-bottom: 1.5rem;
+        color: white;
+        font-family: 'Source Sans Pro', sans-serif;
+    }}
+    .error-banner {{
+        background: linear-gradient(90deg, #4a1a1a, #6a2d2d);
+        border: 2px solid {COLORS['danger']};
+        border-radius: 10px;
+        padding: 1rem 1.5rem; margin-bottom: 1rem;
+        color: white;
+        font-family: 'Source Sans Pro', sans-serif;
+    }}
+
+    .section-title {{
+        font-family: 'Playfair Display', serif;
+        color: {COLORS['accent_gold']};
+        font-size: 1.3rem;
+        border-bottom: 2px solid rgba(255,215,0,0.3);
+        padding-bottom: 0.5rem;
+        margin: 1.5rem 0 1rem;
+    }}
+
+    .formula-box {{
+        background: rgba(0,51,102,0.5);
+        border: 1px solid {COLORS['accent_gold']};
+        border-radius: 8px;
+        padding: 1rem 1.5rem;
+        font-family: 'Source Sans Pro', monospace;
+        color: {COLORS['text_primary']};
+        margin: 0.8rem 0;
+    }}
+
+    .stTabs [data-baseweb="tab-list"] {{ gap: 8px; }}
+    .stTabs [data-baseweb="tab"] {{
+        background: {COLORS['card_bg']};
+        border: 1px solid rgba(255,215,0,0.3);
+        border-radius: 8px;
+        color: {COLORS['text_primary']};
+        font-family: 'Source Sans Pro', sans-serif;
+        padding: 0.5rem 1rem;
+    }}
+    .stTabs [aria-selected="true"] {{
+        background: {COLORS['dark_blue']};
+        border: 2px solid {COLORS['accent_gold']};
+        color: {COLORS['accent_gold']};
+    }}
+
+    div[data-testid="stDataFrame"] {{
+        border: 1px solid rgba(255,215,0,0.2);
+        border-radius: 8px;
+    }}
+
+    footer {{visibility: hidden;}}
+</style>
+""")
+
+HEADER_HTML = _compact(f"""
+<div class="header-container">
+    <h1>{BRANDING['icon']} LBO Investment Model</h1>
+    <p>{BRANDING['name']}</p>
+    <p style="font-size:0.8rem; color:{COLORS['text_secondary']};">
+        {BRANDING['instructor']} | {BRANDING['credentials']}</p>
+</div>
+""")
+
+SIDEBAR_HTML = _compact(f"""
+<div style="text-align:center; padding:1.2rem; background:rgba(255,215,0,0.08);
+     border-radius:10px; margin-bottom:1.5rem; border:2px solid {COLORS['accent_gold']};">
+    <h3 style="color:{COLORS['accent_gold']}; margin:0;">{BRANDING['icon']} LBO MODEL</h3>
+    <p style="color:{COLORS['text_secondary']}; font-size:0.75rem; margin:5px 0 0;">
+        ✅ Basic Paper Model</p>
+</div>
+""")
+
+FOOTER_HTML = _compact(f"""
+<div style="text-align:center; padding:1rem;">
+    <p style="color:{COLORS['accent_gold']}; font-family:'Playfair Display', serif; font-weight:700;">
+        {BRANDING['icon']} {BRANDING['name']}</p>
+    <p style="color:{COLORS['text_secondary']}; font-size:0.8rem;">
+        {BRANDING['instructor']} | {BRANDING['credentials']}</p>
+</div>
+""")
+
+
+@lru_cache(maxsize=None)
+def sidebar_heading(text):
+    """Gold sidebar section heading, e.g. sidebar_heading('🏦 Debt')"""
+    return f"<p style='color:{COLORS['accent_gold']}; font-weight:700;'>{text}</p>"